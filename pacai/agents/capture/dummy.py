@@ -30,3 +30,13 @@ class DummyAgent(CaptureAgent):
 
         actions = gameState.getLegalActions(self.index)
         return random.choice(actions)
+
+def createTeam(firstIndex, secondIndex, isRed):
+    """
+    A team of two dummy agents (that move randomly).
+    """
+
+    return [
+        DummyAgent(firstIndex),
+        DummyAgent(secondIndex),
+    ]
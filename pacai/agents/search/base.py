@@ -1,3 +1,5 @@
+import inspect
+import json
 import logging
 import time
 from typing import Callable, Union
@@ -8,7 +10,10 @@ from pacai.core.gamestate import AbstractGameState
 from pacai.core.search.heuristic import null as nullHeuristic
 from pacai.core.search.position import PositionSearchProblem
 from pacai.core.search.problem import SearchProblem
+from pacai.core.search.problem import TRACE_COUNTERS
+from pacai.core.search.problem import TRACE_FULL
 from pacai.student.search import depthFirstSearch
+from pacai.ui.null import AbstractNullView
 from pacai.util import reflection
 
 class SearchAgent(BaseAgent):
@@ -19,15 +24,37 @@ class SearchAgent(BaseAgent):
 
     As a default, this agent runs `pacai.student.search.depthFirstSearch` on a
     `pacai.core.search.position.PositionSearchProblem` to find location (1, 1).
+
+    The search problem is run with the given trace level
+    (see `pacai.core.search.problem.SearchProblem.setTraceLevel`),
+    and the visited locations are only highlighted when it is full.
+    Without a trace level, it is full unless the game is shown on a view
+    where nothing would show the visited locations (see `SearchAgent.setDisplay`).
+
+    The search's `pacai.core.search.stats.SearchStats` are logged,
+    and if `statsPath` is given, they are also appended to that file as one line of JSON.
     """
 
     def __init__(self, index,
             fn: Union[str, Callable[[SearchProblem], any]] = depthFirstSearch,
             prob: Union[str, Callable[[AbstractGameState], SearchProblem]] = PositionSearchProblem,
             heuristic: Union[str, Callable] = nullHeuristic,
+            traceLevel: str = None,
+            statsPath: str = None,
             **kwargs):
         super().__init__(index, **kwargs)
 
+        self.traceLevel = traceLevel
+        if (self.traceLevel is None):
+            self.traceLevel = TRACE_FULL
+
+        self._fixedTraceLevel = (traceLevel is not None)
+        self.statsPath = statsPath
+
+        # Names for the stats records.
+        self._searchName = _getName(fn)
+        self._heuristicName = _getName(heuristic)
+
         if isinstance(prob, str):
             # Get the search problem type from the name.
             self.searchType = reflection.qualifiedImport(prob)
@@ -64,18 +91,44 @@ class SearchAgent(BaseAgent):
 
         starttime = time.time()
         problem = self.searchType(state)  # Makes a new search problem.
+        problem.setTraceLevel(self.traceLevel)
 
         self._actions = self.searchFunction(problem)  # Find a path.
         self._actionIndex = 0
 
         totalCost = problem.actionsCost(self._actions)
 
-        state.setHighlightLocations(problem.getVisitHistory())
+        if (problem.isTracingVisits()):
+            state.setHighlightLocations(problem.getVisitHistory())
 
         logging.info('Path found with total cost of %d in %.1f seconds' %
                 (totalCost, time.time() - starttime))
 
-        logging.info('Search nodes expanded: %d' % problem.getExpandedCount())
+        if (problem.isCounting()):
+            logging.info('Search nodes expanded: %d' % problem.getExpandedCount())
+
+        # Searches that do not record stats (e.g. student searches) leave them empty.
+        stats = problem.getStats()
+        if (stats.expanded > 0 or stats.wallTime > 0.0):
+            logging.info('Search stats: %s' % (stats))
+
+        if (self.statsPath is not None):
+            self._writeStats(problem, totalCost)
+
+    def setDisplay(self, display):
+        """
+        Note the view that the game will be shown on.
+        If this agent was not given a trace level and nothing on that view would show the
+        visited locations (a null view that does not save a gif),
+        searches will only count expansions.
+        """
+
+        if (self._fixedTraceLevel):
+            return
+
+        self.traceLevel = TRACE_FULL
+        if (isinstance(display, AbstractNullView) and not display.isSavingFrames()):
+            self.traceLevel = TRACE_COUNTERS
 
     def getAction(self, state):
         """
@@ -102,7 +155,8 @@ class SearchAgent(BaseAgent):
         function = reflection.qualifiedImport(functionName)
 
         # Check if the function has a heuristic.
-        if 'heuristic' not in function.__code__.co_varnames:
+        # (The signature also sees through decorators, like the one that records search stats.)
+        if 'heuristic' not in inspect.signature(function).parameters:
             logging.info('[SearchAgent] using function %s.' % (functionName))
             return function
 
@@ -114,3 +168,21 @@ class SearchAgent(BaseAgent):
 
         # Bind the heuristic.
         return lambda x: function(x, heuristic = heuristic)
+
+    def _writeStats(self, problem, totalCost):
+        record = {
+            'problem': _getName(self.searchType),
+            'function': self._searchName,
+            'heuristic': self._heuristicName,
+            'cost': totalCost,
+        }
+        record.update(problem.getStats().toDict())
+
+        with open(self.statsPath, 'a') as file:
+            file.write(json.dumps(record) + '\n')
+
+def _getName(value):
+    if (isinstance(value, str)):
+        return value
+
+    return getattr(value, '__name__', str(value))
@@ -1,19 +1,398 @@
+import logging
+import multiprocessing
+import time
+
 from pacai.agents.base import BaseAgent
+from pacai.agents.search.ordering import DEFAULT_KILLER_MOVES
+from pacai.agents.search.ordering import MoveOrdering
 from pacai.util import reflection
+from pacai.util.transpositionTable import DEFAULT_SIZE as DEFAULT_TABLE_SIZE
+from pacai.util.transpositionTable import TranspositionTable
+
+# The part of the move time that an iterative search will use.
+DEFAULT_TIME_FRACTION = 0.5
+# The deepest an iterative search will go (even if it has time left).
+DEFAULT_MAX_DEPTH = 32
+
+# The agent and starting state for worker processes.
+# These are set right before the workers fork, so every worker inherits them.
+_workerAgent = None
+_workerBaseState = None
+
+class SearchTimeout(Exception):
+    """
+    Raised by `MultiAgentSearchAgent.visitNode` when an iterative search runs out of time.
+    """
+
+    pass
 
 class MultiAgentSearchAgent(BaseAgent):
     """
     A common class for all multi-agent searchers.
+
+    Searchers get a `pacai.util.transpositionTable.TranspositionTable` with `tableSize` slots
+    that is kept for the whole game (a size of zero turns it off).
+    Values only depend on the node (and the evaluation function),
+    so entries from earlier moves are still good.
+
+    By default, searchers go `depth` levels down.
+    If a `moveTime` (in seconds, e.g. the game's move timeout) is given,
+    searchers instead search one level down, then two, then three, ... (up to `maxDepth`)
+    until `timeFraction` of the move time is used (see `MultiAgentSearchAgent.iterativeDeepening`).
+
+    Searchers that prune can order their actions with `MultiAgentSearchAgent.orderActions`
+    (see `pacai.agents.search.ordering.MoveOrdering`):
+    the best action from the transposition table first, then `killerMoves` killer moves per ply,
+    then the rest by their history score (unless `history` is 0).
+    With `evalOrdering` set to N (greater than 0), nodes with at least N levels below them
+    order the rest by the evaluation of their successors instead (which costs a successor
+    and an evaluation per action).
+
+    With more than one of `workers`, the actions at the root are searched in a pool of
+    worker processes (see `MultiAgentSearchAgent.searchRootActions`).
     """
 
-    def __init__(self, index, evalFn = 'pacai.core.eval.score', depth = 2, **kwargs):
+    def __init__(self, index, evalFn = 'pacai.core.eval.score', depth = 2,
+            tableSize = DEFAULT_TABLE_SIZE, moveTime = None, timeFraction = DEFAULT_TIME_FRACTION,
+            maxDepth = DEFAULT_MAX_DEPTH, killerMoves = DEFAULT_KILLER_MOVES, history = 1,
+            evalOrdering = 0, workers = 1, **kwargs):
         super().__init__(index, **kwargs)
 
         self._evaluationFunction = reflection.qualifiedImport(evalFn)
         self._treeDepth = int(depth)
 
+        self._transpositionTable = None
+        if (int(tableSize) > 0):
+            self._transpositionTable = TranspositionTable(int(tableSize))
+
+        self._moveTime = None
+        if (moveTime is not None and float(moveTime) > 0.0):
+            self._moveTime = float(moveTime)
+
+        self._timeFraction = float(timeFraction)
+        if (self._timeFraction <= 0.0 or self._timeFraction > 1.0):
+            raise ValueError('The time fraction must be in (0, 1], found: %s.' % (timeFraction))
+
+        self._maxDepth = int(maxDepth)
+
+        self._moveOrdering = MoveOrdering(int(killerMoves), bool(int(history)))
+        self._evalOrdering = int(evalOrdering)
+
+        self._nodeCount = 0
+
+        self._numWorkers = int(workers)
+        self._pool = None
+        self._poolLayout = None
+
+        # Set while an iterative search is running.
+        self._deadline = None
+        self._previousAction = None
+        self._iterating = False
+
+        self._completedDepth = 0
+
+    def final(self, state):
+        self.stopWorkers()
+
+        logging.debug('Searched %d nodes.' % (self._nodeCount))
+        logging.debug('Move ordering: %s' % (self._moveOrdering.getStats()))
+
+        if (self._transpositionTable is not None):
+            logging.debug('Transposition table: %s' % (self._transpositionTable.getStats()))
+
+    def getCompletedDepth(self):
+        """
+        Get the depth of the last search that finished
+        (for an iterative search, the deepest iteration that finished).
+        """
+
+        return self._completedDepth
+
     def getEvaluationFunction(self):
         return self._evaluationFunction
 
+    def getNodeCount(self):
+        """
+        Get the number of nodes searched (over the whole game).
+        """
+
+        return self._nodeCount
+
+    def getTableKey(self, state, depth, agentIndex):
+        """
+        Get the transposition table key for a node:
+        the state's hash, how many more levels the search will go down, and whose turn it is.
+        `depth` is the number of levels already searched (out of `getTreeDepth()`).
+        """
+
+        return (hash(state), self._treeDepth - depth, agentIndex)
+
+    def getTranspositionTable(self):
+        """
+        Get the transposition table, or None if it is turned off.
+        """
+
+        return self._transpositionTable
+
     def getTreeDepth(self):
         return self._treeDepth
+
+    def iterativeDeepening(self, state, search):
+        """
+        Get an action from `search(state)`, which searches `getTreeDepth()` levels down.
+
+        Without a move time, this is just one search at the fixed depth.
+        Otherwise, the search is run with a depth of 1, 2, 3, ...
+        until `timeFraction` of the move time is used,
+        and the action from the deepest search that finished is returned.
+        A search that runs out of time is stopped by `MultiAgentSearchAgent.visitNode`.
+        The first search (depth 1) is always allowed to finish, so there is always an action.
+        """
+
+        self._moveOrdering.newSearch()
+
+        if (self._moveTime is None):
+            action = search(state)
+            self._completedDepth = self._treeDepth
+            return action
+
+        startTime = time.perf_counter()
+        fixedDepth = self._treeDepth
+
+        bestAction = None
+        self._completedDepth = 0
+        self._iterating = True
+
+        try:
+            for depth in range(1, self._maxDepth + 1):
+                self._treeDepth = depth
+
+                try:
+                    action = search(state)
+                except SearchTimeout:
+                    break
+
+                bestAction = action
+                self._previousAction = action
+                self._completedDepth = depth
+
+                self._deadline = startTime + self._moveTime * self._timeFraction
+                if (time.perf_counter() >= self._deadline):
+                    break
+        finally:
+            self._treeDepth = fixedDepth
+            self._deadline = None
+            self._previousAction = None
+            self._iterating = False
+
+        logging.debug('Searched %d levels down in %.3f seconds.'
+                % (self._completedDepth, time.perf_counter() - startTime))
+
+        return bestAction
+
+    def orderActions(self, state, depth, agentIndex, actions):
+        """
+        Get the actions at a node in the order they should be tried.
+        `depth` is the number of levels already searched (like in `getTableKey`).
+
+        The best action that a search one level shallower found for this node goes first
+        (if it is in the transposition table).
+        During an iterative search, that is the previous iteration's principal variation.
+        The rest is ordered by the move ordering (killer moves, then history or evaluation).
+        """
+
+        first = None
+        if (self._transpositionTable is not None):
+            key = (hash(state), self._treeDepth - depth - 1, agentIndex)
+            entry = self._transpositionTable.get(key)
+            if (entry is not None):
+                first = entry[2]
+
+        scores = None
+        if (self._evalOrdering > 0 and self._treeDepth - depth >= self._evalOrdering):
+            # Pacman wants high evaluations, the ghosts want low ones.
+            sign = 1 if (agentIndex == 0) else -1
+
+            scores = {}
+            for action in actions:
+                successor = state.generateSuccessor(agentIndex, action)
+                scores[action] = sign * self._evaluationFunction(successor)
+
+        return self._moveOrdering.order(state, agentIndex, (depth, agentIndex), actions,
+                first = first, scores = scores)
+
+    def orderRootActions(self, actions):
+        """
+        During an iterative search, put the action that the previous iteration picked first.
+        """
+
+        if (not self._iterating):
+            return actions
+
+        return _moveToFront(actions, self._previousAction)
+
+    def recordCutoff(self, state, depth, agentIndex, action):
+        """
+        Note that `action` caused a cutoff at a node
+        (`depth` is the number of levels already searched, like in `orderActions`).
+        """
+
+        self._moveOrdering.recordCutoff(state, agentIndex, (depth, agentIndex), action,
+                self._treeDepth - depth)
+
+    def searchRootActions(self, state, actions, searchAction, alpha = None):
+        """
+        Get the value of each of the actions at the root (in the same order),
+        from `searchAction(state, action, alpha)`, which must be a method of this agent.
+
+        For searchers that prune, `alpha` is the value that an action has to beat to matter.
+        It is raised to the best value found so far as the actions are searched
+        (so, like in any alpha-beta search, values that do not beat it are only bounds).
+        Searchers that do not prune can leave it as None.
+
+        With more than one worker, the actions are split across a pool of processes
+        that is kept for the rest of the game (see `MultiAgentSearchAgent.stopWorkers`).
+        States are sent to the workers as snapshots
+        (see `pacai.core.gamestate.AbstractGameState.getSnapshot`),
+        and each worker has its own copy of this agent (and of its transposition table).
+        When there is an alpha, the first action is searched here first
+        and the rest are searched in parallel with the alpha that it gave (young brothers wait).
+        Every value that beats the alpha is exact, so the best action (and the first one
+        among equals) is the same as in a serial search.
+        Searches are serial if there is only one worker, this platform cannot fork,
+        or this agent is already running in a daemonic process (e.g. a parallel game).
+        """
+
+        if (len(actions) <= 1 or not self._startWorkers(state)):
+            values = []
+            for action in actions:
+                value = searchAction(state, action, alpha)
+                values.append(value)
+
+                if (alpha is not None):
+                    alpha = max(alpha, value)
+
+            return values
+
+        values = []
+        if (alpha is not None):
+            values.append(searchAction(state, actions[0], alpha))
+            alpha = max(alpha, values[0])
+            actions = actions[1:]
+
+        timeLeft = None
+        if (self._deadline is not None):
+            timeLeft = max(0.0, self._deadline - time.perf_counter())
+
+        snapshot = state.getSnapshot()
+        tasks = [(searchAction.__name__, snapshot, action, alpha, self._treeDepth, timeLeft)
+                for action in actions]
+
+        timedOut = False
+        for (value, numNodes) in self._pool.map(_searchInWorker, tasks, chunksize = 1):
+            self._nodeCount += numNodes
+            if (value is None):
+                timedOut = True
+
+            values.append(value)
+
+        if (timedOut):
+            raise SearchTimeout()
+
+        return values
+
+    def stopWorkers(self):
+        """
+        Shut down the worker processes (if there are any).
+        They are started again when they are needed.
+        """
+
+        if (self._pool is None):
+            return
+
+        self._pool.terminate()
+        self._pool.join()
+
+        self._pool = None
+        self._poolLayout = None
+
+    def visitNode(self):
+        """
+        Count a searched node (see `MultiAgentSearchAgent.getNodeCount`),
+        and raise a `SearchTimeout` if an iterative search has used up its time.
+        Searchers should call this at every node.
+        """
+
+        self._nodeCount += 1
+
+        if (self._deadline is not None and time.perf_counter() > self._deadline):
+            raise SearchTimeout()
+
+    def _startWorkers(self, state):
+        """
+        Make sure that there is a pool of workers that can search states like this one.
+        Returns False if searches should be serial.
+        """
+
+        global _workerAgent
+        global _workerBaseState
+
+        # Daemonic processes (like `pacai.core.parallel` workers) cannot have children.
+        if (self._numWorkers <= 1 or 'fork' not in multiprocessing.get_all_start_methods()
+                or multiprocessing.current_process().daemon):
+            return False
+
+        # Workers build states from the one they were started with, so that needs to be from
+        # the same game (food never comes back, so any later state can be built from it).
+        if (self._pool is not None and self._poolLayout is not state.getInitialLayout()):
+            self.stopWorkers()
+
+        if (self._pool is None):
+            logging.debug('Starting %d search workers.' % (self._numWorkers))
+
+            _workerAgent = self
+            _workerBaseState = state.copy()
+
+            context = multiprocessing.get_context('fork')
+            self._pool = context.Pool(self._numWorkers)
+            self._poolLayout = state.getInitialLayout()
+
+            _workerAgent = None
+            _workerBaseState = None
+
+        return True
+
+def _searchInWorker(task):
+    """
+    Search one root action in a worker.
+    Returns the value (or None if the search ran out of time) and the number of nodes searched.
+    """
+
+    methodName, snapshot, action, alpha, treeDepth, timeLeft = task
+
+    state = _workerBaseState.copy()
+    state.restoreSnapshot(snapshot)
+
+    agent = _workerAgent
+    agent._treeDepth = treeDepth
+
+    agent._deadline = None
+    if (timeLeft is not None):
+        agent._deadline = time.perf_counter() + timeLeft
+
+    numNodes = agent.getNodeCount()
+
+    try:
+        value = getattr(agent, methodName)(state, action, alpha)
+    except SearchTimeout:
+        value = None
+    finally:
+        agent._deadline = None
+
+    return value, agent.getNodeCount() - numNodes
+
+def _moveToFront(actions, action):
+    if (action is None or action not in actions):
+        return actions
+
+    return [action] + [other for other in actions if (other != action)]
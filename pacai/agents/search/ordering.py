@@ -0,0 +1,101 @@
+"""
+Move ordering for game tree searches that prune (like alpha-beta).
+Alpha-beta cuts off as soon as it finds a good enough move,
+so the sooner the good moves are tried, the less of the tree gets searched.
+"""
+
+# Killer moves kept for each ply.
+DEFAULT_KILLER_MOVES = 2
+
+class MoveOrdering(object):
+    """
+    Orders the actions at a node with what earlier parts of the search learned:
+
+     - Killer moves: the last few actions that caused a cutoff at the same ply.
+       Sibling nodes tend to be refuted by the same action.
+     - A history table: how much searching each action (by an agent, from a position) has
+       saved through cutoffs, over the whole search.
+
+    The search calls `MoveOrdering.recordCutoff` whenever an action causes a cutoff.
+    Killers only make sense within one search (see `MoveOrdering.newSearch`),
+    history scores are kept (but halved) between searches.
+    """
+
+    def __init__(self, killerMoves = DEFAULT_KILLER_MOVES, history = True):
+        self._numKillers = killerMoves
+        self._useHistory = history
+
+        # {ply: [action, ...]}, most recent first.
+        self._killers = {}
+        # {(agentIndex, position, action): score}
+        self._history = {}
+
+        self._cutoffs = 0
+
+    def getStats(self):
+        return {
+            'cutoffs': self._cutoffs,
+            'killerPlies': len(self._killers),
+            'historySize': len(self._history),
+        }
+
+    def newSearch(self):
+        """
+        Mark the start of a new search (e.g. a new move).
+        """
+
+        self._killers = {}
+
+        for key in list(self._history.keys()):
+            score = self._history[key] // 2
+            if (score == 0):
+                del self._history[key]
+            else:
+                self._history[key] = score
+
+    def order(self, state, agentIndex, ply, actions, first = None, scores = None):
+        """
+        Get the actions in the order they should be tried.
+        `first` (e.g. the best action from a transposition table) goes first, then the killers
+        for the ply, then the rest:
+        by `scores` (a dict of action to score, higher first) if given,
+        or by their history score otherwise.
+        Ties keep the order of `actions`.
+        """
+
+        front = []
+        if (first is not None and first in actions):
+            front.append(first)
+
+        for killer in self._killers.get(ply, []):
+            if (killer in actions and killer not in front):
+                front.append(killer)
+
+        rest = [action for action in actions if (action not in front)]
+
+        if (scores is not None):
+            rest.sort(key = lambda action: -scores[action])
+        elif (self._useHistory and len(self._history) > 0):
+            position = state.getAgentPosition(agentIndex)
+            rest.sort(key = lambda action: -self._history.get((agentIndex, position, action), 0))
+
+        return front + rest
+
+    def recordCutoff(self, state, agentIndex, ply, action, remainingDepth):
+        """
+        Note that `action` caused a cutoff at a node with `remainingDepth` more levels below it.
+        """
+
+        self._cutoffs += 1
+
+        if (self._numKillers > 0):
+            killers = self._killers.setdefault(ply, [])
+            if (action in killers):
+                killers.remove(action)
+
+            killers.insert(0, action)
+            del killers[self._numKillers:]
+
+        if (self._useHistory):
+            key = (agentIndex, state.getAgentPosition(agentIndex), action)
+            self._history[key] = self._history.get(key, 0) + remainingDepth * remainingDepth
@@ -0,0 +1,8 @@
+"""
+The `pacai.bench` package contains benchmarks.
+Like the binaries in `pacai.bin`, each benchmark has a main() function
+and can be run from the command line, e.g.:
+```
+python3 -m pacai.bench.search
+```
+"""
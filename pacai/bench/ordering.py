@@ -0,0 +1,226 @@
+"""
+A benchmark for move ordering in `pacai.student.multiagents.AlphaBetaAgent`.
+
+Positions are taken from games on the given layouts where every agent moves at random.
+An alpha-beta agent picks a move in each of them (at a fixed depth) with each kind of
+move ordering (see `ORDERINGS` and `pacai.agents.search.ordering.MoveOrdering`),
+and the number of nodes it searched is compared against searching without any ordering.
+Move ordering only changes how much gets pruned, so every ordering should pick the same moves
+(any position where one does not is reported).
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import textwrap
+import time
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.layout import getLayout
+from pacai.student.multiagents import AlphaBetaAgent
+from pacai.util.logs import initLogging
+from pacai.util.logs import updateLoggingLevel
+
+DEFAULT_LAYOUTS = ['smallClassic', 'mediumClassic']
+DEFAULT_DEPTH = 3
+DEFAULT_NUM_STATES = 10
+DEFAULT_SEED = 4
+
+BASE_ORDERING = 'none'
+
+# The agent arguments for each ordering.
+ORDERINGS = {
+    'none': {'tableSize': 0, 'killerMoves': 0, 'history': 0},
+    'killers': {'tableSize': 0, 'killerMoves': 2, 'history': 0},
+    'history': {'tableSize': 0, 'killerMoves': 0, 'history': 1},
+    'eval': {'tableSize': 0, 'killerMoves': 0, 'history': 0, 'evalOrdering': 2},
+    'table': {'killerMoves': 0, 'history': 0},
+    'all': {},
+    'iterative': {'moveTime': 1000000},
+}
+
+def getStates(layoutName, numStates, seed = DEFAULT_SEED):
+    """
+    Get (up to) `numStates` states from a game where everyone moves at random.
+    """
+
+    rng = random.Random(seed)
+    state = PacmanGameState(getLayout(layoutName))
+
+    states = []
+    while (len(states) < numStates and not state.isOver()):
+        states.append(state)
+
+        for agentIndex in range(state.getNumAgents()):
+            if (state.isOver()):
+                break
+
+            state = state.generateSuccessor(agentIndex,
+                    rng.choice(state.getLegalActions(agentIndex)))
+
+    return states
+
+def runOrdering(states, orderingName, depth = DEFAULT_DEPTH):
+    """
+    Pick a move in each state (in order, like in a game) with one ordering.
+    Returns the moves, the nodes searched, and the time it took.
+    """
+
+    agent = AlphaBetaAgent(0, depth = depth, maxDepth = depth, **ORDERINGS[orderingName])
+
+    startTime = time.perf_counter()
+    actions = [agent.getAction(state) for state in states]
+
+    return {
+        'ordering': orderingName,
+        'actions': actions,
+        'nodes': agent.getNodeCount(),
+        'time': time.perf_counter() - startTime,
+    }
+
+def runBenchmark(layoutNames, orderingNames = None, depth = DEFAULT_DEPTH,
+        numStates = DEFAULT_NUM_STATES, seed = DEFAULT_SEED):
+    """
+    Run each ordering on each layout, and compare them to no ordering.
+    Returns a list with a result for each run, with its node count as a fraction of
+    the unordered search's (`nodeRatio`) and the number of moves it picked differently
+    (`mismatches`).
+    """
+
+    if (orderingNames is None):
+        orderingNames = list(ORDERINGS)
+
+    for orderingName in orderingNames:
+        if (orderingName not in ORDERINGS):
+            raise ValueError('Unknown ordering: "%s".' % (orderingName))
+
+    results = []
+    for layoutName in layoutNames:
+        states = getStates(layoutName, numStates, seed)
+        base = runOrdering(states, BASE_ORDERING, depth)
+
+        for orderingName in orderingNames:
+            result = base
+            if (orderingName != BASE_ORDERING):
+                result = runOrdering(states, orderingName, depth)
+
+            result = dict(result)
+            result['layout'] = layoutName
+            result['nodeRatio'] = result['nodes'] / max(1, base['nodes'])
+            result['mismatches'] = len([1 for (action, baseAction)
+                    in zip(result['actions'], base['actions']) if (action != baseAction)])
+
+            logging.info('%s %-10s nodes: %8d (%5.1f%%), time: %6.2f s, mismatches: %d' % (
+                layoutName, orderingName, result['nodes'], 100.0 * result['nodeRatio'],
+                result['time'], result['mismatches']))
+
+            results.append(result)
+
+    return results
+
+def readCommand(argv):
+    """
+    Processes the command used to run the benchmark from the command line.
+    """
+
+    description = """
+    DESCRIPTION:
+        This program compares the number of nodes the alpha-beta agent searches
+        with each kind of move ordering (%s).
+
+    EXAMPLES:
+        (1) python -m pacai.bench.ordering
+            - Compares every ordering on the default layouts.
+        (2) python -m pacai.bench.ordering --layouts mediumClassic --depth 4 --orderings none,all
+            - Compares no ordering and every ordering together at depth 4.
+    """ % (', '.join(ORDERINGS))
+
+    parser = argparse.ArgumentParser(description = textwrap.dedent(description),
+        prog = os.path.basename(__file__), formatter_class = argparse.RawTextHelpFormatter)
+
+    parser.add_argument('-d', '--debug', dest = 'debug',
+            action = 'store_true', default = False,
+            help = 'set logging level to debug (default: %(default)s)')
+
+    parser.add_argument('-l', '--layouts', dest = 'layouts',
+            action = 'store', type = str, default = ','.join(DEFAULT_LAYOUTS),
+            help = 'comma separated layouts to run (default: %(default)s)')
+
+    parser.add_argument('-q', '--quiet', dest = 'quiet',
+            action = 'store_true', default = False,
+            help = 'set logging level to warning (default: %(default)s)')
+
+    parser.add_argument('--depth', dest = 'depth',
+            action = 'store', type = int, default = DEFAULT_DEPTH,
+            help = 'the depth to search to (default: %(default)s)')
+
+    parser.add_argument('--orderings', dest = 'orderings',
+            action = 'store', type = str, default = ','.join(ORDERINGS),
+            help = 'comma separated orderings to run (default: %(default)s)')
+
+    parser.add_argument('--output', dest = 'output',
+            action = 'store', type = str, default = None,
+            help = 'also write the results to this file as JSON (default: %(default)s)')
+
+    parser.add_argument('--seed', dest = 'seed',
+            action = 'store', type = int, default = DEFAULT_SEED,
+            help = 'the seed for the random games (default: %(default)s)')
+
+    parser.add_argument('--states', dest = 'numStates',
+            action = 'store', type = int, default = DEFAULT_NUM_STATES,
+            help = 'the number of positions to search on each layout (default: %(default)s)')
+
+    options, otherjunk = parser.parse_known_args(argv)
+
+    if len(otherjunk) != 0:
+        raise ValueError('Unrecognized options: \'%s\'.' % (str(otherjunk)))
+
+    # Set the logging level.
+    if options.quiet and options.debug:
+        raise ValueError('Logging cannont be set to both debug and quiet.')
+
+    if options.quiet:
+        updateLoggingLevel(logging.WARNING)
+    elif options.debug:
+        updateLoggingLevel(logging.DEBUG)
+
+    return {
+        'layoutNames': options.layouts.split(','),
+        'orderingNames': options.orderings.split(','),
+        'depth': options.depth,
+        'numStates': options.numStates,
+        'seed': options.seed,
+        'outputPath': options.output,
+    }
+
+def main(argv):
+    """
+    Entry point for the move ordering benchmark.
+    The args are a blind pass of `sys.argv` with the executable stripped.
+    Returns the results.
+    """
+
+    initLogging()
+
+    args = readCommand(argv)
+    outputPath = args.pop('outputPath')
+
+    results = runBenchmark(**args)
+
+    if (outputPath is not None):
+        with open(outputPath, 'w') as file:
+            json.dump(results, file, indent = 4)
+            file.write('\n')
+
+    for result in results:
+        if (result['mismatches'] > 0):
+            logging.warning('The "%s" ordering picked %d different moves on %s.' %
+                    (result['ordering'], result['mismatches'], result['layout']))
+
+    return results
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,463 @@
+"""
+A benchmark for the searches in `pacai.core.search.graph`.
+
+Every search (BFS, DFS, UCS, and A* with each heuristic that fits the problem)
+is run on the bundled layouts:
+ - `*Maze` layouts with a `pacai.core.search.position.PositionSearchProblem`.
+ - `*Search` layouts with a `pacai.core.search.food.FoodSearchProblem`.
+ - `*Corners` layouts with a corners problem (the state is the position and a tuple of
+   which corners have been visited, as `pacai.core.search.heuristic.cornerTour` expects).
+
+Each run records the nodes expanded, the path cost, and the time spent searching.
+Runs that go over an expansion limit or a time limit are stopped (and recorded as such).
+Only the outcome of runs that timed out is compared (how far they got depends on the machine),
+and runs that did not finish are not regressions because they hit the other limit
+(which one a run hits first also depends on the machine).
+The results are compared against a baseline (a JSON file, see `DEFAULT_BASELINE_PATH`),
+and any run that got worse is reported as a regression:
+a different path cost or outcome, more expansions, or (well) over the baseline time.
+Times depend on the machine, so a baseline should be written on the machine it is checked on.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import textwrap
+import time
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core import layout
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.layout import getLayout
+from pacai.core.search import graph
+from pacai.core.search import heuristic
+from pacai.core.search.food import FoodSearchProblem
+from pacai.core.search.position import PositionSearchProblem
+from pacai.core.search.problem import SearchProblem
+from pacai.util.logs import initLogging
+from pacai.util.logs import updateLoggingLevel
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+        'searchBaseline.json')
+
+DEFAULT_MAX_EXPANSIONS = 20000
+DEFAULT_MAX_TIME = 10.0
+
+# A run is only slower than its baseline if it takes this much longer (as a fraction)
+# and more than the minimum time (in seconds), very short runs are too noisy to compare.
+DEFAULT_TIME_TOLERANCE = 0.5
+DEFAULT_MIN_TIME = 0.1
+
+STATUS_FOUND = 'found'
+STATUS_NO_PATH = 'no path'
+STATUS_LIMIT = 'limit'
+STATUS_TIMEOUT = 'timeout'
+
+# The outcomes of runs that were stopped before they finished.
+UNFINISHED_STATUSES = [STATUS_LIMIT, STATUS_TIMEOUT]
+
+SEARCHES = {
+    'bfs': graph.bfs,
+    'dfs': graph.dfs,
+    'ucs': graph.ucs,
+    'astar': graph.astar,
+}
+
+class _CornersProblem(SearchProblem):
+    """
+    Find a path that visits all four corners of a layout.
+    A state is (position, a tuple with whether each corner has been visited).
+    """
+
+    def __init__(self, gameState):
+        super().__init__()
+
+        self.walls = gameState.getWalls()
+
+        top = self.walls.getHeight() - 2
+        right = self.walls.getWidth() - 2
+        self.corners = ((1, 1), (1, top), (right, 1), (right, top))
+
+        position = gameState.getPacmanPosition()
+        self.start = (position, tuple([corner == position for corner in self.corners]))
+
+    def actionsCost(self, actions):
+        return len(actions)
+
+    def isGoal(self, state):
+        return all(state[1])
+
+    def startingState(self):
+        return self.start
+
+    def successorStates(self, state):
+        self._numExpanded += 1
+
+        successors = []
+        for action in Directions.CARDINAL:
+            dx, dy = Actions.directionToVector(action)
+            position = (int(state[0][0] + dx), int(state[0][1] + dy))
+            if (self.walls[position[0]][position[1]]):
+                continue
+
+            visited = tuple([seen or (corner == position)
+                    for (corner, seen) in zip(self.corners, state[1])])
+            successors.append(((position, visited), action, 1))
+
+        return successors
+
+# Layout suffix -> (problem class, the names of the heuristics for A*).
+PROBLEMS = {
+    'Maze': (PositionSearchProblem, ['manhattan', 'euclidean']),
+    'Search': (FoodSearchProblem, ['numFood', 'farthestFood', 'foodSpanningTree', 'mazeFood']),
+    'Corners': (_CornersProblem, ['cornerTour']),
+}
+
+class _SearchStopped(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+def getLayoutNames():
+    """
+    Get the names of the bundled layouts that have a benchmark problem (sorted).
+    """
+
+    names = []
+    for filename in os.listdir(layout.DEFAULT_LAYOUT_DIR):
+        name, extension = os.path.splitext(filename)
+        if (extension == '.lay' and _getProblemSuffix(name) is not None):
+            names.append(name)
+
+    return sorted(names)
+
+def getCases(layoutNames, searchNames = None):
+    """
+    Get every (layout, search, heuristic) to run.
+    The heuristic is None for the uninformed searches.
+    """
+
+    if (searchNames is None):
+        searchNames = list(SEARCHES)
+
+    for searchName in searchNames:
+        if (searchName not in SEARCHES):
+            raise ValueError("Unknown search '%s', expected one of: %s." %
+                    (searchName, ', '.join(SEARCHES)))
+
+    cases = []
+    for layoutName in layoutNames:
+        suffix = _getProblemSuffix(layoutName)
+        if (suffix is None):
+            raise ValueError("No benchmark problem for layout '%s'." % (layoutName))
+
+        heuristicNames = PROBLEMS[suffix][1]
+
+        for searchName in searchNames:
+            if (searchName == 'astar'):
+                for heuristicName in heuristicNames:
+                    cases.append((layoutName, searchName, heuristicName))
+            else:
+                cases.append((layoutName, searchName, None))
+
+    return cases
+
+def caseKey(layoutName, searchName, heuristicName):
+    if (heuristicName is None):
+        return '%s:%s' % (layoutName, searchName)
+
+    return '%s:%s:%s' % (layoutName, searchName, heuristicName)
+
+def runCase(layoutName, searchName, heuristicName, maxExpansions = DEFAULT_MAX_EXPANSIONS,
+        maxTime = DEFAULT_MAX_TIME):
+    """
+    Run one search and return its result:
+    a dict with the key, status, nodes expanded, path cost (None if there is no path),
+    and time (in seconds).
+    """
+
+    problemClass = PROBLEMS[_getProblemSuffix(layoutName)][0]
+    problem = problemClass(PacmanGameState(getLayout(layoutName)))
+    _limitSearch(problem, maxExpansions, maxTime)
+
+    search = SEARCHES[searchName]
+
+    try:
+        if (heuristicName is None):
+            actions = search(problem)
+        else:
+            actions = search(problem, heuristic = getattr(heuristic, heuristicName))
+        status = STATUS_FOUND
+        if (actions is None):
+            status = STATUS_NO_PATH
+    except _SearchStopped as ex:
+        actions = None
+        status = ex.status
+
+    cost = None
+    if (actions is not None):
+        cost = problem.actionsCost(actions)
+
+    stats = problem.getStats()
+
+    return {
+        'key': caseKey(layoutName, searchName, heuristicName),
+        'status': status,
+        'expanded': stats.expanded,
+        'cost': cost,
+        'time': stats.wallTime,
+    }
+
+def runBenchmark(cases, maxExpansions = DEFAULT_MAX_EXPANSIONS, maxTime = DEFAULT_MAX_TIME):
+    """
+    Run all the cases and return their results (in the same order).
+    """
+
+    results = []
+    for (layoutName, searchName, heuristicName) in cases:
+        result = runCase(layoutName, searchName, heuristicName, maxExpansions, maxTime)
+        logging.info('%-45s %-8s %8d %8s %8.3f' % (result['key'], result['status'],
+                result['expanded'], result['cost'], result['time']))
+
+        results.append(result)
+
+    return results
+
+def compareResults(results, baseline, timeTolerance = DEFAULT_TIME_TOLERANCE,
+        minTime = DEFAULT_MIN_TIME):
+    """
+    Compare results against a baseline (key -> result).
+    Returns a list of messages, one for each regression.
+    Results that are not in the baseline are not regressions,
+    and neither are runs that did not finish in both (whichever limit they hit).
+    """
+
+    regressions = []
+
+    for result in results:
+        key = result['key']
+        if (key not in baseline):
+            logging.info('%s is not in the baseline.' % (key))
+            continue
+
+        expected = baseline[key]
+
+        if (result['status'] != expected['status']):
+            # Whether a run hits the time or the expansion limit first depends on the machine.
+            if (result['status'] in UNFINISHED_STATUSES
+                    and expected['status'] in UNFINISHED_STATUSES):
+                continue
+
+            regressions.append('%s: status changed from %s to %s.' %
+                    (key, expected['status'], result['status']))
+            continue
+
+        if (result['status'] == STATUS_TIMEOUT):
+            continue
+
+        if (result['cost'] != expected['cost']):
+            regressions.append('%s: path cost changed from %s to %s.' %
+                    (key, expected['cost'], result['cost']))
+
+        if (result['expanded'] > expected['expanded']):
+            regressions.append('%s: expanded %d nodes, up from %d.' %
+                    (key, result['expanded'], expected['expanded']))
+
+        maxTime = max(minTime, expected['time'] * (1.0 + timeTolerance))
+        if (result['time'] > maxTime):
+            regressions.append('%s: took %.3f seconds, up from %.3f.' %
+                    (key, result['time'], expected['time']))
+
+    return regressions
+
+def loadBaseline(path):
+    """
+    Load a baseline (key -> result).
+    """
+
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def saveBaseline(path, results):
+    """
+    Save results as a baseline, keeping anything from the existing baseline that was not run.
+    """
+
+    baseline = {}
+    if (os.path.isfile(path)):
+        baseline = loadBaseline(path)
+
+    for result in results:
+        baseline[result['key']] = result
+
+    with open(path, 'w') as file:
+        json.dump(baseline, file, indent = 4, sort_keys = True)
+        file.write('\n')
+
+def _getProblemSuffix(layoutName):
+    for suffix in PROBLEMS:
+        if (layoutName.endswith(suffix)):
+            return suffix
+
+    return None
+
+def _limitSearch(problem, maxExpansions, maxTime):
+    """
+    Make the problem stop the search (with a `_SearchStopped`) once it has expanded
+    more than the expansion limit, or expands a node after the time limit.
+    """
+
+    successorStates = problem.successorStates
+    expansions = [0]
+    deadline = time.perf_counter() + maxTime
+
+    def limitedSuccessorStates(state):
+        expansions[0] += 1
+        if (expansions[0] > maxExpansions):
+            raise _SearchStopped(STATUS_LIMIT)
+
+        if (time.perf_counter() > deadline):
+            raise _SearchStopped(STATUS_TIMEOUT)
+
+        return successorStates(state)
+
+    problem.successorStates = limitedSuccessorStates
+
+def readCommand(argv):
+    """
+    Processes the command used to run the benchmark from the command line.
+    """
+
+    description = """
+    DESCRIPTION:
+        This program benchmarks the searches in pacai.core.search.graph on the bundled
+        maze, food search, and corners layouts, and compares the results to a baseline.
+        It exits with a non-zero status if any search regressed.
+
+    EXAMPLES:
+        (1) python -m pacai.bench.search
+            - Runs every search on every layout and checks them against the stored baseline.
+        (2) python -m pacai.bench.search --layouts bigMaze,trickySearch --searches astar
+            - Only runs A* (with each heuristic) on two layouts.
+        (3) python -m pacai.bench.search --write-baseline
+            - Runs everything and stores the results as the new baseline.
+    """
+
+    parser = argparse.ArgumentParser(description = textwrap.dedent(description),
+        prog = os.path.basename(__file__), formatter_class = argparse.RawTextHelpFormatter)
+
+    parser.add_argument('-d', '--debug', dest = 'debug',
+            action = 'store_true', default = False,
+            help = 'set logging level to debug (default: %(default)s)')
+
+    parser.add_argument('-l', '--layouts', dest = 'layouts',
+            action = 'store', type = str, default = None,
+            help = 'comma separated layouts to run\n'
+                + '(default: all the maze, search, and corners layouts)')
+
+    parser.add_argument('-q', '--quiet', dest = 'quiet',
+            action = 'store_true', default = False,
+            help = 'set logging level to warning (default: %(default)s)')
+
+    parser.add_argument('--baseline', dest = 'baseline',
+            action = 'store', type = str, default = DEFAULT_BASELINE_PATH,
+            help = 'the baseline file to compare against (default: %(default)s)')
+
+    parser.add_argument('--max-expansions', dest = 'maxExpansions',
+            action = 'store', type = int, default = DEFAULT_MAX_EXPANSIONS,
+            help = 'stop a search after this many expansions (default: %(default)s)')
+
+    parser.add_argument('--max-time', dest = 'maxTime',
+            action = 'store', type = float, default = DEFAULT_MAX_TIME,
+            help = 'stop a search after this many seconds (default: %(default)s)')
+
+    parser.add_argument('--min-time', dest = 'minTime',
+            action = 'store', type = float, default = DEFAULT_MIN_TIME,
+            help = 'runs faster than this (in seconds) are never too slow (default: %(default)s)')
+
+    parser.add_argument('--output', dest = 'output',
+            action = 'store', type = str, default = None,
+            help = 'also write the results to this file as JSON (default: %(default)s)')
+
+    parser.add_argument('--searches', dest = 'searches',
+            action = 'store', type = str, default = ','.join(SEARCHES),
+            help = 'comma separated searches to run (default: %(default)s)')
+
+    parser.add_argument('--time-tolerance', dest = 'timeTolerance',
+            action = 'store', type = float, default = DEFAULT_TIME_TOLERANCE,
+            help = 'how much slower (as a fraction of the baseline time) a run can be\n'
+                + 'before it is a regression (default: %(default)s)')
+
+    parser.add_argument('--write-baseline', dest = 'writeBaseline',
+            action = 'store_true', default = False,
+            help = 'store the results in the baseline file instead of comparing\n'
+                + '(default: %(default)s)')
+
+    options, otherjunk = parser.parse_known_args(argv)
+
+    if len(otherjunk) != 0:
+        raise ValueError('Unrecognized options: \'%s\'.' % (str(otherjunk)))
+
+    # Set the logging level.
+    if options.quiet and options.debug:
+        raise ValueError('Logging cannont be set to both debug and quiet.')
+
+    if options.quiet:
+        updateLoggingLevel(logging.WARNING)
+    elif options.debug:
+        updateLoggingLevel(logging.DEBUG)
+
+    layoutNames = getLayoutNames()
+    if (options.layouts is not None):
+        layoutNames = options.layouts.split(',')
+
+    return {
+        'cases': getCases(layoutNames, options.searches.split(',')),
+        'baselinePath': options.baseline,
+        'maxExpansions': options.maxExpansions,
+        'maxTime': options.maxTime,
+        'minTime': options.minTime,
+        'outputPath': options.output,
+        'timeTolerance': options.timeTolerance,
+        'writeBaseline': options.writeBaseline,
+    }
+
+def main(argv):
+    """
+    Entry point for the search benchmark.
+    The args are a blind pass of `sys.argv` with the executable stripped.
+    Returns the list of regressions.
+    """
+
+    initLogging()
+
+    args = readCommand(argv)
+    results = runBenchmark(args['cases'], args['maxExpansions'], args['maxTime'])
+
+    if (args['outputPath'] is not None):
+        with open(args['outputPath'], 'w') as file:
+            json.dump(results, file, indent = 4)
+            file.write('\n')
+
+    if (args['writeBaseline']):
+        saveBaseline(args['baselinePath'], results)
+        logging.info('Wrote %d results to the baseline: %s.' %
+                (len(results), args['baselinePath']))
+        return []
+
+    regressions = compareResults(results, loadBaseline(args['baselinePath']),
+            timeTolerance = args['timeTolerance'], minTime = args['minTime'])
+
+    for regression in regressions:
+        logging.warning(regression)
+
+    logging.info('%d runs, %d regressions.' % (len(results), len(regressions)))
+
+    return regressions
+
+if __name__ == '__main__':
+    if (len(main(sys.argv[1:])) > 0):
+        sys.exit(1)
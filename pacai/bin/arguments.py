@@ -58,11 +58,26 @@ def getParser(description, name):
 
     parser.add_argument('--record', dest = 'record',
             action = 'store', type = str, default = None,
-            help = 'writes the moves of a game to the named pickle file (default: %(default)s)')
+            help = 'writes the moves of a game to the named replay file (default: %(default)s)')
 
     parser.add_argument('--replay', dest = 'replay',
             action = 'store', type = str, default = None,
-            help = 'load a recorded pickle game file to replay (default: %(default)s)')
+            help = 'load a recorded replay file to play back (default: %(default)s)')
+
+    parser.add_argument('--replay-end', dest = 'replayEnd',
+            action = 'store', type = int, default = None,
+            help = 'stop playing back a replay after this move '
+                + '(default: the last move, or the first move when playing backwards)')
+
+    parser.add_argument('--replay-start', dest = 'replayStart',
+            action = 'store', type = int, default = None,
+            help = 'start playing back a replay from this move '
+                + '(default: the first move, or the last move when playing backwards)')
+
+    parser.add_argument('--replay-step', dest = 'replayStep',
+            action = 'store', type = int, default = 1,
+            help = 'only show every n-th move of a replay, '
+                + 'negative values play the replay backwards (default: %(default)s)')
 
     parser.add_argument('--sprites', dest = 'spritesPath',
             action = 'store', type = str, default = view.DEFAULT_SPRITES,
@@ -72,4 +87,9 @@ def getParser(description, name):
             action = 'store_true', default = False,
             help = 'display output as text only (default: %(default)s)')
 
+    parser.add_argument('--workers', dest = 'workers',
+            action = 'store', type = int, default = 1,
+            help = 'play non-training games in parallel with this many worker processes,\n'
+                + 'requires --null-graphics (default: %(default)s)')
+
     return parser
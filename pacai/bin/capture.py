@@ -7,18 +7,19 @@ On your opponents side of the map, you are a pacman and can eat food and capsule
 
 import logging
 import os
-import pickle
 import random
 import sys
 
 from pacai.agents import keyboard
 from pacai.agents.capture.dummy import DummyAgent
 from pacai.bin.arguments import getParser
+from pacai.core import parallel
+from pacai.core import replay
 from pacai.core.actions import Actions
 from pacai.core.distance import manhattan
 from pacai.core.game import Game
 from pacai.core.gamestate import AbstractGameState
-from pacai.core.grid import Grid
+from pacai.core.grid import BitGrid
 from pacai.core.layout import Layout
 from pacai.core.layout import getLayout
 from pacai.ui.capture.null import CaptureNullView
@@ -78,8 +79,8 @@ class CaptureGameState(AbstractGameState):
             else:
                 self._blueCapsules.append(capsule)
 
-        self._redFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
-        self._blueFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
+        self._redFood = BitGrid(self._food.getWidth(), self._food.getHeight())
+        self._blueFood = BitGrid(self._food.getWidth(), self._food.getHeight())
 
         for x in range(self._food.getWidth()):
             for y in range(self._food.getHeight()):
@@ -187,6 +188,12 @@ class CaptureGameState(AbstractGameState):
 
         return self._redTeam
 
+    # Override
+    def getSnapshot(self):
+        snapshot = super().getSnapshot()
+        snapshot['timeleft'] = self._timeleft
+        return snapshot
+
     def getTimeleft(self):
         return self._timeleft
 
@@ -224,6 +231,25 @@ class CaptureGameState(AbstractGameState):
 
         return self._teams[agentIndex]
 
+    # Override
+    def restoreSnapshot(self, snapshot):
+        super().restoreSnapshot(snapshot)
+        self._timeleft = snapshot['timeleft']
+
+    # Override
+    def _getUndoRecord(self):
+        return (super()._getUndoRecord(), self._timeleft,
+                self._redFood, self._blueFood, self._redCapsules, self._blueCapsules)
+
+    # Override
+    def _restoreUndoRecord(self, record):
+        (
+            baseRecord, self._timeleft,
+            self._redFood, self._blueFood, self._redCapsules, self._blueCapsules,
+        ) = record
+
+        super()._restoreUndoRecord(baseRecord)
+
     def _applySuccessorAction(self, agentIndex, action):
         """
         Apply the action to the context state (self).
@@ -559,6 +585,9 @@ def readCommand(argv):
     elif options.debug:
         updateLoggingLevel(logging.DEBUG)
 
+    if (options.workers > 1 and not options.nullGraphics):
+        raise ValueError('Parallel games (--workers) require --null-graphics.')
+
     viewOptions = {
         'gifFPS': options.gifFPS,
         'gifPath': options.gif,
@@ -637,8 +666,13 @@ def readCommand(argv):
     args['numGames'] = options.numGames
     args['numTraining'] = options.numTraining
     args['record'] = options.record
+    args['seed'] = seed
     args['catchExceptions'] = options.catchExceptions
     args['replay'] = options.replay
+    args['replayEnd'] = options.replayEnd
+    args['replayStart'] = options.replayStart
+    args['replayStep'] = options.replayStep
+    args['workers'] = options.workers
 
     return args
 
@@ -660,27 +694,27 @@ def loadAgents(isRed, agentModule, textgraphics, args):
 
     return createTeamFunction(indices[0], indices[1], isRed, **args)
 
-def replayGame(layout, agents, actions, display, length, redTeamName, blueTeamName):
-    agents = [DummyAgent(index) for index in range(len(agents))]
+def replayGame(recorded, display, start = None, end = None, step = 1):
+    """
+    Play back a `pacai.core.replay.Replay` on the given display.
+    Only the moves from `start` to `end` (every `step`-th one) are shown,
+    see `pacai.core.replay.ReplayPlayer.getFrames`.
+    """
+
+    metadata = recorded.getMetadata()
+
+    layout = Layout(recorded.getLayoutText())
+    agents = [DummyAgent(index) for index in range(metadata['numAgents'])]
     rules = CaptureRules()
-    game = rules.newGame(layout, agents, display, length, False)
-    state = game.state
-    display.redTeam = redTeamName
-    display.blueTeam = blueTeamName
-    display.initialize(state)
-
-    for action in actions:
-        # Execute the action
-        state = state.generateSuccessor(*action)
-        # Change the display
-        display.update(state)
-        # Allow for game specific conditions (winning, losing, etc.)
-        rules.process(state, game)
-
-    display.finish()
+    game = rules.newGame(layout, agents, display, metadata['length'], False)
+    display.redTeam = metadata['redTeamName']
+    display.blueTeam = metadata['blueTeamName']
+
+    player = replay.ReplayPlayer(recorded, game)
+    player.render(display, start, end, step)
 
 def runGames(layout, agents, display, length, numGames, record, numTraining,
-        redTeamName, blueTeamName, catchExceptions = False, **kwargs):
+        redTeamName, blueTeamName, catchExceptions = False, workers = 1, seed = None, **kwargs):
     rules = CaptureRules()
     games = []
 
@@ -689,41 +723,52 @@ def runGames(layout, agents, display, length, numGames, record, numTraining,
         logging.info('Playing %d training games.' % numTraining)
         nullView = CaptureNullView()
 
-    for i in range(numGames):
-        isTraining = (i < numTraining)
+    # Training games need to be played in order (agents learn from each one),
+    # but the remaining games are independent and can be handed out to workers.
+    numTrainingGames = min(numGames, numTraining)
 
-        if (isTraining):
-            # Suppress graphics for training.
-            gameDisplay = nullView
-        else:
-            gameDisplay = display
+    for i in range(numTrainingGames):
+        # Suppress graphics for training.
+        g = rules.newGame(layout, agents, nullView, length, catchExceptions)
+
+        # Stream the game straight into the replay file.
+        if (record):
+            g.replayWriter = _newReplayWriter(_getRecordPath(record), layout, g, seed,
+                    redTeamName, blueTeamName)
 
-        g = rules.newGame(layout, agents, gameDisplay, length, catchExceptions)
         g.run()
 
-        if (not isTraining):
-            games.append(g)
+        if (record):
+            logging.info("Game recorded to: '%s'." % (_getRecordPath(record)))
+
+    if (numTrainingGames < numGames):
+        # Each game gets its own seed drawn from the (seeded) global RNG,
+        # so the games are the same no matter how many workers play them.
+        gameSeeds = [random.randint(0, 2**32) for i in range(numTrainingGames, numGames)]
 
-        g.record = None
-        if record:
-            components = {
-                'layout': layout,
-                'agents': [agent.__class__.__name__ for agent in agents],
-                'actions': g.moveHistory,
-                'length': length,
-                'redTeamName': redTeamName,
-                'blueTeamName': blueTeamName
-            }
+        # Serial games stream straight into the replay file,
+        # but workers can't share it, so they record into memory.
+        replayOutput = None
+        if (record and workers <= 1):
+            replayOutput = _getRecordPath(record)
 
-            path = 'replay'
-            if (isinstance(record, str)):
-                path = record
+        def newGame(gameSeed):
+            g = rules.newGame(layout, agents, display, length, catchExceptions)
+            if (record):
+                g.replayWriter = _newReplayWriter(replayOutput, layout, g, gameSeed,
+                        redTeamName, blueTeamName)
 
-            g.record = pickle.dumps(components)
-            with open(path, 'wb') as file:
-                file.write(g.record)
+            return g
 
-            logging.info("Game recorded to: '%s'." % (path))
+        for g in parallel.runGames(newGame, gameSeeds, workers, agents, display, rules):
+            games.append(g)
+
+            if (record):
+                if (replayOutput is None):
+                    with open(_getRecordPath(record), 'wb') as file:
+                        file.write(g.replayWriter.getBytes())
+
+                logging.info("Game recorded to: '%s'." % (_getRecordPath(record)))
 
     if (numGames > 0):
         scores = [game.state.getScore() for game in games]
@@ -740,6 +785,25 @@ def runGames(layout, agents, display, length, numGames, record, numTraining,
 
     return games
 
+def _getRecordPath(record):
+    if (isinstance(record, str)):
+        return record
+
+    return 'replay'
+
+def _newReplayWriter(output, layout, game, seed, redTeamName, blueTeamName):
+    metadata = {
+        'game': 'capture',
+        'layout': str(layout),
+        'seed': seed,
+        'numAgents': len(game.agents),
+        'agents': [agent.__class__.__name__ for agent in game.agents],
+        'length': game.length,
+        'redTeamName': redTeamName,
+        'blueTeamName': blueTeamName,
+    }
+
+    return replay.ReplayWriter(output, metadata)
 
 def main(argv):
     """
@@ -756,12 +820,9 @@ def main(argv):
     if (options['replay'] is not None):
         logging.info('Replaying recorded game %s.' % options['replay'])
 
-        recorded = None
-        with open(options['replay'], 'rb') as file:
-            recorded = pickle.load(file)
-
-        recorded['display'] = options['display']
-        replayGame(**recorded)
+        recorded = replay.readReplay(options['replay'])
+        replayGame(recorded, options['display'], options['replayStart'], options['replayEnd'],
+                options['replayStep'])
 
         return
 
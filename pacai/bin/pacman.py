@@ -9,19 +9,22 @@ Have fun!
 
 import logging
 import os
-import pickle
 import random
 import sys
 
 from pacai.agents.base import BaseAgent
 from pacai.agents.ghost.random import RandomGhost
 from pacai.agents.greedy import GreedyAgent
+from pacai.agents.search.base import SearchAgent
 from pacai.bin.arguments import getParser
+from pacai.core import parallel
+from pacai.core import replay
 from pacai.core.actions import Actions
 from pacai.core.directions import Directions
 from pacai.core.distance import manhattan
 from pacai.core.game import Game
 from pacai.core.gamestate import AbstractGameState
+from pacai.core.layout import Layout
 from pacai.core.layout import getLayout
 from pacai.ui.pacman.null import PacmanNullView
 from pacai.ui.pacman.text import PacmanTextView
@@ -437,6 +440,9 @@ def readCommand(argv):
     random.seed(seed)
     logging.debug('Seed value: ' + str(seed))
 
+    if (options.workers > 1 and not options.nullGraphics):
+        raise ValueError('Parallel games (--workers) require --null-graphics.')
+
     # Choose a layout.
     args['layout'] = getLayout(options.layout, maxGhosts = options.numGhosts)
     if (args['layout'] is None):
@@ -480,15 +486,32 @@ def readCommand(argv):
 
     args['catchExceptions'] = options.catchExceptions
     args['gameToReplay'] = options.replay
+    args['replayEnd'] = options.replayEnd
+    args['replayStart'] = options.replayStart
+    args['replayStep'] = options.replayStep
     args['ghosts'] = [BaseAgent.loadAgent(options.ghost, i + 1) for i in range(options.numGhosts)]
     args['numGames'] = options.numGames
     args['pacman'] = BaseAgent.loadAgent(options.pacman, PACMAN_AGENT_INDEX, agentOpts)
+
+    # Search agents only track what the display can show.
+    if (isinstance(args['pacman'], SearchAgent)):
+        args['pacman'].setDisplay(args['display'])
+
     args['record'] = options.record
+    args['seed'] = seed
     args['timeout'] = options.timeout
+    args['workers'] = options.workers
 
     return args
 
-def replayGame(layout, actions, display):
+def replayGame(recorded, display, start = None, end = None, step = 1):
+    """
+    Play back a `pacai.core.replay.Replay` on the given display.
+    Only the moves from `start` to `end` (every `step`-th one) are shown,
+    see `pacai.core.replay.ReplayPlayer.getFrames`.
+    """
+
+    layout = Layout(recorded.getLayoutText(), maxGhosts = recorded.getMetadata()['numAgents'] - 1)
     rules = ClassicGameRules()
 
     agents = []
@@ -496,23 +519,12 @@ def replayGame(layout, actions, display):
     agents += [RandomGhost(i + 1) for i in range(layout.getNumGhosts())]
 
     game = rules.newGame(layout, agents[PACMAN_AGENT_INDEX], agents[1:], display)
-    state = game.state
-    display.initialize(state)
 
-    for action in actions:
-        # Execute the action
-        state = state.generateSuccessor(*action)
-
-        # Change the display
-        display.update(state)
-
-        # Allow for game specific conditions (winning, losing, etc.)
-        rules.process(state, game)
-
-    display.finish()
+    player = replay.ReplayPlayer(recorded, game)
+    player.render(display, start, end, step)
 
 def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraining = 0,
-        catchExceptions = False, timeout = 30, **kwargs):
+        catchExceptions = False, timeout = 30, workers = 1, seed = None, **kwargs):
     rules = ClassicGameRules(timeout)
     games = []
 
@@ -521,29 +533,45 @@ def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraini
         logging.info('Playing %d training games.' % numTraining)
         nullView = PacmanNullView()
 
-    for i in range(numGames):
-        isTraining = (i < numTraining)
+    # Training games need to be played in order (agents learn from each one),
+    # but the remaining games are independent and can be handed out to workers.
+    numTrainingGames = min(numGames, numTraining)
 
-        if (isTraining):
-            # Suppress graphics for training.
-            gameDisplay = nullView
-        else:
-            gameDisplay = display
+    for i in range(numTrainingGames):
+        # Suppress graphics for training.
+        game = rules.newGame(layout, pacman, ghosts, nullView, catchExceptions)
+
+        # Stream the game straight into the replay file.
+        if (record):
+            game.replayWriter = _newReplayWriter(_getRecordPath(record), layout, game, seed)
 
-        game = rules.newGame(layout, pacman, ghosts, gameDisplay, catchExceptions)
         game.run()
 
-        if (not isTraining):
-            games.append(game)
+    if (numTrainingGames < numGames):
+        # Each game gets its own seed drawn from the (seeded) global RNG,
+        # so the games are the same no matter how many workers play them.
+        gameSeeds = [random.randint(0, 2**32) for i in range(numTrainingGames, numGames)]
+        agents = [pacman] + ghosts[:layout.getNumGhosts()]
 
-        if (record):
-            path = 'pacman.replay'
-            if (isinstance(record, str)):
-                path = record
+        # Serial games stream straight into the replay file,
+        # but workers can't share it, so they record into memory.
+        replayOutput = None
+        if (record and workers <= 1):
+            replayOutput = _getRecordPath(record)
+
+        def newGame(gameSeed):
+            game = rules.newGame(layout, pacman, ghosts, display, catchExceptions)
+            if (record):
+                game.replayWriter = _newReplayWriter(replayOutput, layout, game, gameSeed)
+
+            return game
+
+        for game in parallel.runGames(newGame, gameSeeds, workers, agents, display, rules):
+            games.append(game)
 
-            components = {'layout': layout, 'actions': game.moveHistory}
-            with open(path, 'wb') as file:
-                pickle.dump(components, file)
+            if (record and replayOutput is None):
+                with open(_getRecordPath(record), 'wb') as file:
+                    file.write(game.replayWriter.getBytes())
 
     if ((numGames - numTraining) > 0):
         scores = [game.state.getScore() for game in games]
@@ -556,6 +584,23 @@ def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraini
 
     return games
 
+def _getRecordPath(record):
+    if (isinstance(record, str)):
+        return record
+
+    return 'pacman.replay'
+
+def _newReplayWriter(output, layout, game, seed):
+    metadata = {
+        'game': 'pacman',
+        'layout': str(layout),
+        'seed': seed,
+        'numAgents': len(game.agents),
+        'agents': [agent.__class__.__name__ for agent in game.agents],
+    }
+
+    return replay.ReplayWriter(output, metadata)
+
 def main(argv):
     """
     Entry point for a pacman game.
@@ -571,12 +616,9 @@ def main(argv):
     if (args['gameToReplay'] is not None):
         logging.info('Replaying recorded game %s.' % args['gameToReplay'])
 
-        recorded = None
-        with open(args['gameToReplay'], 'rb') as file:
-            recorded = pickle.load(file)
-
-        recorded['display'] = args['display']
-        replayGame(**recorded)
+        recorded = replay.readReplay(args['gameToReplay'])
+        replayGame(recorded, args['display'], args['replayStart'], args['replayEnd'],
+                args['replayStep'])
 
         return
 
@@ -0,0 +1,533 @@
+"""
+A tournament runs many capture games between a list of teams and ranks them.
+
+Every pairing of teams plays on every layout with each team taking a turn as red and as blue.
+Games are played by a pool of worker processes (that each only import a team once),
+and every result is appended to a results file as soon as it comes in.
+Running the same tournament again with the same results file will skip games that
+have already been played, so an interrupted tournament can just be restarted.
+If no seed is given, the one drawn for the tournament is also saved in the results file,
+so a restarted tournament plays the same games that it would have.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import sys
+import textwrap
+
+from pacai.bin import capture
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.ui.capture.null import CaptureNullView
+from pacai.util.logs import initLogging
+from pacai.util.logs import updateLoggingLevel
+from pacai.util.mazeGenerator import generateMaze
+
+FORMAT_ROUND_ROBIN = 'round-robin'
+FORMAT_SWISS = 'swiss'
+
+WIN_POINTS = 3
+TIE_POINTS = 1
+LOSS_POINTS = 0
+
+INITIAL_ELO = 1500
+ELO_K = 32
+
+DEFAULT_RESULTS_PATH = 'tournament.jsonl'
+
+def scheduleRoundRobin(teams, layouts, numGames):
+    """
+    Get all the matches for a round-robin tournament (all in round 0).
+    Every team plays every other team on every layout, once as red and once as blue.
+    """
+
+    pairings = []
+    for i in range(len(teams)):
+        for j in range(i + 1, len(teams)):
+            pairings.append((teams[i], teams[j]))
+
+    return _scheduleRound(0, pairings, layouts, numGames)
+
+def scheduleSwissRound(roundIndex, teams, layouts, numGames, results):
+    """
+    Get the matches for the next round of a Swiss tournament.
+    Teams are ranked by their points so far and paired with the closest ranked team
+    that they have not played yet.
+    If there is an odd number of teams, the lowest ranked team that has not had a bye gets one
+    (worth as many points as winning every game of a match, see `byePoints`).
+
+    Returns the matches and the team that has a bye (or None).
+    """
+
+    standings = computeStandings(teams, results)
+    ranked = [row['team'] for row in standings]
+
+    played = set()
+    for result in results:
+        if (result.get('bye')):
+            continue
+
+        played.add((result['red'], result['blue']))
+        played.add((result['blue'], result['red']))
+
+    bye = None
+    if (len(ranked) % 2 == 1):
+        byes = {result['team'] for result in results if result.get('bye')}
+        candidates = [team for team in reversed(ranked) if team not in byes]
+        if (len(candidates) == 0):
+            candidates = list(reversed(ranked))
+
+        bye = candidates[0]
+        ranked.remove(bye)
+
+    pairings = []
+    while (len(ranked) > 0):
+        team = ranked.pop(0)
+
+        opponent = ranked[0]
+        for other in ranked:
+            if ((team, other) not in played):
+                opponent = other
+                break
+
+        ranked.remove(opponent)
+        pairings.append((team, opponent))
+
+    return _scheduleRound(roundIndex, pairings, layouts, numGames), bye
+
+def byePoints(layouts, numGames):
+    """
+    Get the points for a bye: the same as winning every game of a round's match
+    (each color on each layout `numGames` times).
+    """
+
+    return WIN_POINTS * 2 * len(layouts) * numGames
+
+def _scheduleRound(roundIndex, pairings, layouts, numGames):
+    matches = []
+
+    for (team1, team2) in pairings:
+        for layout in layouts:
+            for game in range(numGames):
+                # Swap colors so neither team gets the advantage of a side.
+                for (red, blue) in [(team1, team2), (team2, team1)]:
+                    matches.append({
+                        'round': roundIndex,
+                        'red': red,
+                        'blue': blue,
+                        'layout': layout,
+                        'game': game,
+                    })
+
+    return matches
+
+def matchKey(match):
+    return (match['round'], match['red'], match['blue'], match['layout'], match['game'])
+
+def playMatch(match):
+    """
+    Play a single capture game (in a worker process).
+    Returns the match with the results filled in.
+    """
+
+    random.seed(match['seed'])
+
+    result = dict(match)
+    result['error'] = None
+
+    layout = _loadLayout(match['layout'], match['seed'])
+
+    agents = []
+    forfeits = []
+    for (isRed, team) in [(True, match['red']), (False, match['blue'])]:
+        try:
+            agents.append(capture.loadAgents(isRed, team, True, {}))
+        except Exception as ex:
+            logging.warning('Team %s failed to load.' % (team), exc_info = ex)
+            result['error'] = 'Team %s failed to load: %s' % (team, ex)
+            forfeits.append(isRed)
+
+    if (len(forfeits) > 0):
+        # A team that can't load loses (if both fail, it's a tie).
+        result['score'] = 0
+        if (forfeits == [True]):
+            result['score'] = -1
+        elif (forfeits == [False]):
+            result['score'] = 1
+
+        return result
+
+    # Interleave the teams' agents: red, blue, red, blue.
+    agents = sum([list(pair) for pair in zip(*agents)], [])
+
+    rules = capture.CaptureRules()
+    game = rules.newGame(layout, agents, CaptureNullView(), match['length'], True)
+    game.run()
+
+    result['score'] = game.state.getScore()
+    if (game.agentCrashed):
+        result['error'] = 'An agent crashed or timed out.'
+
+    return result
+
+def _loadLayout(name, seed):
+    if (not name.startswith('RANDOM')):
+        return getLayout(name)
+
+    layoutSeed = seed
+    if (name != 'RANDOM'):
+        layoutSeed = int(name[6:])
+
+    return Layout(generateMaze(layoutSeed).split('\n'))
+
+def _matchSeed(tournamentSeed, match):
+    key = '%s:%s' % (tournamentSeed, ':'.join([str(part) for part in matchKey(match)]))
+    return random.Random(key).randint(0, 2**32)
+
+def computeStandings(teams, results):
+    """
+    Aggregate results into a table sorted by points (then Elo, then name).
+    Each row is a dict with the team, games played, wins, ties, losses, byes, points, and Elo.
+    """
+
+    table = {}
+    for team in teams:
+        table[team] = {
+            'team': team,
+            'played': 0,
+            'wins': 0,
+            'ties': 0,
+            'losses': 0,
+            'byes': 0,
+            'points': 0,
+            'elo': INITIAL_ELO,
+        }
+
+    # Elo depends on the order of games, so always apply them in schedule order.
+    for result in sorted(results, key = _resultOrder):
+        # Results files may have games for teams that are no longer entered.
+        if (result.get('bye')):
+            resultTeams = [result['team']]
+        else:
+            resultTeams = [result['red'], result['blue']]
+
+        if (any([team not in table for team in resultTeams])):
+            continue
+
+        if (result.get('bye')):
+            table[result['team']]['byes'] += 1
+            table[result['team']]['points'] += result['points']
+            continue
+
+        red = table[result['red']]
+        blue = table[result['blue']]
+
+        redScore = 0.5
+        if (result['score'] > 0):
+            redScore = 1.0
+        elif (result['score'] < 0):
+            redScore = 0.0
+
+        for (row, score) in [(red, redScore), (blue, 1.0 - redScore)]:
+            row['played'] += 1
+
+            if (score == 1.0):
+                row['wins'] += 1
+                row['points'] += WIN_POINTS
+            elif (score == 0.0):
+                row['losses'] += 1
+                row['points'] += LOSS_POINTS
+            else:
+                row['ties'] += 1
+                row['points'] += TIE_POINTS
+
+        expectedRed = 1.0 / (1.0 + 10.0 ** ((blue['elo'] - red['elo']) / 400.0))
+        change = ELO_K * (redScore - expectedRed)
+
+        red['elo'] += change
+        blue['elo'] -= change
+
+    return sorted(table.values(), key = lambda row: (-row['points'], -row['elo'], row['team']))
+
+def _resultOrder(result):
+    if (result.get('bye')):
+        return (result['round'], '', '', '', -1)
+
+    return matchKey(result)
+
+def loadResults(path):
+    """
+    Load all the results from a results file (one JSON object per line).
+    A partially written last line (from an interrupted run) is ignored,
+    and so is the tournament seed (see `loadSeed`).
+    """
+
+    return [record for record in _loadRecords(path) if (not _isSeedRecord(record))]
+
+def loadSeed(path):
+    """
+    Get the tournament seed saved in a results file, or None if there is not one.
+    """
+
+    for record in _loadRecords(path):
+        if (_isSeedRecord(record)):
+            return record['tournamentSeed']
+
+    return None
+
+def _loadRecords(path):
+    records = []
+    if (not os.path.isfile(path)):
+        return records
+
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if (line == ''):
+                continue
+
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logging.warning('Skipping malformed result line in %s.' % (path))
+
+    return records
+
+def _isSeedRecord(record):
+    return ('tournamentSeed' in record)
+
+def runTournament(teams, layouts, numGames = 1, tournamentFormat = FORMAT_ROUND_ROBIN,
+        numRounds = None, length = 1200, seed = None, workers = 1,
+        resultsPath = DEFAULT_RESULTS_PATH, workerLoggingLevel = logging.WARNING):
+    """
+    Run (or resume) a tournament and return the final standings
+    (see `computeStandings`).
+    """
+
+    if (len(set(teams)) != len(teams)):
+        raise ValueError('Each team may only be entered once.')
+
+    if (len(teams) < 2):
+        raise ValueError('A tournament needs at least two teams.')
+
+    # Without a seed, use the one that an earlier run of this tournament drew (if any),
+    # so the games that are left get the same seeds.
+    saveSeed = False
+    if (seed is None):
+        seed = loadSeed(resultsPath)
+
+    if (seed is None):
+        seed = random.randint(0, 2**32)
+        saveSeed = True
+
+    results = loadResults(resultsPath)
+    if (len(results) > 0):
+        logging.info('Resuming tournament with %d existing results.' % (len(results)))
+
+    if (tournamentFormat == FORMAT_SWISS and numRounds is None):
+        numRounds = int(math.ceil(math.log2(len(teams))))
+
+    pool = multiprocessing.Pool(max(1, workers), initializer = updateLoggingLevel,
+            initargs = (workerLoggingLevel, ))
+
+    try:
+        with open(resultsPath, 'a') as resultsFile:
+            if (saveSeed):
+                resultsFile.write(json.dumps({'tournamentSeed': seed}) + '\n')
+                resultsFile.flush()
+
+            if (tournamentFormat == FORMAT_ROUND_ROBIN):
+                matches = scheduleRoundRobin(teams, layouts, numGames)
+                _playMatches(pool, matches, results, resultsFile, seed, length)
+            elif (tournamentFormat == FORMAT_SWISS):
+                for roundIndex in range(numRounds):
+                    roundResults = [result for result in results if result['round'] < roundIndex]
+                    matches, bye = scheduleSwissRound(roundIndex, teams, layouts, numGames,
+                            roundResults)
+
+                    logging.info('Swiss round %d: %d games.' % (roundIndex + 1, len(matches)))
+
+                    if (bye is not None and not _hasBye(results, roundIndex, bye)):
+                        result = {
+                            'round': roundIndex,
+                            'bye': True,
+                            'team': bye,
+                            'points': byePoints(layouts, numGames),
+                        }
+
+                        _saveResult(result, results, resultsFile)
+
+                    _playMatches(pool, matches, results, resultsFile, seed, length)
+            else:
+                raise ValueError('Unknown tournament format: %s.' % (tournamentFormat))
+    finally:
+        pool.close()
+        pool.join()
+
+    standings = computeStandings(teams, results)
+    _logStandings(standings)
+
+    return standings
+
+def _hasBye(results, roundIndex, team):
+    for result in results:
+        if (result.get('bye') and result['round'] == roundIndex and result['team'] == team):
+            return True
+
+    return False
+
+def _playMatches(pool, matches, results, resultsFile, seed, length):
+    done = {matchKey(result) for result in results if not result.get('bye')}
+
+    pending = []
+    for match in matches:
+        if (matchKey(match) in done):
+            continue
+
+        match['seed'] = _matchSeed(seed, match)
+        match['length'] = length
+        pending.append(match)
+
+    logging.info('Playing %d games (%d already played).' %
+            (len(pending), len(matches) - len(pending)))
+
+    for result in pool.imap_unordered(playMatch, pending):
+        logging.info('%s (red) vs %s (blue) on %s: %d' %
+                (result['red'], result['blue'], result['layout'], result['score']))
+        _saveResult(result, results, resultsFile)
+
+def _saveResult(result, results, resultsFile):
+    results.append(result)
+    resultsFile.write(json.dumps(result) + '\n')
+    resultsFile.flush()
+
+def _logStandings(standings):
+    logging.info('%4s  %-40s %6s %4s %4s %4s %6s %7s' %
+            ('Rank', 'Team', 'Played', 'W', 'T', 'L', 'Points', 'Elo'))
+
+    for (rank, row) in enumerate(standings):
+        values = (rank + 1, row['team'], row['played'], row['wins'], row['ties'],
+                row['losses'], row['points'], row['elo'])
+        logging.info('%4d  %-40s %6d %4d %4d %4d %6d %7.1f' % values)
+
+def readCommand(argv):
+    """
+    Processes the command used to run a tournament from the command line.
+    """
+
+    description = """
+    DESCRIPTION:
+        This program will run a tournament between capture teams.
+        Teams are specified the same way as in capture (a module with a createTeam() function).
+        Results are appended to the results file as games finish,
+        and games already in the results file are not played again.
+
+    EXAMPLES:
+        (1) python -m pacai.bin.tournament pacai.core.baselineTeam pacai.student.myTeam
+            - Plays a round-robin between the baseline team and pacai.student.myTeam.
+        (2) python -m pacai.bin.tournament teamA teamB teamC --format swiss
+                --layouts defaultCapture,RANDOM13 --workers 8
+            - Plays a Swiss tournament on two layouts with 8 worker processes.
+    """
+
+    parser = argparse.ArgumentParser(description = textwrap.dedent(description),
+        prog = os.path.basename(__file__), formatter_class = argparse.RawTextHelpFormatter)
+
+    parser.add_argument('teams', metavar = 'TEAM',
+            action = 'store', type = str, nargs = '+',
+            help = 'a team module to enter in the tournament')
+
+    parser.add_argument('-d', '--debug', dest = 'debug',
+            action = 'store_true', default = False,
+            help = 'set logging level to debug (default: %(default)s)')
+
+    parser.add_argument('-l', '--layouts', dest = 'layouts',
+            action = 'store', type = str, default = 'defaultCapture',
+            help = 'comma separated capture layouts, RANDOM<seed> for a seeded random map\n'
+                + 'or RANDOM for a different random map each game (default: %(default)s)')
+
+    parser.add_argument('-n', '--num-games', dest = 'numGames',
+            action = 'store', type = int, default = 1,
+            help = 'games per pairing, layout, and color (default: %(default)s)')
+
+    parser.add_argument('-q', '--quiet', dest = 'quiet',
+            action = 'store_true', default = False,
+            help = 'set logging level to warning (default: %(default)s)')
+
+    parser.add_argument('-s', '--seed', dest = 'seed',
+            action = 'store', type = int, default = None,
+            help = 'Enter seed value to randomize the games')
+
+    parser.add_argument('--format', dest = 'format',
+            action = 'store', type = str, default = FORMAT_ROUND_ROBIN,
+            choices = [FORMAT_ROUND_ROBIN, FORMAT_SWISS], help = 'the tournament format')
+
+    parser.add_argument('--max-moves', dest = 'maxMoves',
+            action = 'store', type = int, default = 1200,
+            help = 'set maximum number of moves in a game (default: %(default)s)')
+
+    parser.add_argument('--results', dest = 'results',
+            action = 'store', type = str, default = DEFAULT_RESULTS_PATH,
+            help = 'the results file to append to (and resume from) (default: %(default)s)')
+
+    parser.add_argument('--rounds', dest = 'rounds',
+            action = 'store', type = int, default = None,
+            help = 'the number of Swiss rounds (default: log2 of the number of teams)')
+
+    parser.add_argument('--workers', dest = 'workers',
+            action = 'store', type = int, default = os.cpu_count(),
+            help = 'the number of worker processes to play games with (default: %(default)s)')
+
+    options, otherjunk = parser.parse_known_args(argv)
+
+    if len(otherjunk) != 0:
+        raise ValueError('Unrecognized options: \'%s\'.' % (str(otherjunk)))
+
+    # Set the logging level.
+    if options.quiet and options.debug:
+        raise ValueError('Logging cannont be set to both debug and quiet.')
+
+    # Games are noisy, so workers only log warnings unless debugging.
+    workerLoggingLevel = logging.WARNING
+
+    if options.quiet:
+        updateLoggingLevel(logging.WARNING)
+    elif options.debug:
+        updateLoggingLevel(logging.DEBUG)
+        workerLoggingLevel = logging.DEBUG
+
+    for layout in options.layouts.split(','):
+        if (not layout.startswith('RANDOM') and layout.lower().find('capture') == -1):
+            raise ValueError('You must use capture layouts in a tournament.')
+
+    return {
+        'teams': options.teams,
+        'layouts': options.layouts.split(','),
+        'numGames': options.numGames,
+        'tournamentFormat': options.format,
+        'numRounds': options.rounds,
+        'length': options.maxMoves,
+        'seed': options.seed,
+        'workers': options.workers,
+        'resultsPath': options.results,
+        'workerLoggingLevel': workerLoggingLevel,
+    }
+
+def main(argv):
+    """
+    Entry point for a tournament.
+    The args are a blind pass of `sys.argv` with the executable stripped.
+    """
+
+    initLogging()
+
+    args = readCommand(argv)
+    return runTournament(**args)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
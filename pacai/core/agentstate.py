@@ -23,6 +23,9 @@ class AgentState:
         self._isPacman = isPacman
         self._scaredTimer = 0
 
+        # Keep a copy of the hash, any modifications should clear it.
+        self._hash = None
+
     def copy(self):
         state = AgentState(self._startPosition, self._startDirection, self._startIsPacman)
 
@@ -30,11 +33,13 @@ class AgentState:
         state._position = self._position
         state._direction = self._direction
         state._scaredTimer = self._scaredTimer
+        state._hash = self._hash
 
         return state
 
     def decrementScaredTimer(self):
         self._scaredTimer = max(0, self._scaredTimer - 1)
+        self._hash = None
 
     def getDirection(self):
         return self._direction
@@ -48,6 +53,26 @@ class AgentState:
     def getScaredTimer(self):
         return self._scaredTimer
 
+    def getUndoRecord(self):
+        """
+        Get everything about this agent that a move can change as a tuple
+        (cheaper than `AgentState.copy`), see `AgentState.restoreUndoRecord`.
+        """
+
+        return (self._position, self._direction, self._isPacman, self._scaredTimer, self._hash)
+
+    def getSnapshot(self):
+        """
+        Get the parts of this agent that change during a game as a JSON-friendly list.
+        See `AgentState.restoreSnapshot`.
+        """
+
+        position = None
+        if (self._position is not None):
+            position = list(self._position)
+
+        return [position, self._direction, self._isPacman, self._scaredTimer]
+
     def isBraveGhost(self):
         """
         A ghost that is not scared.
@@ -69,9 +94,11 @@ class AgentState:
 
     def setIsPacman(self, isPacman):
         self._isPacman = isPacman
+        self._hash = None
 
     def setScaredTimer(self, timer):
         self._scaredTimer = timer
+        self._hash = None
 
     def snapToNearestPoint(self):
         """
@@ -79,6 +106,7 @@ class AgentState:
         """
 
         self._position = util.nearestPoint(self._position)
+        self._hash = None
 
     def respawn(self):
         """
@@ -89,6 +117,27 @@ class AgentState:
         self._direction = self._startDirection
         self._isPacman = self._startIsPacman
         self._scaredTimer = 0
+        self._hash = None
+
+    def restoreSnapshot(self, snapshot):
+        """
+        Put this agent back into the state described by `AgentState.getSnapshot`.
+        """
+
+        position, self._direction, self._isPacman, self._scaredTimer = snapshot
+
+        self._position = None
+        if (position is not None):
+            self._position = tuple(position)
+
+        self._hash = None
+
+    def restoreUndoRecord(self, record):
+        """
+        Put this agent back to how it was when `AgentState.getUndoRecord` was called.
+        """
+
+        self._position, self._direction, self._isPacman, self._scaredTimer, self._hash = record
 
     def updatePosition(self, vector):
         """
@@ -105,6 +154,8 @@ class AgentState:
             # If this is a zero vector, face the same direction as before.
             self._direction = direction
 
+        self._hash = None
+
     def __eq__(self, other):
         if (other is None):
             return False
@@ -115,7 +166,11 @@ class AgentState:
                 and self._scaredTimer == other._scaredTimer)
 
     def __hash__(self):
-        return util.buildHash(self._position, self._direction, self._isPacman, self._scaredTimer)
+        if (self._hash is None):
+            self._hash = util.buildHash(self._position, self._direction, self._isPacman,
+                    self._scaredTimer)
+
+        return self._hash
 
     def __str__(self):
         typeString = 'Ghost'
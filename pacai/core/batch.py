@@ -0,0 +1,405 @@
+"""
+Run many classic pacman games at once.
+
+`PacmanBatch` advances a batch of independent games on the same layout in lockstep.
+It follows exactly the same rules as `pacai.bin.pacman.PacmanGameState`,
+but keeps every game in flat per-field lists (positions, directions, scared timers, scores)
+and bitboards (food and capsules) that are updated in place.
+So a step does not build any successor states or copy any agent states,
+which is where most of the time goes when an agent needs millions of transitions.
+
+Positions are stored in half steps (a scared ghost moves half a square per turn),
+so all the arithmetic stays in integers.
+"""
+
+from pacai.bin import pacman
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+# Directions are stored as an index into this list.
+DIRECTIONS = [
+    Directions.NORTH,
+    Directions.SOUTH,
+    Directions.EAST,
+    Directions.WEST,
+    Directions.STOP,
+]
+DIRECTION_CODES = {direction: code for (code, direction) in enumerate(DIRECTIONS)}
+STOP = DIRECTION_CODES[Directions.STOP]
+
+# Movement vectors (in whole squares) and reverse of each direction code.
+VECTORS = [Actions.directionToVector(direction, 1) for direction in DIRECTIONS]
+REVERSE = [DIRECTION_CODES[Directions.REVERSE[direction]] for direction in DIRECTIONS]
+
+# Agents within this many half steps (manhattan) collide
+# (see `pacai.bin.pacman.COLLISION_TOLERANCE`).
+COLLISION_HALF_STEPS = int(pacman.COLLISION_TOLERANCE * 2)
+
+class PacmanBatch(object):
+    """
+    A batch of classic pacman games on one layout.
+
+    Every call to `PacmanBatch.step` moves the same agent in every game that is not over.
+    Games are numbered from zero, and agents use the same indexes as in a single game
+    (pacman is `pacai.bin.pacman.PACMAN_AGENT_INDEX`).
+
+    Use `PacmanBatch.getState` to get any game as a regular
+    `pacai.bin.pacman.PacmanGameState` (e.g. for feature extractors),
+    and `PacmanBatch.setState` to load a regular state into the batch.
+    """
+
+    def __init__(self, layout, numGames):
+        self._layout = layout
+        self._numGames = numGames
+
+        self._width = layout.getWidth()
+        self._height = layout.getHeight()
+        self._walls = layout.walls
+
+        self._initialState = pacman.PacmanGameState(layout)
+        self._numAgents = self._initialState.getNumAgents()
+
+        # The first legal actions (in `Actions.getPossibleActions` order) of each square,
+        # built as squares are visited.
+        self._possibleActions = {}
+        self._ghostActions = {}
+
+        self._capsules = list(layout.capsules)
+        self._capsuleBits = {capsule: 1 << index for (index, capsule) in enumerate(self._capsules)}
+        self._initialCapsuleBits = (1 << len(self._capsules)) - 1
+
+        # Where each agent starts (and respawns).
+        self._startX = []
+        self._startY = []
+        self._startDirection = []
+        for agentState in self._initialState.getAgentStates():
+            x, y = agentState.getPosition()
+            self._startX.append(int(x * 2))
+            self._startY.append(int(y * 2))
+            self._startDirection.append(DIRECTION_CODES[agentState.getDirection()])
+
+        # Per game.
+        self._food = [0] * numGames
+        self._numFood = [0] * numGames
+        self._capsuleMask = [0] * numGames
+        self._score = [0] * numGames
+        self._over = [False] * numGames
+        self._win = [False] * numGames
+        self._lastAgentMoved = [None] * numGames
+
+        # Per game and agent, at `game * numAgents + agentIndex`.
+        size = numGames * self._numAgents
+        self._x = [0] * size
+        self._y = [0] * size
+        self._direction = [STOP] * size
+        self._scaredTimer = [0] * size
+
+        self.reset()
+
+    def getLegalActions(self, agentIndex):
+        """
+        Get the legal actions for an agent in each game.
+        Games that are over have no legal actions.
+        """
+
+        actions = []
+        for game in range(self._numGames):
+            if (self._over[game]):
+                actions.append([])
+                continue
+
+            codes = self._getLegalCodes(game, agentIndex)
+            actions.append([DIRECTIONS[code] for code in codes])
+
+        return actions
+
+    def getNumAgents(self):
+        return self._numAgents
+
+    def getNumGames(self):
+        return self._numGames
+
+    def getScores(self):
+        return list(self._score)
+
+    def getSnapshot(self, game):
+        """
+        Get a game in the same form as `pacai.core.gamestate.AbstractGameState.getSnapshot`.
+        """
+
+        agents = []
+        for agentIndex in range(self._numAgents):
+            index = game * self._numAgents + agentIndex
+            position = [_fromHalfSteps(self._x[index]), _fromHalfSteps(self._y[index])]
+
+            agents.append([position, DIRECTIONS[self._direction[index]],
+                    agentIndex == pacman.PACMAN_AGENT_INDEX, self._scaredTimer[index]])
+
+        capsules = [list(capsule) for capsule in self._capsules
+                if (self._capsuleMask[game] & self._capsuleBits[capsule])]
+
+        return {
+            'score': self._score[game],
+            'gameover': self._over[game],
+            'win': self._win[game],
+            'lastAgentMoved': self._lastAgentMoved[game],
+            'food': self._food[game],
+            'capsules': capsules,
+            'agents': agents,
+        }
+
+    def getState(self, game):
+        """
+        Get a game as a `pacai.bin.pacman.PacmanGameState`.
+        """
+
+        state = self._initialState.copy()
+        state.restoreSnapshot(self.getSnapshot(game))
+        return state
+
+    def isLose(self, game):
+        return self._over[game] and not self._win[game]
+
+    def isOver(self, game):
+        return self._over[game]
+
+    def isWin(self, game):
+        return self._over[game] and self._win[game]
+
+    def reset(self, games = None):
+        """
+        Put games (all of them by default) back to the start of the layout.
+        """
+
+        if (games is None):
+            games = range(self._numGames)
+
+        initialFood = self._initialState.getFood()
+
+        for game in games:
+            self._food[game] = initialFood.getBits()
+            self._numFood[game] = initialFood.count()
+            self._capsuleMask[game] = self._initialCapsuleBits
+            self._score[game] = 0
+            self._over[game] = False
+            self._win[game] = False
+            self._lastAgentMoved[game] = None
+
+            for agentIndex in range(self._numAgents):
+                self._respawn(game * self._numAgents + agentIndex, agentIndex)
+
+    def setState(self, game, state):
+        """
+        Load a `pacai.bin.pacman.PacmanGameState` (from this batch's layout) into a game.
+        """
+
+        snapshot = state.getSnapshot()
+
+        self._food[game] = snapshot['food']
+        self._numFood[game] = state.getNumFood()
+        self._score[game] = snapshot['score']
+        self._over[game] = snapshot['gameover']
+        self._win[game] = snapshot['win']
+        self._lastAgentMoved[game] = snapshot['lastAgentMoved']
+
+        self._capsuleMask[game] = 0
+        for capsule in snapshot['capsules']:
+            self._capsuleMask[game] |= self._capsuleBits[tuple(capsule)]
+
+        for (agentIndex, agentSnapshot) in enumerate(snapshot['agents']):
+            position, direction, isPacman, scaredTimer = agentSnapshot
+
+            index = game * self._numAgents + agentIndex
+            self._x[index] = int(position[0] * 2)
+            self._y[index] = int(position[1] * 2)
+            self._direction[index] = DIRECTION_CODES[direction]
+            self._scaredTimer[index] = scaredTimer
+
+    def step(self, agentIndex, actions):
+        """
+        Have one agent take an action in every game.
+        `actions` has one action per game, the actions for games that are over are ignored.
+        Returns the change in score for each game.
+        Like `pacai.bin.pacman.PacmanGameState.generateSuccessor`,
+        this raises a ValueError for an illegal action.
+        """
+
+        if (len(actions) != self._numGames):
+            raise ValueError('Expected %d actions, got %d.' % (self._numGames, len(actions)))
+
+        isPacman = (agentIndex == pacman.PACMAN_AGENT_INDEX)
+
+        # Check every action before moving anyone, so an illegal action leaves the batch as it was.
+        codes = [None] * self._numGames
+        for game in range(self._numGames):
+            if (self._over[game]):
+                continue
+
+            codes[game] = DIRECTION_CODES.get(actions[game])
+            if (codes[game] not in self._getLegalCodes(game, agentIndex)):
+                kind = 'pacman' if isPacman else 'ghost'
+                raise ValueError('Illegal %s action: %s' % (kind, str(actions[game])))
+
+        rewards = [0] * self._numGames
+
+        for game in range(self._numGames):
+            if (codes[game] is None):
+                continue
+
+            oldScore = self._score[game]
+
+            if (isPacman):
+                self._movePacman(game, codes[game])
+            else:
+                self._moveGhost(game, agentIndex, codes[game])
+
+            self._lastAgentMoved[game] = agentIndex
+            rewards[game] = self._score[game] - oldScore
+
+        return rewards
+
+    def _checkDeath(self, game, agentIndex):
+        """
+        See `pacai.bin.pacman.GhostRules.checkDeath`.
+        """
+
+        base = game * self._numAgents
+        pacmanX = self._x[base + pacman.PACMAN_AGENT_INDEX]
+        pacmanY = self._y[base + pacman.PACMAN_AGENT_INDEX]
+
+        if (agentIndex == pacman.PACMAN_AGENT_INDEX):
+            ghosts = range(1, self._numAgents)
+        else:
+            ghosts = [agentIndex]
+
+        for ghostIndex in ghosts:
+            index = base + ghostIndex
+            distance = abs(self._x[index] - pacmanX) + abs(self._y[index] - pacmanY)
+            if (distance > COLLISION_HALF_STEPS):
+                continue
+
+            if (self._scaredTimer[index] > 0):
+                # Pacman ate a ghost.
+                self._score[game] += pacman.GHOST_POINTS
+                self._respawn(index, ghostIndex)
+            elif (not self._over[game]):
+                # A ghost ate pacman.
+                self._score[game] += pacman.LOSE_POINTS
+                self._over[game] = True
+                self._win[game] = False
+
+    def _getLegalCodes(self, game, agentIndex):
+        index = game * self._numAgents + agentIndex
+        x = self._x[index]
+        y = self._y[index]
+        direction = self._direction[index]
+
+        # In between grid points, all agents must continue straight.
+        if (x % 2 == 1 or y % 2 == 1):
+            return [direction]
+
+        square = (x // 2, y // 2)
+
+        if (agentIndex == pacman.PACMAN_AGENT_INDEX):
+            return self._getPossibleCodes(square)
+
+        key = (square, direction)
+        if (key not in self._ghostActions):
+            # See `pacai.bin.pacman.GhostRules.getLegalActions`.
+            codes = [code for code in self._getPossibleCodes(square) if (code != STOP)]
+            if (REVERSE[direction] in codes and len(codes) > 1):
+                codes.remove(REVERSE[direction])
+
+            self._ghostActions[key] = codes
+
+        return self._ghostActions[key]
+
+    def _getPossibleCodes(self, square):
+        if (square not in self._possibleActions):
+            # The direction does not matter on a grid point.
+            actions = Actions.getPossibleActions(square, Directions.STOP, self._walls)
+            self._possibleActions[square] = [DIRECTION_CODES[action] for action in actions]
+
+        return self._possibleActions[square]
+
+    def _moveGhost(self, game, agentIndex, code):
+        """
+        See `pacai.bin.pacman.GhostRules`.
+        """
+
+        index = game * self._numAgents + agentIndex
+
+        # Scared ghosts move at half speed (one half step).
+        speed = 2
+        if (self._scaredTimer[index] > 0):
+            speed = 1
+
+        dx, dy = VECTORS[code]
+        self._x[index] += dx * speed
+        self._y[index] += dy * speed
+        if (code != STOP):
+            self._direction[index] = code
+
+        if (self._scaredTimer[index] > 0):
+            self._scaredTimer[index] -= 1
+
+            if (self._scaredTimer[index] == 0):
+                # Snap to the closest point.
+                self._x[index] = _nearestHalfStepPoint(self._x[index])
+                self._y[index] = _nearestHalfStepPoint(self._y[index])
+
+        self._checkDeath(game, agentIndex)
+
+    def _movePacman(self, game, code):
+        """
+        See `pacai.bin.pacman.PacmanRules`.
+        """
+
+        index = game * self._numAgents + pacman.PACMAN_AGENT_INDEX
+
+        dx, dy = VECTORS[code]
+        self._x[index] += dx * 2
+        self._y[index] += dy * 2
+        if (code != STOP):
+            self._direction[index] = code
+
+        # Pacman only ever moves between grid points.
+        x = self._x[index] // 2
+        y = self._y[index] // 2
+        bit = 1 << (x * self._height + y)
+
+        if (self._food[game] & bit):
+            self._food[game] ^= bit
+            self._numFood[game] -= 1
+            self._score[game] += pacman.FOOD_POINTS
+
+            if (self._numFood[game] == 0):
+                self._score[game] += pacman.BOARD_CLEAR_POINTS
+                self._over[game] = True
+                self._win[game] = True
+        elif (self._capsuleMask[game] & self._capsuleBits.get((x, y), 0)):
+            self._capsuleMask[game] ^= self._capsuleBits[(x, y)]
+
+            for ghostIndex in range(1, self._numAgents):
+                self._scaredTimer[game * self._numAgents + ghostIndex] = pacman.SCARED_TIME
+
+        # Penalty for waiting around.
+        self._score[game] -= pacman.TIME_PENALTY
+
+        self._checkDeath(game, pacman.PACMAN_AGENT_INDEX)
+
+    def _respawn(self, index, agentIndex):
+        self._x[index] = self._startX[agentIndex]
+        self._y[index] = self._startY[agentIndex]
+        self._direction[index] = self._startDirection[agentIndex]
+        self._scaredTimer[index] = 0
+
+def _fromHalfSteps(value):
+    if (value % 2 == 0):
+        return value // 2
+
+    return value / 2.0
+
+def _nearestHalfStepPoint(value):
+    # Same as `pacai.util.util.nearestPoint` (int(x + 0.5)), in half steps.
+    return ((value + 1) // 2) * 2
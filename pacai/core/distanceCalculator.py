@@ -1,7 +1,13 @@
-import sys
+import array
+import hashlib
+import logging
+import mmap
+import operator
+import os
+import struct
+import tempfile
 
 from pacai.core.distance import manhattan
-from pacai.util import priorityQueue
 
 DEFAULT_DISTANCE = 10000
 
@@ -47,12 +53,63 @@ class Distancer(object):
 
         return bestDistance
 
+    def getDistanceMatrix(self, sources, targets):
+        """
+        Get the distance from every source to every target.
+        The result is a list (in the same order as sources) of lists (in the same order as targets).
+        """
+
+        sources = list(sources)
+        targets = list(targets)
+
+        if (self._distances is not None):
+            try:
+                return self._distances.getDistanceMatrix(sources, targets)
+            except KeyError:
+                # Some positions are not on the grid (e.g. agents between two cells).
+                pass
+
+        return [[self.getDistance(source, target) for target in targets] for source in sources]
+
     def getDistanceOnGrid(self, pos1, pos2):
-        key = (pos1, pos2)
-        if key in self._distances:
-            return self._distances[key]
+        try:
+            return self._distances.getDistance(pos1, pos2)
+        except KeyError:
+            raise Exception("Position not in grid: " + str((pos1, pos2)))
 
-        raise Exception("Position not in grid: " + str(key))
+    def getDistancesFrom(self, pos, targets):
+        """
+        Get the distance from one position to each of the targets (in the same order).
+        This does a single row lookup in the distance table instead of one lookup per target.
+        """
+
+        targets = list(targets)
+
+        if (self._distances is not None):
+            try:
+                return self._distances.getDistancesFrom(pos, targets)
+            except KeyError:
+                # Some positions are not on the grid (e.g. agents between two cells).
+                pass
+
+        return [self.getDistance(pos, target) for target in targets]
+
+    def getNearest(self, pos, targets):
+        """
+        Get the closest target to a position.
+        Returns a tuple of (target, distance).
+        Ties go to the target that appears first.
+        Like `min()`, this raises a ValueError if there are no targets.
+        """
+
+        targets = list(targets)
+        if (len(targets) == 0):
+            raise ValueError('No targets to find the nearest of.')
+
+        distances = self.getDistancesFrom(pos, targets)
+        index = min(range(len(distances)), key = distances.__getitem__)
+
+        return (targets[index], distances[index])
 
     def isReadyForMazeDistance(self):
         return (self._distances is not None)
@@ -78,79 +135,279 @@ def getGrids1D(x):
 # MACHINERY FOR COMPUTING MAZE DISTANCES #
 ##########################################
 
+# Set this environment variable to change where distance tables are cached on disk.
+# Set it to an empty string to disable the disk cache.
+CACHE_DIR_ENV = 'PACAI_DISTANCE_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'pacai-distances')
+
+CACHE_MAGIC = b'PACD'
+CACHE_VERSION = 1
+CACHE_HEADER_FORMAT = '=4sHHQ'
+CACHE_HEADER_SIZE = 16
+
+# Distance tables that have already been loaded, keyed by wall key.
+# Tables are read-only, so every agent/game in this process on the same walls can share them.
 distanceMap = {}
 
 class DistanceCalculator:
     def __init__(self, layout, distancer):
         self.layout = layout
         self.distancer = distancer
-        self.cache = {}
 
     def run(self):
-        if self.layout.walls not in self.cache:
-            self.cache[self.layout.walls] = computeDistances(self.layout)
+        self.distancer._distances = getDistanceTable(self.layout)
 
-        self.distancer._distances = self.cache[self.layout.walls]
-
-def computeDistances(layout):
+class DistanceTable(object):
     """
-    Runs UCS to all other positions from each position.
+    All-pairs maze distances for a set of walls.
+
+    Every open cell gets an integer id (in the order of `pacai.core.grid.Grid.asList`),
+    and the distances are stored in a dense, flat array where the distance
+    from cell i to cell j is at `i * numCells + j`.
+    Unreachable pairs hold `DEFAULT_DISTANCE`.
     """
 
-    distances = {}
-    allNodes = layout.walls.asList(False)
+    def __init__(self, walls, distances = None):
+        self._cells = walls.asList(False)
+        self._cellIds = {cell: index for (index, cell) in enumerate(self._cells)}
+        self._numCells = len(self._cells)
+
+        if (distances is None):
+            distances = self._computeDistances(walls)
+
+        self._distances = distances
+
+    def getCells(self):
+        """
+        Get all the open cells, the index of each cell is its id.
+        """
+
+        return self._cells
+
+    def getCellId(self, position):
+        """
+        Get the id of an open cell, or None if the position is not an open cell.
+        """
+
+        return self._cellIds.get(position)
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two open cells.
+        Raises a KeyError if either position is not an open cell.
+        """
+
+        return self._distances[self._cellIds[pos1] * self._numCells + self._cellIds[pos2]]
+
+    def getDistanceMatrix(self, sources, targets):
+        """
+        Get the distances from every source to every target.
+        Raises a KeyError if any position is not an open cell.
+        """
+
+        targetIds = [self._cellIds[target] for target in targets]
+        return [self._getRowValues(source, targetIds) for source in sources]
+
+    def getDistances(self):
+        """
+        Get the flat distance array (see the class description for the layout).
+        """
+
+        return self._distances
+
+    def getDistancesFrom(self, position, targets):
+        """
+        Get the distances from a position to each target.
+        Raises a KeyError if any position is not an open cell.
+        """
+
+        return self._getRowValues(position, [self._cellIds[target] for target in targets])
 
-    for source in allNodes:
-        dist = {}
-        closed = {}
+    def getNumCells(self):
+        return self._numCells
 
-        for node in allNodes:
-            dist[node] = sys.maxsize
+    def _getRowValues(self, position, targetIds):
+        if (len(targetIds) == 0):
+            return []
 
-        queue = priorityQueue.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
+        offset = self._cellIds[position] * self._numCells
+        row = self._distances[offset:offset + self._numCells]
 
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
-                continue
+        # itemgetter does all the lookups in one call, but returns a bare value for a single id.
+        if (len(targetIds) == 1):
+            return [row[targetIds[0]]]
 
-            closed[node] = True
-            nodeDist = dist[node]
+        return list(operator.itemgetter(*targetIds)(row))
+
+    def _computeDistances(self, walls):
+        """
+        Run a BFS from every open cell.
+        All moves cost one, so BFS gives the same result as UCS without any heap.
+        """
+
+        numCells = self._numCells
+
+        neighbors = []
+        for (x, y) in self._cells:
             adjacent = []
-            x, y = node
+            for position in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if (position in self._cellIds):
+                    adjacent.append(self._cellIds[position])
+
+            neighbors.append(adjacent)
+
+        typecode = 'H'
+        if (numCells >= DEFAULT_DISTANCE):
+            typecode = 'I'
+
+        distances = array.array(typecode, [DEFAULT_DISTANCE]) * (numCells * numCells)
+
+        for source in range(numCells):
+            offset = source * numCells
+            distances[offset + source] = 0
+
+            seen = bytearray(numCells)
+            seen[source] = 1
+
+            frontier = [source]
+            depth = 0
+
+            while (len(frontier) > 0):
+                depth += 1
+                nextFrontier = []
 
-            if not layout.isWall((x, y + 1)):
-                adjacent.append((x, y + 1))
+                for node in frontier:
+                    for other in neighbors[node]:
+                        if (not seen[other]):
+                            seen[other] = 1
+                            distances[offset + other] = depth
+                            nextFrontier.append(other)
 
-            if not layout.isWall((x, y - 1)):
-                adjacent.append((x, y - 1))
+                frontier = nextFrontier
 
-            if not layout.isWall((x + 1, y)):
-                adjacent.append((x + 1, y))
+        return distances
 
-            if not layout.isWall((x - 1, y)):
-                adjacent.append((x - 1, y))
+def getDistanceTable(layout):
+    """
+    Get the (shared) `DistanceTable` for a layout's walls.
+    Tables are first looked for in this process, then in the on-disk cache,
+    and are only computed when neither has them.
+    """
+
+    return getWallsDistanceTable(layout.walls)
+
+def getWallsDistanceTable(walls):
+    """
+    Get the (shared) `DistanceTable` for a set of walls (see `getDistanceTable`).
+    """
 
-            for other in adjacent:
-                if other not in dist:
-                    continue
+    key = getWallKey(walls)
+
+    if (key in distanceMap):
+        return distanceMap[key]
+
+    table = _loadDistanceTable(walls, key)
+    if (table is None):
+        table = DistanceTable(walls)
+        _saveDistanceTable(table, key)
+
+    distanceMap[key] = table
+    return table
+
+def getWallKey(walls):
+    """
+    Get a string that uniquely identifies a set of walls.
+    """
 
-                oldDist = dist[other]
-                newDist = nodeDist + 1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
+    text = '%d,%d\n%s' % (walls.getWidth(), walls.getHeight(), str(walls))
+    return hashlib.sha1(text.encode()).hexdigest()
 
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
+def computeDistances(layout):
+    """
+    Computes the maze distance between all pairs of positions in the layout.
+    """
 
-    return distances
+    return DistanceTable(layout.walls)
 
 def getDistanceOnGrid(distances, pos1, pos2):
-    key = (pos1, pos2)
-    if key in distances:
-        return distances[key]
+    try:
+        return distances.getDistance(pos1, pos2)
+    except KeyError:
+        return DEFAULT_DISTANCE
+
+def _getCachePath(key):
+    cacheDir = os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+    if (cacheDir == ''):
+        return None
+
+    return os.path.join(cacheDir, '%s.dist' % (key))
+
+def _loadDistanceTable(walls, key):
+    """
+    Load a distance table from the disk cache.
+    The distances are memory-mapped, not read into memory.
+    Returns None if there is no usable cache entry.
+    """
+
+    path = _getCachePath(key)
+    if (path is None or not os.path.isfile(path)):
+        return None
+
+    try:
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError) as ex:
+        logging.debug('Unable to open distance cache (%s): %s.' % (path, ex))
+        return None
+
+    # A write that was cut short (or a damaged file) may not even have a whole header.
+    if (len(data) < CACHE_HEADER_SIZE):
+        logging.debug('Ignoring truncated distance cache: %s.' % (path))
+        return None
+
+    magic, version, itemSize, numCells = struct.unpack_from(CACHE_HEADER_FORMAT, data)
+    typecode = {2: 'H', 4: 'I'}.get(itemSize)
+    expectedSize = CACHE_HEADER_SIZE + (numCells * numCells * itemSize)
+
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION or typecode is None
+            or len(data) != expectedSize):
+        logging.debug('Ignoring invalid distance cache: %s.' % (path))
+        return None
+
+    distances = memoryview(data)[CACHE_HEADER_SIZE:].cast(typecode)
+    table = DistanceTable(walls, distances)
+
+    if (table.getNumCells() != numCells):
+        logging.debug('Ignoring mismatched distance cache: %s.' % (path))
+        return None
+
+    return table
+
+def _saveDistanceTable(table, key):
+    """
+    Write a distance table to the disk cache.
+    Failing to write the cache is not an error.
+    """
+
+    path = _getCachePath(key)
+    if (path is None):
+        return
+
+    distances = table.getDistances()
+    header = struct.pack(CACHE_HEADER_FORMAT, CACHE_MAGIC, CACHE_VERSION,
+            distances.itemsize, table.getNumCells())
+    header += b'\0' * (CACHE_HEADER_SIZE - len(header))
+
+    # Write to a temp file first so readers never see a partial table.
+    tempPath = '%s.%d.tmp' % (path, os.getpid())
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(tempPath, 'wb') as file:
+            file.write(header)
+            file.write(distances.tobytes())
 
-    return DEFAULT_DISTANCE
+        os.replace(tempPath, path)
+    except OSError as ex:
+        logging.debug('Unable to write distance cache (%s): %s.' % (path, ex))
@@ -22,6 +22,9 @@ class Game:
         self.totalAgentTimeWarnings = [0 for agent in agents]
         self.agentTimeout = False
 
+        # A `pacai.core.replay.ReplayWriter` that the game should be recorded to (if any).
+        self.replayWriter = None
+
         self.enforceTimeouts = catchExceptions
         self.catchExceptions = catchExceptions
 
@@ -30,6 +33,13 @@ class Game:
         Main control loop for game play.
         """
 
+        try:
+            return self._run()
+        finally:
+            if (self.replayWriter is not None):
+                self.replayWriter.close(self.state)
+
+    def _run(self):
         self.numMoves = 0
 
         agentIndex = self.startingIndex
@@ -84,6 +94,9 @@ class Game:
             # Allow for game specific conditions (winning, losing, etc.).
             self.rules.process(self.state, self)
 
+            if (self.replayWriter is not None):
+                self.replayWriter.writeAction(agentIndex, action, self.state)
+
             # Track progress.
             if (agentIndex == numAgents + 1):
                 self.numMoves += 1
@@ -3,6 +3,7 @@ import copy
 
 from pacai.core.agentstate import AgentState
 from pacai.core.directions import Directions
+from pacai.core.grid import BitGrid
 from pacai.util import util
 
 class AbstractGameState(abc.ABC):
@@ -22,10 +23,16 @@ class AbstractGameState(abc.ABC):
 
         self._layout = layout
 
-        # Keep a copy of the hash, since it is expensive to compute.
+        # Keep a copy of the hash.
         # Any children should be sure to clear the hash when modifications are made.
         self._hash = None
 
+        # The Zobrist key for the food and capsules left on the board.
+        # This is updated incrementally as things get eaten,
+        # so hashing a state never needs to look at the whole board.
+        self._zobrist = layout.getZobristTable()
+        self._boardKey = self._zobrist.getInitialKey()
+
         # For food and capsules, we will only copy on write (if we eat one of them).
         # This avoid additional copies on successors that don't eat.
 
@@ -47,6 +54,9 @@ class AbstractGameState(abc.ABC):
 
         self._score = 0
 
+        # The undo records for moves made with apply() (created on the first move).
+        self._undoLog = None
+
     @abc.abstractmethod
     def generateSuccessor(self, agentIndex, action):
         """
@@ -64,10 +74,57 @@ class AbstractGameState(abc.ABC):
 
         pass
 
+    def apply(self, agentIndex, action):
+        """
+        Make a move on this state (instead of on a successor, like `generateSuccessor` does).
+        The move can be taken back with `AbstractGameState.undo`.
+
+        This lets a depth-first search walk the game tree on one state:
+        ```
+        state.apply(agentIndex, action)
+        value = search(state)
+        state.undo()
+        ```
+        Each move only records the things it can change (the score, a tuple for each agent,
+        and which food and capsules the state had), nothing gets copied unless food or
+        a capsule is eaten.
+        States made from this one (e.g. with `generateSuccessor`) are not changed by later
+        moves or undos on this one.
+        """
+
+        # Check that successors exist.
+        if (self.isOver()):
+            raise RuntimeError("Can't apply a move to a terminal state.")
+
+        if (self._undoLog is None):
+            self._undoLog = []
+
+        record = self._getUndoRecord()
+
+        # Successors made from this state may share its food and capsules,
+        # so eating copies them (the record keeps the old ones).
+        self._foodCopied = False
+        self._capsulesCopied = False
+
+        try:
+            self._applySuccessorAction(agentIndex, action)
+        except Exception:
+            self._restoreUndoRecord(record)
+            raise
+
+        self._undoLog.append(record)
+
     def addScore(self, score):
         self._hash = None
         self._score += score
 
+    def copy(self):
+        """
+        Get a copy of this state that can be changed without changing this one.
+        """
+
+        return self._initSuccessor()
+
     def eatCapsule(self, x, y):
         """
         Mark the capsule at the given location as eaten.
@@ -82,6 +139,7 @@ class AbstractGameState(abc.ABC):
 
         self._capsules.remove((x, y))
         self._lastCapsuleEaten = (x, y)
+        self._boardKey ^= self._zobrist.getCapsuleKey(x, y)
 
         self._hash = None
         return True
@@ -100,6 +158,7 @@ class AbstractGameState(abc.ABC):
 
         self._food[x][y] = False
         self._lastFoodEaten = (x, y)
+        self._boardKey ^= self._zobrist.getFoodKey(x, y)
 
         self._hash = None
         return True
@@ -139,7 +198,7 @@ class AbstractGameState(abc.ABC):
 
     def getFood(self):
         """
-        Returns a Grid of boolean food indicator variables.
+        Returns a `pacai.core.grid.BitGrid` of boolean food indicator variables.
 
         Grids can be accessed via list notation.
         So to check if there is food at (x, y), just do something like: food[x][y].
@@ -193,6 +252,23 @@ class AbstractGameState(abc.ABC):
     def getScore(self):
         return self._score
 
+    def getSnapshot(self):
+        """
+        Get everything about this state that can change during a game as a JSON-friendly dict.
+        Together with the initial layout, this is enough to rebuild the state
+        (see `AbstractGameState.restoreSnapshot`).
+        """
+
+        return {
+            'score': self._score,
+            'gameover': self._gameover,
+            'win': self._win,
+            'lastAgentMoved': self._lastAgentMoved,
+            'food': self._food.getBits(),
+            'capsules': [list(capsule) for capsule in self._capsules],
+            'agents': [agentState.getSnapshot() for agentState in self._agentStates],
+        }
+
     def getWalls(self):
         """
         Returns a Grid of boolean wall indicator variables.
@@ -235,6 +311,45 @@ class AbstractGameState(abc.ABC):
     def isWin(self):
         return self.isOver() and self._win
 
+    def restoreSnapshot(self, snapshot):
+        """
+        Bring a state to the point described by `AbstractGameState.getSnapshot`.
+        This state must have come from the same layout and not had anything eaten
+        that the snapshot still has.
+        """
+
+        # Eat things (instead of replacing the board) so that everything derived
+        # from the board (like hash keys) stays consistent.
+        food = BitGrid.fromBits(self._food.getWidth(), self._food.getHeight(), snapshot['food'])
+        for (x, y) in self._food.asList():
+            if (not food[x][y]):
+                self.eatFood(x, y)
+
+        capsules = {tuple(capsule) for capsule in snapshot['capsules']}
+        for (x, y) in list(self._capsules):
+            if ((x, y) not in capsules):
+                self.eatCapsule(x, y)
+
+        for (agentState, agentSnapshot) in zip(self._agentStates, snapshot['agents']):
+            agentState.restoreSnapshot(agentSnapshot)
+
+        self._score = snapshot['score']
+        self._gameover = snapshot['gameover']
+        self._win = snapshot['win']
+        self._lastAgentMoved = snapshot['lastAgentMoved']
+
+        self._hash = None
+
+    def undo(self):
+        """
+        Take back the last move made with `AbstractGameState.apply`.
+        """
+
+        if (not self._undoLog):
+            raise RuntimeError('There are no moves to undo.')
+
+        self._restoreUndoRecord(self._undoLog.pop())
+
     def setHighlightLocations(self, locations):
         self._highlightLocations = list(locations)
 
@@ -242,6 +357,18 @@ class AbstractGameState(abc.ABC):
         self._score = score
         self._hash = None
 
+    def _getUndoRecord(self):
+        """
+        Get everything that a move can change, for `AbstractGameState._restoreUndoRecord`.
+        Children that have more state that moves can change should extend this.
+        """
+
+        return (self._score, self._gameover, self._win, self._hash, self._lastAgentMoved,
+                self._boardKey,
+                self._food, self._foodCopied, self._lastFoodEaten,
+                self._capsules, self._capsulesCopied, self._lastCapsuleEaten,
+                [agentState.getUndoRecord() for agentState in self._agentStates])
+
     def _initSuccessor(self):
         """
         Get a state that will eventually serve as a successor.
@@ -259,8 +386,23 @@ class AbstractGameState(abc.ABC):
         # Agent states need to be deep copied.
         successor._agentStates = [agentState.copy() for agentState in self._agentStates]
 
+        # Moves made on this state cannot be undone on the successor.
+        successor._undoLog = None
+
         return successor
 
+    def _restoreUndoRecord(self, record):
+        (
+            self._score, self._gameover, self._win, self._hash, self._lastAgentMoved,
+            self._boardKey,
+            self._food, self._foodCopied, self._lastFoodEaten,
+            self._capsules, self._capsulesCopied, self._lastCapsuleEaten,
+            agentRecords,
+        ) = record
+
+        for (agentState, agentRecord) in zip(self._agentStates, agentRecords):
+            agentState.restoreUndoRecord(agentRecord)
+
     def __eq__(self, other):
         if (other is None):
             return False
@@ -288,8 +430,10 @@ class AbstractGameState(abc.ABC):
                 and self._layout == other._layout)
 
     def __hash__(self):
+        # The board key covers the food and capsules and agent states cache their own hashes,
+        # so this does not depend on the size of the board.
         if (self._hash is None):
-            self._hash = util.buildHash(self._score, self._gameover, self._win, *self._capsules,
-                self._food, *self._agentStates, self._layout)
+            self._hash = util.buildHash(self._score, self._gameover, self._win, self._boardKey,
+                *self._agentStates, self._layout)
 
         return self._hash
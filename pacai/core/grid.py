@@ -55,6 +55,9 @@ class Grid:
         if (other is None):
             return False
 
+        if (isinstance(other, BitGrid)):
+            return other == self
+
         return self._data == other._data
 
     def __getitem__(self, i):
@@ -82,3 +85,207 @@ class Grid:
         out = [[str(self._data[x][y])[0] for x in range(self._width)] for y in range(self._height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
+
+class BitGrid(object):
+    """
+    A 2-dimensional array of booleans backed by a single integer bitboard.
+    This has the same `grid[x][y]` read/write interface as `Grid`,
+    but copying, counting, comparing, and hashing do not have to walk every cell.
+
+    The cell at (x, y) is stored in bit `x * height + y`,
+    so a BitGrid hashes the same as a `Grid` with the same contents.
+    """
+
+    def __init__(self, width, height, initialValue = False):
+        if (not isinstance(initialValue, bool)):
+            raise ValueError('Grids can only contain booleans')
+
+        self._width = width
+        self._height = height
+
+        self._bits = 0
+        if (initialValue):
+            self._bits = (1 << (width * height)) - 1
+
+        self._hash = None
+
+    @staticmethod
+    def fromGrid(grid):
+        """
+        Build a BitGrid with the same contents as any grid-like object.
+        """
+
+        bitGrid = BitGrid(grid.getWidth(), grid.getHeight())
+
+        bits = 0
+        for x in range(grid.getWidth()):
+            for y in range(grid.getHeight()):
+                if (grid[x][y]):
+                    bits |= 1 << (x * grid.getHeight() + y)
+
+        bitGrid._bits = bits
+        return bitGrid
+
+    @staticmethod
+    def fromBits(width, height, bits):
+        """
+        Build a BitGrid from a bitboard (see `BitGrid.getBits`).
+        """
+
+        bitGrid = BitGrid(width, height)
+        bitGrid._bits = bits & ((1 << (width * height)) - 1)
+        return bitGrid
+
+    def asList(self, key = True):
+        bits = self._bits
+        if (not key):
+            bits ^= (1 << (self._width * self._height)) - 1
+
+        values = []
+
+        # Walk only the set bits, lowest (and therefore first in x-major order) first.
+        while (bits):
+            lowBit = bits & -bits
+            values.append(self._cellIndexToPosition(lowBit.bit_length() - 1))
+            bits ^= lowBit
+
+        return values
+
+    def copy(self):
+        grid = BitGrid(self._width, self._height)
+        grid._bits = self._bits
+        grid._hash = self._hash
+        return grid
+
+    def count(self, item = True):
+        numSet = _popcount(self._bits)
+        if (item):
+            return numSet
+
+        return self._width * self._height - numSet
+
+    def deepCopy(self):
+        return self.copy()
+
+    def get(self, x, y):
+        """
+        Get the value at (x, y) without going through `grid[x][y]`.
+        """
+
+        return (self._bits >> (x * self._height + y)) & 1 == 1
+
+    def getBits(self):
+        """
+        Get the integer bitboard that backs this grid.
+        """
+
+        return self._bits
+
+    def getHeight(self):
+        return self._height
+
+    def getWidth(self):
+        return self._width
+
+    def set(self, x, y, value):
+        """
+        Set the value at (x, y) without going through `grid[x][y]`.
+        """
+
+        mask = 1 << (x * self._height + y)
+        if (value):
+            self._bits |= mask
+        else:
+            self._bits &= ~mask
+
+        self._hash = None
+
+    def shallowCopy(self):
+        # The backing integer is immutable, so a shallow copy is a full copy.
+        return self.copy()
+
+    def _cellIndexToPosition(self, index):
+        x = index // self._height
+        y = index % self._height
+
+        return x, y
+
+    def __eq__(self, other):
+        if (other is None):
+            return False
+
+        if (isinstance(other, Grid)):
+            other = BitGrid.fromGrid(other)
+
+        if (not isinstance(other, BitGrid)):
+            return False
+
+        return (self._bits == other._bits
+                and self._width == other._width
+                and self._height == other._height)
+
+    def __getitem__(self, x):
+        if (x < 0):
+            x += self._width
+
+        if (x < 0 or x >= self._width):
+            raise IndexError('Grid index out of range: %d.' % (x))
+
+        return _BitGridColumn(self, x)
+
+    def __hash__(self):
+        if (self._hash is None):
+            self._hash = hash(self._bits)
+
+        return self._hash
+
+    def __lt__(self, other):
+        return self.__hash__() < other.__hash__()
+
+    def __setitem__(self, x, column):
+        for y in range(self._height):
+            self.set(x, y, bool(column[y]))
+
+    def __str__(self):
+        out = [[str(self.get(x, y))[0] for x in range(self._width)] for y in range(self._height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+class _BitGridColumn(object):
+    """
+    A view of a single column (fixed x) of a `BitGrid`.
+    This is what makes `grid[x][y]` reads and writes work.
+    """
+
+    __slots__ = ('_grid', '_x')
+
+    def __init__(self, grid, x):
+        self._grid = grid
+        self._x = x
+
+    def __getitem__(self, y):
+        if (y < 0):
+            y += self._grid._height
+
+        if (y < 0 or y >= self._grid._height):
+            raise IndexError('Grid index out of range: %d.' % (y))
+
+        return self._grid.get(self._x, y)
+
+    def __len__(self):
+        return self._grid._height
+
+    def __setitem__(self, y, value):
+        if (y < 0):
+            y += self._grid._height
+
+        if (y < 0 or y >= self._grid._height):
+            raise IndexError('Grid index out of range: %d.' % (y))
+
+        self._grid.set(self._x, y, value)
+
+def _popcount(bits):
+    if (hasattr(bits, 'bit_count')):
+        return bits.bit_count()
+
+    return bin(bits).count('1')
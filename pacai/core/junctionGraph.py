@@ -0,0 +1,440 @@
+"""
+A contracted view of a maze where corridors are collapsed into weighted edges.
+
+Most open cells in a maze have exactly two open neighbors (they are part of a corridor),
+and the only real decisions are made at intersections and dead ends.
+A `JunctionGraph` keeps only those cells (junctions) as nodes,
+and connects them with edges whose weight is the length of the corridor between them.
+Searches on it only ever visit junctions, and paths are expanded back into cardinal
+`pacai.core.directions.Directions` at the end.
+"""
+
+import heapq
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.distance import manhattan
+from pacai.core.distanceCalculator import getWallKey
+
+# Junction graphs that have already been built, keyed by wall key.
+# Graphs are read-only, so every layout/problem in this process on the same walls can share them.
+junctionGraphMap = {}
+
+class JunctionGraph(object):
+    """
+    The junction graph for a set of walls (see the module description).
+
+    Every open cell is either a junction (a cell without exactly two open neighbors)
+    or on exactly one corridor.
+    A corridor runs between two junctions (possibly the same one),
+    and holds the cells between them and the actions that walk from one end to the other.
+    A loop with no junctions on it gets one of its cells picked as a junction.
+
+    All moves cost one, so the distance along a corridor is just the number of steps.
+    """
+
+    def __init__(self, walls):
+        self._walls = walls
+        self._junctions = []
+        self._junctionIds = {}
+
+        # Each corridor is (start junction id, end junction id, positions, actions),
+        # where positions runs from the start junction to the end junction (both included)
+        # and actions[i] moves from positions[i] to positions[i + 1].
+        self._corridors = []
+
+        # Corridor cell -> (corridor id, index into the corridor's positions).
+        self._corridorCells = {}
+
+        # Junction id -> [(other junction id, length, corridor id), ...].
+        self._edges = []
+
+        self._build()
+
+    def findPath(self, start, goal, visit = None):
+        """
+        Get the actions for a shortest path between two open cells,
+        or None if the goal cannot be reached.
+        See `JunctionGraph.search` for `visit`.
+        """
+
+        cost, waypoints = self.search(start, goal, visit)
+        if (waypoints is None):
+            return None
+
+        return self.expandPath(waypoints)
+
+    def expandPath(self, waypoints):
+        """
+        Turn a list of waypoints (like the ones from `JunctionGraph.search`) into actions.
+        Each pair of waypoints in a row must be on the same corridor
+        (or be junctions joined by a corridor, in which case the shortest one is used).
+        """
+
+        actions = []
+        for index in range(1, len(waypoints)):
+            actions += self._getSegment(waypoints[index - 1], waypoints[index])
+
+        return actions
+
+    def getCorridor(self, position):
+        """
+        Get the corridor an open cell is on as (start junction, end junction, length),
+        or None for junctions.
+        """
+
+        if (position not in self._corridorCells):
+            return None
+
+        start, end, positions, actions = self._corridors[self._corridorCells[position][0]]
+        return (self._junctions[start], self._junctions[end], len(actions))
+
+    def getDistance(self, start, goal):
+        """
+        Get the maze distance between two open cells (None if the goal cannot be reached).
+        """
+
+        return self.search(start, goal)[0]
+
+    def getDistancesFrom(self, start):
+        """
+        Get the maze distance from an open cell to every open cell it can reach, as a dict.
+        """
+
+        junctionDistances = self._bestFirstSearch(self._getAnchors(start))[0]
+
+        distances = {junction: junctionDistances[junctionId]
+                for (junctionId, junction) in enumerate(self._junctions)
+                if (junctionDistances[junctionId] is not None)}
+
+        for (startId, endId, positions, actions) in self._corridors:
+            startDistance = junctionDistances[startId]
+            endDistance = junctionDistances[endId]
+            if (startDistance is None):
+                continue
+
+            length = len(actions)
+            for index in range(1, length):
+                distances[positions[index]] = min(startDistance + index,
+                        endDistance + length - index)
+
+        # Cells on the same corridor as the start can also be reached without leaving it.
+        if (start in self._corridorCells):
+            corridorId, startIndex = self._corridorCells[start]
+            positions = self._corridors[corridorId][2]
+
+            for index in range(1, len(positions) - 1):
+                distances[positions[index]] = min(distances[positions[index]],
+                        abs(index - startIndex))
+
+        return distances
+
+    def getJunctions(self):
+        """
+        Get the position of every junction, the index of each one is its id.
+        """
+
+        return self._junctions
+
+    def getNeighbors(self, junction):
+        """
+        Get the junctions joined to a junction by a corridor, as a list of
+        (junction, corridor length, actions along the corridor).
+        A junction with a corridor that loops back to it is not its own neighbor.
+        """
+
+        junctionId = self._junctionIds[junction]
+        neighbors = []
+
+        for (otherId, length, corridorId) in self._edges[junctionId]:
+            if (otherId == junctionId):
+                continue
+
+            neighbors.append((self._junctions[otherId], length,
+                    self._getSegment(junction, self._junctions[otherId], corridorId)))
+
+        return neighbors
+
+    def getNumCorridors(self):
+        return len(self._corridors)
+
+    def getNumJunctions(self):
+        return len(self._junctions)
+
+    def isJunction(self, position):
+        return position in self._junctionIds
+
+    def search(self, start, goal, visit = None):
+        """
+        Run A* (with the manhattan distance) over the junctions
+        to find a shortest path between two open cells.
+        Returns (cost, waypoints) where the waypoints are the start, every junction on the path,
+        and the goal (see `JunctionGraph.expandPath`).
+        Returns (None, None) if the goal cannot be reached.
+
+        If `visit` is given, it is called with the position of each junction as it is expanded.
+        """
+
+        if (not self._isOpen(start) or not self._isOpen(goal)):
+            return (None, None)
+
+        if (start == goal):
+            return (0, [start])
+
+        goalAnchors = self._getAnchors(goal)
+
+        # Both ends on the same corridor, so there is a path that never leaves it.
+        bestCost = None
+        bestJunction = None
+        if (start in self._corridorCells and goal in self._corridorCells):
+            startCorridor, startIndex = self._corridorCells[start]
+            goalCorridor, goalIndex = self._corridorCells[goal]
+
+            if (startCorridor == goalCorridor):
+                bestCost = abs(startIndex - goalIndex)
+
+        def stop(junctionId, distance, priority):
+            nonlocal bestCost, bestJunction
+
+            # Nothing left can beat the best path to the goal.
+            if (bestCost is not None and priority >= bestCost):
+                return True
+
+            if (junctionId in goalAnchors):
+                cost = distance + goalAnchors[junctionId]
+                if (bestCost is None or cost < bestCost):
+                    bestCost = cost
+                    bestJunction = junctionId
+
+            return False
+
+        # Corridors are never shorter than the manhattan distance between their ends.
+        heuristic = lambda junctionId: manhattan(self._junctions[junctionId], goal)
+
+        distances, parents = self._bestFirstSearch(self._getAnchors(start), stop, visit, heuristic)
+
+        if (bestCost is None):
+            return (None, None)
+
+        if (bestJunction is None):
+            return (bestCost, [start, goal])
+
+        route = []
+        junctionId = bestJunction
+        while (junctionId is not None):
+            route.append(self._junctions[junctionId])
+            junctionId = parents[junctionId]
+
+        route.reverse()
+
+        waypoints = [start] + route + [goal]
+        waypoints = [waypoint for (index, waypoint) in enumerate(waypoints)
+                if (index == 0 or waypoint != waypoints[index - 1])]
+
+        return (bestCost, waypoints)
+
+    def _build(self):
+        openCells = self._walls.asList(False)
+
+        for position in openCells:
+            if (len(self._getOpenNeighbors(position)) != 2):
+                self._addJunction(position)
+
+        # (junction, action) for every way out of a junction that already has a corridor.
+        traced = set()
+
+        for junctionId in range(len(self._junctions)):
+            self._traceCorridors(junctionId, traced)
+
+        # Whatever is left is on a loop with no junctions.
+        for position in openCells:
+            if (position in self._junctionIds or position in self._corridorCells):
+                continue
+
+            self._traceCorridors(self._addJunction(position), traced)
+
+    def _addJunction(self, position):
+        junctionId = len(self._junctions)
+
+        self._junctions.append(position)
+        self._junctionIds[position] = junctionId
+        self._edges.append([])
+
+        return junctionId
+
+    def _bestFirstSearch(self, anchors, stop = None, visit = None, heuristic = None):
+        """
+        Run Dijkstra's algorithm (or A* if there is a heuristic, junction id -> estimate)
+        over the junctions from some starting distances (junction id -> distance).
+        `stop(junctionId, distance, priority)` is called as each junction is expanded,
+        and ends the search early when it returns True.
+        Returns (distances, parents) where both are lists indexed by junction id
+        (None for junctions that were not reached).
+        """
+
+        if (heuristic is None):
+            heuristic = lambda junctionId: 0
+
+        distances = [None] * len(self._junctions)
+        parents = [None] * len(self._junctions)
+        done = [False] * len(self._junctions)
+
+        frontier = []
+        for (junctionId, distance) in anchors.items():
+            distances[junctionId] = distance
+            heapq.heappush(frontier, (distance + heuristic(junctionId), distance, junctionId))
+
+        while (len(frontier) > 0):
+            priority, distance, junctionId = heapq.heappop(frontier)
+            if (done[junctionId]):
+                continue
+
+            if (stop is not None and stop(junctionId, distance, priority)):
+                break
+
+            done[junctionId] = True
+            if (visit is not None):
+                visit(self._junctions[junctionId])
+
+            for (otherId, length, corridorId) in self._edges[junctionId]:
+                nextDistance = distance + length
+                if (distances[otherId] is None or nextDistance < distances[otherId]):
+                    distances[otherId] = nextDistance
+                    parents[otherId] = junctionId
+                    heapq.heappush(frontier,
+                            (nextDistance + heuristic(otherId), nextDistance, otherId))
+
+        return (distances, parents)
+
+    def _getAnchors(self, position):
+        """
+        Get the junctions closest to a position along its corridor, as {junction id: distance}.
+        """
+
+        if (position in self._junctionIds):
+            return {self._junctionIds[position]: 0}
+
+        corridorId, index = self._corridorCells[position]
+        startId, endId, positions, actions = self._corridors[corridorId]
+
+        anchors = {endId: len(actions) - index}
+        anchors[startId] = min(index, anchors.get(startId, index))
+
+        return anchors
+
+    def _getOpenNeighbors(self, position):
+        neighbors = []
+
+        for action in Directions.CARDINAL:
+            neighbor = Actions.getSuccessor(position, action)
+            neighbor = (int(neighbor[0]), int(neighbor[1]))
+
+            if (self._isOpen(neighbor)):
+                neighbors.append((neighbor, action))
+
+        return neighbors
+
+    def _getSegment(self, source, target, corridorId = None):
+        """
+        Get the actions between two positions on the same corridor.
+        """
+
+        if (source == target):
+            return []
+
+        if (corridorId is None):
+            corridorId = self._findCorridor(source, target)
+
+        positions, actions = self._corridors[corridorId][2:]
+
+        # For loops, the junction is at both ends and any cell on the loop is closer to one of them.
+        sourceIndexes = [index for (index, position) in enumerate(positions)
+                if (position == source)]
+        targetIndexes = [index for (index, position) in enumerate(positions)
+                if (position == target)]
+
+        sourceIndex, targetIndex = min([(sourceIndex, targetIndex)
+                for sourceIndex in sourceIndexes for targetIndex in targetIndexes],
+                key = lambda pair: abs(pair[0] - pair[1]))
+
+        if (sourceIndex < targetIndex):
+            return actions[sourceIndex:targetIndex]
+
+        return [Directions.REVERSE[action] for action in reversed(actions[targetIndex:sourceIndex])]
+
+    def _findCorridor(self, source, target):
+        """
+        Find the shortest corridor that holds both positions.
+        """
+
+        if (source in self._corridorCells):
+            return self._corridorCells[source][0]
+
+        if (target in self._corridorCells):
+            return self._corridorCells[target][0]
+
+        sourceId = self._junctionIds[source]
+        targetId = self._junctionIds[target]
+
+        corridors = [(length, corridorId) for (otherId, length, corridorId) in self._edges[sourceId]
+                if (otherId == targetId)]
+
+        if (len(corridors) == 0):
+            raise ValueError('No corridor joins %s and %s.' % (source, target))
+
+        return min(corridors)[1]
+
+    def _isOpen(self, position):
+        x, y = position
+        return (0 <= x < self._walls.getWidth() and 0 <= y < self._walls.getHeight()
+                and not self._walls[x][y])
+
+    def _traceCorridors(self, junctionId, traced):
+        """
+        Walk out of a junction in every direction that does not already have a corridor,
+        and record each corridor.
+        """
+
+        junction = self._junctions[junctionId]
+
+        for (neighbor, action) in self._getOpenNeighbors(junction):
+            # Already walked from the other end (or from this end, for a loop).
+            if ((junction, action) in traced):
+                continue
+
+            positions = [junction, neighbor]
+            actions = [action]
+
+            while (positions[-1] not in self._junctionIds):
+                previous = positions[-2]
+                for (nextPosition, nextAction) in self._getOpenNeighbors(positions[-1]):
+                    if (nextPosition != previous):
+                        break
+
+                positions.append(nextPosition)
+                actions.append(nextAction)
+
+            traced.add((junction, action))
+            traced.add((positions[-1], Directions.REVERSE[actions[-1]]))
+
+            endId = self._junctionIds[positions[-1]]
+            corridorId = len(self._corridors)
+            self._corridors.append((junctionId, endId, positions, actions))
+
+            for index in range(1, len(positions) - 1):
+                self._corridorCells[positions[index]] = (corridorId, index)
+
+            self._edges[junctionId].append((endId, len(actions), corridorId))
+            if (endId != junctionId):
+                self._edges[endId].append((junctionId, len(actions), corridorId))
+
+def getJunctionGraph(walls):
+    """
+    Get the (shared) `JunctionGraph` for a set of walls.
+    """
+
+    key = getWallKey(walls)
+    if (key not in junctionGraphMap):
+        junctionGraphMap[key] = JunctionGraph(walls)
+
+    return junctionGraphMap[key]
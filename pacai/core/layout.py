@@ -2,7 +2,10 @@ import os
 import random
 
 from pacai.core.distance import manhattan
+from pacai.core.grid import BitGrid
 from pacai.core.grid import Grid
+from pacai.core.junctionGraph import getJunctionGraph
+from pacai.core.zobrist import ZobristTable
 
 # By default, the layout directory is adjacent to this file.
 DEFAULT_LAYOUT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'layouts')
@@ -18,14 +21,24 @@ class Layout(object):
         self.width = len(layoutText[0])
         self.height = len(layoutText)
         self.walls = Grid(self.width, self.height, initialValue = False)
-        self.food = Grid(self.width, self.height, initialValue = False)
+        self.food = BitGrid(self.width, self.height, initialValue = False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0
         self.layoutText = layoutText
 
+        # Built on first use, see getZobristTable().
+        self._zobristTable = None
+
         self.processLayoutText(layoutText, maxGhosts)
 
+    def getJunctionGraph(self):
+        """
+        Get the `pacai.core.junctionGraph.JunctionGraph` for this layout's walls.
+        """
+
+        return getJunctionGraph(self.walls)
+
     def getNumGhosts(self):
         return self.numGhosts
 
@@ -39,6 +52,17 @@ class Layout(object):
     def getWidth(self):
         return self.width
 
+    def getZobristTable(self):
+        """
+        Get the `pacai.core.zobrist.ZobristTable` used to hash boards with this layout.
+        """
+
+        # Layouts unpickled from older replays may not have a table slot.
+        if (getattr(self, '_zobristTable', None) is None):
+            self._zobristTable = ZobristTable(self)
+
+        return self._zobristTable
+
     def getRandomLegalPosition(self):
         x = random.choice(list(range(self.width)))
         y = random.choice(list(range(self.height)))
@@ -72,6 +96,12 @@ class Layout(object):
         row, col = [int(x) for x in pacPos]
         return ghostPos in self.visibility[row][col][pacDirection]
 
+    def __getstate__(self):
+        # The Zobrist table is cheap to rebuild, so don't make pickles carry it.
+        state = self.__dict__.copy()
+        state['_zobristTable'] = None
+        return state
+
     def __str__(self):
         return "\n".join(self.layoutText)
 
@@ -0,0 +1,81 @@
+"""
+Play independent games in a pool of worker processes.
+
+Workers are forked from the calling process,
+so they inherit the layout, agents, and display that the games are built from
+(nothing about how a game is set up needs to be picklable).
+Only the finished games are sent back.
+"""
+
+import logging
+import multiprocessing
+import random
+
+# The function that builds a new game in the workers.
+# This is set right before the pool forks, so every worker inherits it.
+_newGame = None
+
+def runGames(newGame, gameSeeds, numWorkers, agents, display, rules):
+    """
+    Play one game for each seed and return the finished `pacai.core.game.Game` objects
+    (in the same order as the seeds).
+
+    `newGame` is a function that takes the game's seed and returns a `pacai.core.game.Game`
+    that is ready to run.
+    The global RNG is seeded with the game's seed before each call to `newGame`,
+    so the same seeds always produce the same games no matter how many workers there are.
+
+    With more than one worker, games are played in worker processes,
+    so anything the agents learn during them is lost.
+    The returned games will have their agents, display, and rules set to the ones passed in.
+
+    With one worker (or if this platform cannot fork processes),
+    the games are played here one after another.
+    """
+
+    global _newGame
+
+    gameSeeds = list(gameSeeds)
+    numWorkers = max(1, min(numWorkers, len(gameSeeds)))
+
+    if (numWorkers > 1 and 'fork' not in multiprocessing.get_all_start_methods()):
+        logging.warning('This platform cannot fork worker processes, playing games serially.')
+        numWorkers = 1
+
+    if (numWorkers == 1):
+        return [_playGame(newGame, seed) for seed in gameSeeds]
+
+    logging.info('Playing %d games with %d workers.' % (len(gameSeeds), numWorkers))
+
+    _newGame = newGame
+
+    context = multiprocessing.get_context('fork')
+    with context.Pool(numWorkers) as pool:
+        games = pool.map(_runGame, gameSeeds, chunksize = 1)
+
+    _newGame = None
+
+    for game in games:
+        game.agents = agents
+        game.display = display
+        game.rules = rules
+
+    return games
+
+def _playGame(newGame, seed):
+    random.seed(seed)
+
+    game = newGame(seed)
+    game.run()
+
+    return game
+
+def _runGame(seed):
+    game = _playGame(_newGame, seed)
+
+    # These may not be picklable, and the caller already has them.
+    game.agents = None
+    game.display = None
+    game.rules = None
+
+    return game
@@ -0,0 +1,404 @@
+"""
+A compact, versioned file format for recorded games.
+
+A replay file is laid out as:
+```
+    header      struct HEADER_FORMAT: magic, format version, metadata size
+    metadata    UTF-8 JSON object (layout text, seed, team names, ...)
+    records     a stream of records, one after the other
+```
+
+Most records are a single byte holding one action:
+the agent index in the high five bits and the direction in the low three bits.
+Every so often (and always at the end of a game) a checkpoint record is written instead:
+the byte `CHECKPOINT_MARKER`, the size of the checkpoint, and a UTF-8 JSON snapshot of the
+game state (see `pacai.core.gamestate.AbstractGameState.getSnapshot`).
+Checkpoints let a reader jump to any point in a game without simulating it from the start.
+
+Records are written as the game is played,
+so a game that dies part of the way through still leaves behind a readable replay.
+
+Nothing in a replay is ever unpickled or executed, so replays from anywhere are safe to load.
+"""
+
+import bisect
+import io
+import json
+import logging
+import struct
+
+from pacai.core.directions import Directions
+
+MAGIC = b'PACR'
+VERSION = 1
+
+HEADER_FORMAT = '=4sHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+CHECKPOINT_SIZE_FORMAT = '=I'
+CHECKPOINT_SIZE_SIZE = struct.calcsize(CHECKPOINT_SIZE_FORMAT)
+
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+# How often (in moves) a ReplayPlayer keeps the states it simulates.
+DEFAULT_SNAPSHOT_INTERVAL = 25
+
+# The order here is the on-disk direction code, so only ever append to it.
+ACTIONS = [
+    Directions.NORTH,
+    Directions.SOUTH,
+    Directions.EAST,
+    Directions.WEST,
+    Directions.STOP,
+]
+ACTION_CODES = {action: code for (code, action) in enumerate(ACTIONS)}
+
+AGENT_INDEX_SHIFT = 3
+DIRECTION_MASK = (1 << AGENT_INDEX_SHIFT) - 1
+MAX_AGENTS = 256 >> AGENT_INDEX_SHIFT
+
+# An action byte with a direction code that no action uses.
+CHECKPOINT_MARKER = DIRECTION_MASK
+
+class ReplayWriter(object):
+    """
+    Streams a game into a replay.
+
+    `output` is either a path, a binary file-like object, or None.
+    A path is opened (and truncated) right away and closed by `ReplayWriter.close`,
+    a file object is left open for the caller,
+    and None keeps the replay in memory (see `ReplayWriter.getBytes`).
+
+    Attach a writer to a `pacai.core.game.Game` (as `game.replayWriter`) before running it,
+    and the game will feed it every action and close it when the game ends.
+    """
+
+    def __init__(self, output, metadata, checkpointInterval = DEFAULT_CHECKPOINT_INTERVAL):
+        if (metadata.get('numAgents', 0) > MAX_AGENTS):
+            raise ValueError('Replays can only hold games with up to %d agents.' % (MAX_AGENTS))
+
+        self._ownsFile = isinstance(output, str)
+        self._file = output
+        if (self._ownsFile):
+            self._file = open(output, 'wb')
+        elif (output is None):
+            self._file = io.BytesIO()
+
+        self._checkpointInterval = checkpointInterval
+        self._numActions = 0
+        self._closed = False
+
+        metadata = dict(metadata)
+        metadata['checkpointInterval'] = checkpointInterval
+        data = json.dumps(metadata).encode()
+
+        self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(data)))
+        self._file.write(data)
+        self._file.flush()
+
+    def close(self, state = None):
+        """
+        Finish the replay.
+        If a state is passed, it is written as a final checkpoint
+        (this captures anything that happened outside of an action, like a crash penalty).
+        """
+
+        if (self._closed):
+            return
+
+        if (state is not None):
+            self.writeCheckpoint(state)
+
+        self._file.flush()
+        if (self._ownsFile):
+            self._file.close()
+
+        self._closed = True
+
+    def getBytes(self):
+        """
+        Get the replay written so far, only for replays kept in memory.
+        """
+
+        return self._file.getvalue()
+
+    def getNumActions(self):
+        return self._numActions
+
+    def writeAction(self, agentIndex, action, state = None):
+        """
+        Record an action.
+        `state` is the state after the action, it is used for periodic checkpoints.
+        """
+
+        self._file.write(bytes([encodeAction(agentIndex, action)]))
+        self._numActions += 1
+
+        if (state is not None and self._checkpointInterval > 0
+                and self._numActions % self._checkpointInterval == 0):
+            self.writeCheckpoint(state)
+
+    def writeCheckpoint(self, state):
+        snapshot = state.getSnapshot()
+        snapshot['move'] = self._numActions
+        data = json.dumps(snapshot).encode()
+
+        self._file.write(bytes([CHECKPOINT_MARKER]))
+        self._file.write(struct.pack(CHECKPOINT_SIZE_FORMAT, len(data)))
+        self._file.write(data)
+
+        # Checkpoints are a good time to make sure the replay is durable.
+        self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+class Replay(object):
+    """
+    A replay that has been read from a file (see `readReplay`).
+    """
+
+    def __init__(self, metadata, actions, checkpoints):
+        self._metadata = metadata
+        self._actions = actions
+        self._checkpoints = checkpoints
+        self._checkpointMoves = [move for (move, snapshot) in checkpoints]
+
+    def getActions(self):
+        """
+        Get every action in the game as a list of (agentIndex, action).
+        """
+
+        return self._actions
+
+    def getCheckpoint(self, move):
+        """
+        Get the last checkpoint taken at or before the given move (number of actions).
+        Returns (move, snapshot), or None if there is no such checkpoint.
+        """
+
+        index = bisect.bisect_right(self._checkpointMoves, move) - 1
+        if (index < 0):
+            return None
+
+        return self._checkpoints[index]
+
+    def getCheckpoints(self):
+        """
+        Get all the checkpoints as a list of (move, snapshot), ordered by move.
+        """
+
+        return self._checkpoints
+
+    def getLayoutText(self):
+        """
+        Get the layout text in the form that `pacai.core.layout.Layout` takes (a list of rows).
+        """
+
+        return self._metadata['layout'].split('\n')
+
+    def getMetadata(self):
+        return self._metadata
+
+    def getNumActions(self):
+        return len(self._actions)
+
+class ReplayPlayer(object):
+    """
+    Moves around inside a `Replay`: seek to any move, step forwards or backwards,
+    and render only selected frames.
+
+    `game` is a `pacai.core.game.Game` for the replay's layout that has not been run.
+    Its state is the start of the replay and its rules decide when the game is over.
+
+    To reach a move, the player starts from the closest state it knows at or before that move
+    and simulates only from there.
+    It knows every `snapshotInterval`-th state it has already simulated,
+    and the checkpoints stored in the replay itself.
+    """
+
+    def __init__(self, replay, game, snapshotInterval = DEFAULT_SNAPSHOT_INTERVAL):
+        self._replay = replay
+        self._game = game
+        self._actions = replay.getActions()
+        self._snapshotInterval = max(1, snapshotInterval)
+
+        self._snapshots = {0: game.state}
+        self._move = 0
+        self._state = game.state
+
+    def getFrames(self, start = None, end = None, step = 1):
+        """
+        Get (move, state) for the moves `start`, `start + step`, ... up to `end`.
+        `end` is always included so the last frame is never skipped.
+        A negative step goes backwards through the replay.
+        By default, the whole replay is covered (in the direction of the step).
+        """
+
+        if (step == 0):
+            raise ValueError('Cannot step through a replay with a step of zero.')
+
+        numMoves = len(self._actions)
+
+        if (start is None):
+            start = 0 if (step > 0) else numMoves
+
+        if (end is None):
+            end = numMoves if (step > 0) else 0
+
+        start = max(0, min(start, numMoves))
+        end = max(0, min(end, numMoves))
+
+        move = start
+        while ((step > 0 and move < end) or (step < 0 and move > end)):
+            yield (move, self.seek(move))
+            move += step
+
+        yield (end, self.seek(end))
+
+    def getMove(self):
+        """
+        Get the number of moves that have been made to reach the current state.
+        """
+
+        return self._move
+
+    def getNumMoves(self):
+        return len(self._actions)
+
+    def getState(self):
+        return self._state
+
+    def render(self, display, start = None, end = None, step = 1):
+        """
+        Show the selected frames (see `ReplayPlayer.getFrames`) on a display.
+        """
+
+        initialized = False
+
+        for (move, state) in self.getFrames(start, end, step):
+            if (not initialized):
+                display.initialize(state)
+                initialized = True
+
+            display.update(state)
+
+        display.finish()
+
+    def seek(self, move):
+        """
+        Go to the state after the given number of moves (clamped to the replay)
+        and return that state.
+        """
+
+        move = max(0, min(move, len(self._actions)))
+
+        startMove = max([known for known in self._snapshots if known <= move])
+        state = self._snapshots[startMove]
+
+        if (startMove < self._move <= move):
+            startMove = self._move
+            state = self._state
+
+        checkpoint = self._replay.getCheckpoint(move)
+        if (checkpoint is not None and checkpoint[0] > startMove):
+            startMove = checkpoint[0]
+            state = self._snapshots[0].copy()
+            state.restoreSnapshot(checkpoint[1])
+            self._snapshots[startMove] = state
+
+        rules = self._game.rules
+        for index in range(startMove, move):
+            state = state.generateSuccessor(*self._actions[index])
+
+            # Allow for game specific conditions (winning, losing, etc.).
+            rules.process(state, self._game)
+
+            if ((index + 1) % self._snapshotInterval == 0):
+                self._snapshots[index + 1] = state
+
+        self._move = move
+        self._state = state
+
+        return state
+
+    def step(self, count = 1):
+        """
+        Move forwards (or backwards for a negative count) and return the new state.
+        """
+
+        return self.seek(self._move + count)
+
+def encodeAction(agentIndex, action):
+    if (agentIndex < 0 or agentIndex >= MAX_AGENTS):
+        raise ValueError('Agent index out of range for a replay: %d.' % (agentIndex))
+
+    if (action not in ACTION_CODES):
+        raise ValueError('Unknown action for a replay: %s.' % (action))
+
+    return (agentIndex << AGENT_INDEX_SHIFT) | ACTION_CODES[action]
+
+def decodeAction(value):
+    code = value & DIRECTION_MASK
+    if (code >= len(ACTIONS)):
+        raise ValueError('Unknown action code in replay: %d.' % (code))
+
+    return (value >> AGENT_INDEX_SHIFT, ACTIONS[code])
+
+def readReplay(path):
+    """
+    Read a replay file.
+    Raises a ValueError if the file is not a replay this version can read.
+    A replay that was cut off part of the way through is read up to where it stops.
+    """
+
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    if (len(data) < HEADER_SIZE):
+        raise ValueError('Not a pacai replay: %s.' % (path))
+
+    magic, version, metadataSize = struct.unpack_from(HEADER_FORMAT, data)
+    if (magic != MAGIC):
+        raise ValueError('Not a pacai replay (older pickled replays are no longer supported): %s.'
+                % (path))
+
+    if (version != VERSION):
+        raise ValueError('Unsupported replay version (%d) in %s.' % (version, path))
+
+    offset = HEADER_SIZE + metadataSize
+    metadata = json.loads(data[HEADER_SIZE:offset].decode())
+
+    actions = []
+    checkpoints = []
+
+    while (offset < len(data)):
+        value = data[offset]
+        offset += 1
+
+        if (value != CHECKPOINT_MARKER):
+            actions.append(decodeAction(value))
+            continue
+
+        if (offset + CHECKPOINT_SIZE_SIZE > len(data)):
+            break
+
+        size, = struct.unpack_from(CHECKPOINT_SIZE_FORMAT, data, offset)
+        offset += CHECKPOINT_SIZE_SIZE
+
+        if (offset + size > len(data)):
+            break
+
+        snapshot = json.loads(data[offset:offset + size].decode())
+        offset += size
+
+        checkpoints.append((snapshot.pop('move'), snapshot))
+
+    if (offset < len(data)):
+        logging.warning('Replay %s was cut off, reading only the first %d actions.'
+                % (path, len(actions)))
+
+    return Replay(metadata, actions, checkpoints)
@@ -0,0 +1,396 @@
+"""
+Memory-bounded searches for state spaces that are too big for A* to keep in memory.
+
+Both searches take the same arguments as `pacai.core.search.graph.aStarSearch`
+(a `pacai.core.search.problem.SearchProblem` and a heuristic)
+and return a list of actions (or None), so they can be used anywhere a search function is expected.
+Neither keeps a reached set, so they search a tree and will re-expand states
+that can be reached along different paths (but never cycle back along the current path).
+
+Pass a dict as `stats` to get a report of the search:
+```
+    expanded    the number of states that were expanded
+    peakNodes   the most search nodes held in memory at once
+```
+plus a few search specific values (see each search).
+
+Both searches also fill in the problem's `pacai.core.search.stats.SearchStats`,
+where the frontier is every search node in memory and
+the duplicates are successors that would have gone back along the current path.
+"""
+
+import heapq
+import itertools
+import math
+
+from pacai.core.search.heuristic import null as nullHeuristic
+from pacai.core.search.stats import recordStats
+
+DEFAULT_NODE_BUDGET = 100000
+
+# How many times the node budget the SMA* heaps can grow to before stale entries are removed.
+HEAP_SLACK = 2
+
+@recordStats
+def iterativeDeepeningAStarSearch(problem, heuristic = nullHeuristic, stats = None):
+    """
+    IDA*: a series of depth-first searches that each cut off paths whose
+    cost plus heuristic goes over a bound.
+    The first bound is the heuristic at the start, and each search raises it to the
+    smallest value that went over it last time.
+    Only the current path (and the unexplored successors along it) are kept,
+    so memory grows with the length of the solution instead of the size of the state space.
+    With an admissible heuristic the first path found is optimal.
+
+    Extra stats: `iterations`, the number of depth-first searches that were run.
+    """
+
+    start = problem.startingState()
+
+    # The problem's own expanded count depends on its trace level, the stats are always counted.
+    searchStats = problem.getStats()
+    startExpanded = searchStats.expanded
+
+    bound = heuristic(start, problem)
+    iterations = 0
+    peakNodes = 1
+
+    path = None
+
+    while (path is None and bound != math.inf):
+        iterations += 1
+        path, bound, peak = _boundedDepthFirstSearch(problem, heuristic, start, bound,
+                searchStats)
+        peakNodes = max(peakNodes, peak)
+
+    if (stats is not None):
+        stats['expanded'] = searchStats.expanded - startExpanded
+        stats['peakNodes'] = peakNodes
+        stats['iterations'] = iterations
+
+    return path
+
+@recordStats
+def simplifiedMemoryBoundedAStarSearch(problem, heuristic = nullHeuristic,
+        nodeBudget = DEFAULT_NODE_BUDGET, stats = None):
+    """
+    SMA*: A* that never holds more than `nodeBudget` search nodes.
+
+    Successors are generated one at a time.
+    When memory is full, the leaf with the highest f value (the shallowest one for ties)
+    is forgotten, and its parent remembers that f value so the subtree can be regenerated
+    if everything else turns out to be worse.
+    Once all of a node's successors have been generated, its f value is backed up to
+    the lowest of its successors' values (remembered ones included).
+
+    The path found is optimal if the optimal solution fits in the budget
+    (its depth is less than `nodeBudget`), otherwise the best solution that fits is returned.
+    If no solution fits, None is returned.
+
+    Extra stats: `forgotten`, the number of nodes that were dropped to stay under budget.
+    """
+
+    if (nodeBudget < 2):
+        raise ValueError('SMA* needs a node budget of at least two.')
+
+    # The problem's own expanded count depends on its trace level, the stats are always counted.
+    searchStats = problem.getStats()
+    startExpanded = searchStats.expanded
+
+    counter = itertools.count()
+    root = _SMANode(problem.startingState(), None, None, 0, 0)
+    root.f = heuristic(root.state, problem)
+
+    # The nodes that can still be picked, ordered by (f, deepest first).
+    # Both heaps use lazy deletion: an entry is only live if its version matches the node's.
+    best = []
+    # The leaves that can be forgotten, ordered by (f, shallowest first) from the top.
+    worst = []
+
+    def push(node):
+        node.version = next(counter)
+        node.inOpen = True
+        heapq.heappush(best, (node.getOpenF(), -node.depth, node.version, node))
+
+        if (len(node.children) == 0):
+            heapq.heappush(worst, (-node.getOpenF(), node.depth, node.version, node))
+
+        # Stale entries count against memory too, so clear them out every so often.
+        for heap in (best, worst):
+            if (len(heap) > HEAP_SLACK * nodeBudget):
+                heap[:] = [entry for entry in heap
+                        if (entry[3].inOpen and entry[2] == entry[3].version)]
+                heapq.heapify(heap)
+
+    def popBest():
+        while (len(best) > 0):
+            openF, negDepth, version, node = heapq.heappop(best)
+            if (node.inOpen and version == node.version):
+                return node
+
+        return None
+
+    def forgetWorst(keep):
+        while (len(worst) > 0):
+            negF, depth, version, node = heapq.heappop(worst)
+            if (not node.inOpen or version != node.version or len(node.children) > 0
+                    or node is keep or node.parent is None):
+                continue
+
+            parent = node.parent
+            parent.children.remove(node)
+            parent.pending[node.index] = node.f
+
+            node.inOpen = False
+            node.successors = None
+
+            # The parent is a candidate again (and may be a leaf now).
+            push(parent)
+            return True
+
+        return False
+
+    push(root)
+    numNodes = 1
+    peakNodes = 1
+    forgotten = 0
+    path = None
+
+    while (True):
+        node = popBest()
+        if (node is None or node.getOpenF() == math.inf):
+            break
+
+        if (problem.isGoal(node.state)):
+            path = node.getPath()
+            break
+
+        if (node.successors is None):
+            node.successors = problem.successorStates(node.state)
+            node.pending = {index: None for index in range(len(node.successors))}
+            searchStats.recordExpansion(len(node.successors), numNodes)
+
+        if (len(node.pending) == 0):
+            # A dead end (no successors at all), there is no reason to keep it.
+            node.inOpen = False
+            parent = node.parent
+            if (parent is None):
+                break
+
+            parent.children.remove(node)
+            parent.pending[node.index] = math.inf
+            numNodes -= 1
+
+            push(parent)
+            continue
+
+        index = node.getNextPending()
+        knownF = node.pending.pop(index)
+
+        state, action, cost = node.successors[index]
+        child = _SMANode(state, node, action, node.g + cost, node.depth + 1)
+        child.index = index
+
+        if (node.isOnPath(state)):
+            # Going in a cycle.
+            child.f = math.inf
+            searchStats.duplicates += 1
+        elif (child.depth >= nodeBudget - 1 and not problem.isGoal(state)):
+            # Too deep to ever fit a solution.
+            child.f = math.inf
+        else:
+            child.f = max(node.f, child.g + heuristic(state, problem))
+
+        if (knownF is not None):
+            child.f = max(child.f, knownF)
+
+        node.children.append(child)
+
+        _backup(node)
+
+        # The node stays open while it still has successors that are not in memory.
+        node.inOpen = False
+        if (len(node.pending) > 0):
+            push(node)
+
+        numNodes += 1
+        if (numNodes > nodeBudget):
+            if (forgetWorst(child)):
+                numNodes -= 1
+                forgotten += 1
+
+        push(child)
+        peakNodes = max(peakNodes, numNodes)
+        searchStats.recordFrontier(numNodes)
+
+    if (stats is not None):
+        stats['expanded'] = searchStats.expanded - startExpanded
+        stats['peakNodes'] = peakNodes
+        stats['forgotten'] = forgotten
+
+    return path
+
+class _SMANode(object):
+    """
+    A search node for SMA*.
+    """
+
+    def __init__(self, state, parent, action, g, depth):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.g = g
+        self.depth = depth
+        self.f = 0
+
+        # The index of this node in its parent's successors.
+        self.index = None
+
+        self.children = []
+
+        # All successors (once expanded),
+        # and index -> known f (or None) for the ones not in memory.
+        self.successors = None
+        self.pending = None
+
+        self.inOpen = False
+        self.version = None
+
+    def getNextPending(self):
+        """
+        Pick the successor to generate next:
+        ones that were never generated (in order) before ones that were forgotten (best first).
+        """
+
+        unseen = [index for (index, knownF) in self.pending.items() if (knownF is None)]
+        if (len(unseen) > 0):
+            return unseen[0]
+
+        return min(self.pending, key = self.pending.get)
+
+    def getOpenF(self):
+        """
+        The value this node has as a candidate:
+        its own f while it has successors that were never generated,
+        and the best forgotten f once they have all been seen.
+        """
+
+        if (not self.isFullyGenerated()):
+            return self.f
+
+        return min(self.pending.values(), default = self.f)
+
+    def getPath(self):
+        actions = []
+
+        node = self
+        while (node.parent is not None):
+            actions.append(node.action)
+            node = node.parent
+
+        actions.reverse()
+        return actions
+
+    def isFullyGenerated(self):
+        """
+        Check if every successor has been generated at least once.
+        """
+
+        return (self.pending is not None
+                and all([knownF is not None for knownF in self.pending.values()]))
+
+    def isOnPath(self, state):
+        node = self
+        while (node is not None):
+            if (node.state == state):
+                return True
+
+            node = node.parent
+
+        return False
+
+def _backup(node):
+    """
+    Once all of a node's successors have been generated (even if some were forgotten since),
+    its f value is the best of theirs.
+    Changes are passed up to the ancestors.
+    """
+
+    while (node is not None and node.isFullyGenerated()):
+        values = [child.f for child in node.children] + list(node.pending.values())
+        newF = min(values, default = math.inf)
+
+        if (newF == node.f):
+            break
+
+        node.f = newF
+        node = node.parent
+
+def _boundedDepthFirstSearch(problem, heuristic, start, bound, searchStats):
+    """
+    Run one depth-first search of IDA*.
+    Returns (path or None, the next bound, the most nodes held at once).
+    """
+
+    nextBound = math.inf
+
+    # Each frame is (state, path cost, heuristic, successors left to try).
+    # The states along the path are also kept in a set so cycles are cheap to spot.
+    stack = [(start, 0, heuristic(start, problem), None)]
+    onPath = {start}
+    actions = []
+
+    numNodes = 1
+    peakNodes = 1
+
+    while (len(stack) > 0):
+        state, cost, estimate, successors = stack[-1]
+
+        if (successors is None):
+            f = cost + estimate
+            if (f > bound):
+                nextBound = min(nextBound, f)
+                successors = []
+            elif (problem.isGoal(state)):
+                return (list(actions), bound, peakNodes)
+            else:
+                successors = []
+                allSuccessors = problem.successorStates(state)
+                for (nextState, action, stepCost) in allSuccessors:
+                    if (nextState not in onPath):
+                        successors.append((heuristic(nextState, problem), nextState, action,
+                                stepCost))
+                    else:
+                        searchStats.duplicates += 1
+
+                # Try the most promising successors first (they are popped from the end).
+                successors.sort(key = lambda successor: -successor[0])
+
+                numNodes += len(successors)
+                peakNodes = max(peakNodes, numNodes)
+                searchStats.recordExpansion(len(allSuccessors), numNodes)
+
+            stack[-1] = (state, cost, estimate, successors)
+
+        if (len(successors) == 0):
+            stack.pop()
+            onPath.discard(state)
+            numNodes -= 1
+
+            if (len(actions) > 0):
+                actions.pop()
+
+            continue
+
+        nextEstimate, nextState, action, stepCost = successors.pop()
+
+        stack.append((nextState, cost + stepCost, nextEstimate, None))
+        onPath.add(nextState)
+        actions.append(action)
+
+    return (None, nextBound, peakNodes)
+
+# Abbreviations
+
+idastar = iterativeDeepeningAStarSearch
+smastar = simplifiedMemoryBoundedAStarSearch
@@ -0,0 +1,411 @@
+"""
+Hash-distributed A* (HDA*): A* spread over worker processes.
+
+Every state has an owner, the worker at `hash(state) % numWorkers`.
+Each worker runs A* on its own frontier, but only ever keeps (and expands) the states it owns.
+Successors owned by other workers are sent to them in batches.
+Workers are forked from the calling process, so they share the problem and heuristic
+(neither needs to be picklable), but states do need to be picklable.
+Small, flat states (like the ones from `pacai.core.search.food.CompactFoodSearchProblem`)
+are much cheaper to send around.
+
+Finding a goal does not end the search.
+The cheapest goal found so far (the incumbent) is shared by all workers,
+and nodes whose f value is not below it are never expanded.
+The search is over once no worker has a node below the incumbent and no batches are in flight.
+Any cheaper path would have to go through a node on some frontier (or in flight)
+with an f value below the incumbent (the heuristic is admissible), so there cannot be one:
+the incumbent is optimal.
+States reached again more cheaply are reopened, so the heuristic only needs to be admissible.
+
+Small problems are not worth the processes, so the search first runs a regular A*
+for a limited number of expansions and only goes parallel if that does not finish.
+
+Like the other searches, it can be handed to a search agent:
+```
+python -m pacai.bin.pacman --layout bigMaze --pacman SearchAgent \\
+    --agent-args fn=pacai.core.search.distributed.hdastar
+```
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import time
+
+from pacai.core.search import graph
+from pacai.core.search.heuristic import null as nullHeuristic
+from pacai.core.search.stats import recordStats
+
+# Problems that serial A* solves in this many expansions never go parallel.
+DEFAULT_SERIAL_EXPANSIONS = 10000
+
+# How many nodes a worker expands before it sends out batches and checks its messages.
+EXPANSIONS_PER_ROUND = 64
+
+# How long (in seconds) an idle worker waits for messages, and the coordinator waits between checks.
+POLL_INTERVAL = 0.01
+
+@recordStats
+def hashDistributedAStarSearch(problem, heuristic = nullHeuristic, numWorkers = None,
+        serialExpansions = DEFAULT_SERIAL_EXPANSIONS):
+    """
+    Search the node that has the lowest combined cost and heuristic first,
+    with the work split across `numWorkers` processes (the number of CPUs by default).
+
+    Runs a serial A* first, and only goes parallel if it needs more than `serialExpansions`
+    expansions.
+    The search is also serial if there is only one worker, this platform cannot fork,
+    or this is already running in a daemonic process (like a `pacai.core.parallel` worker),
+    which is not allowed to have children.
+
+    Expansions in the workers are added to the problem's expanded count,
+    but the states they visit are not (so the GUI will not highlight them).
+    The workers' counts are also added to the problem's `pacai.core.search.stats.SearchStats`,
+    where the peak frontier is the sum of the workers' peaks.
+    """
+
+    if (numWorkers is None):
+        numWorkers = os.cpu_count() or 1
+
+    if (numWorkers <= 1 or 'fork' not in multiprocessing.get_all_start_methods()
+            or multiprocessing.current_process().daemon):
+        return graph.aStarSearch(problem, heuristic)
+
+    if (serialExpansions > 0):
+        try:
+            return graph.aStarSearch(problem, heuristic, maxExpansions = serialExpansions)
+        except graph.ExpansionLimitReached:
+            pass
+
+        logging.debug('Serial A* did not finish in %d expansions, using %d workers.'
+                % (serialExpansions, numWorkers))
+
+    return _Coordinator(problem, heuristic, numWorkers).run()
+
+class _Coordinator(object):
+    """
+    Starts the workers, watches for termination, and rebuilds the path at the end.
+    """
+
+    def __init__(self, problem, heuristic, numWorkers):
+        self._problem = problem
+        self._heuristic = heuristic
+        self._numWorkers = numWorkers
+
+        context = multiprocessing.get_context('fork')
+
+        self._inboxes = [context.Queue() for i in range(numWorkers)]
+        self._results = context.Queue()
+
+        # Per worker: idle flags and the number of batches sent and received.
+        self._idle = context.Array('b', numWorkers, lock = False)
+        self._sent = context.Array('q', numWorkers, lock = False)
+        self._received = context.Array('q', numWorkers, lock = False)
+
+        # The incumbent (best goal cost so far) and the worker that owns that goal.
+        self._incumbent = context.Value('d', math.inf)
+        self._goalOwner = context.Value('i', -1, lock = False)
+
+        self._processes = [context.Process(target = self._runWorker, args = (index,),
+                daemon = True) for index in range(numWorkers)]
+
+    def run(self):
+        # Warm up any heuristic caches before forking, so every worker inherits them.
+        start = self._problem.startingState()
+        self._heuristic(start, self._problem)
+
+        for process in self._processes:
+            process.start()
+
+        try:
+            # The start is sent like any other batch (counted as sent by the coordinator).
+            startOwner = _getOwner(start, self._numWorkers)
+            self._inboxes[startOwner].put(('nodes', [(start, 0, None, None)]))
+
+            self._waitForTermination(1)
+
+            path = None
+            if (self._incumbent.value != math.inf):
+                path = self._tracePath()
+        finally:
+            expanded, counts, peakFrontier = self._stopWorkers()
+
+        # The workers expanded nodes on their own copies of the problem.
+        self._problem._numExpanded += expanded
+
+        stats = self._problem.getStats()
+        stats.add(counts)
+        stats.recordFrontier(peakFrontier)
+
+        return path
+
+    def _checkWorkers(self):
+        for process in self._processes:
+            if (process.exitcode is not None):
+                raise RuntimeError('A search worker died (exit code %d).' % (process.exitcode))
+
+    def _runWorker(self, index):
+        _Worker(index, self).run()
+
+    def _stopWorkers(self):
+        """
+        Stop the workers and collect their totals:
+        (expanded count, `pacai.core.search.stats.SearchStats` counts, summed peak frontiers).
+        """
+
+        expanded = 0
+        counts = {}
+        peakFrontier = 0
+        running = 0
+
+        for (index, process) in enumerate(self._processes):
+            if (process.is_alive()):
+                self._inboxes[index].put(('stop',))
+                running += 1
+
+        stopped = 0
+        while (stopped < running):
+            try:
+                message = self._results.get(timeout = 1)
+            except queue.Empty:
+                # A worker that died will never answer.
+                running = min(running, len([process for process in self._processes
+                        if (process.is_alive())]) + stopped)
+                continue
+
+            if (message[0] == 'done'):
+                expanded += message[1]
+                for (key, value) in message[2].items():
+                    counts[key] = counts.get(key, 0) + value
+
+                peakFrontier += message[3]
+                stopped += 1
+
+        for process in self._processes:
+            process.join(timeout = 1)
+            if (process.is_alive()):
+                process.terminate()
+
+        return (expanded, counts, peakFrontier)
+
+    def _tracePath(self):
+        """
+        Follow the parent pointers back from the goal, asking each state's owner in turn.
+        """
+
+        actions = []
+        owner = self._goalOwner.value
+        state = None
+
+        while (True):
+            self._inboxes[owner].put(('trace', state))
+            state, parent, action = self._results.get()
+
+            if (parent is None):
+                break
+
+            actions.append(action)
+            state = parent
+            owner = _getOwner(state, self._numWorkers)
+
+        actions.reverse()
+        return actions
+
+    def _waitForTermination(self, coordinatorSent):
+        """
+        Wait until every worker is idle and every batch that was sent has been received.
+        Workers only stop being idle when they receive a batch,
+        so two checks in a row that see all idle workers and the same (balanced) counts
+        mean nothing happened in between, and nothing ever will.
+        """
+
+        previous = None
+
+        while (True):
+            time.sleep(POLL_INTERVAL)
+            self._checkWorkers()
+
+            idle = all(self._idle)
+            sent = sum(self._sent) + coordinatorSent
+            received = sum(self._received)
+
+            check = (idle, sent, received)
+            if (idle and sent == received and check == previous):
+                return
+
+            previous = check
+
+class _Worker(object):
+    """
+    One HDA* worker (in its own process).
+    """
+
+    def __init__(self, index, coordinator):
+        self._index = index
+        self._coordinator = coordinator
+        self._problem = coordinator._problem
+        self._heuristic = coordinator._heuristic
+        self._numWorkers = coordinator._numWorkers
+        self._inbox = coordinator._inboxes[index]
+        self._stats = self._problem.getStats()
+
+        self._frontier = []
+        self._counter = itertools.count()
+
+        # Owned state -> the cheapest cost it has been reached with.
+        self._costs = {}
+        # Owned state -> (parent state, action from the parent).
+        self._parents = {}
+
+        self._goal = None
+        self._expanded = 0
+        self._peakFrontier = 0
+
+        # Batches of (state, cost, parent, action) waiting to be sent to each worker.
+        self._outboxes = [[] for i in range(self._numWorkers)]
+
+    def run(self):
+        coordinator = self._coordinator
+        startExpanded = self._problem.getExpandedCount()
+
+        # The stats were copied from the coordinator, only what this worker adds is sent back.
+        startCounts = self._stats.toDict()
+
+        while (True):
+            isIdle = not self._hasWork()
+            coordinator._idle[self._index] = isIdle
+
+            try:
+                message = self._inbox.get(block = isIdle, timeout = POLL_INTERVAL)
+            except queue.Empty:
+                message = None
+
+            if (message is not None):
+                kind = message[0]
+
+                if (kind == 'stop'):
+                    counts = {key: value - startCounts[key]
+                            for (key, value) in self._stats.toDict().items()}
+
+                    coordinator._results.put(('done',
+                            self._problem.getExpandedCount() - startExpanded, counts,
+                            self._peakFrontier))
+                    return
+
+                if (kind == 'trace'):
+                    state = message[1]
+                    if (state is None):
+                        state = self._goal
+
+                    parent, action = self._parents[state]
+                    coordinator._results.put((state, parent, action))
+                    continue
+
+                # New nodes: stop being idle before counting them, so the coordinator
+                # can never see this batch as received while this worker still looks idle.
+                coordinator._idle[self._index] = False
+                for (state, cost, parent, action) in message[1]:
+                    self._add(state, cost, parent, action)
+
+                coordinator._received[self._index] += 1
+
+                # Drain everything that is waiting before expanding.
+                continue
+
+            for i in range(EXPANSIONS_PER_ROUND):
+                if (not self._expandNext()):
+                    break
+
+            self._flush()
+
+    def _add(self, state, cost, parent, action):
+        if (state in self._costs):
+            self._stats.duplicates += 1
+            if (self._costs[state] <= cost):
+                return
+
+        self._costs[state] = cost
+        self._parents[state] = (parent, action)
+
+        f = cost + self._heuristic(state, self._problem)
+        if (f < self._coordinator._incumbent.value):
+            # Ties go to the deepest node, so workers dive for a goal (and an incumbent)
+            # instead of all sweeping their share of a plateau.
+            heapq.heappush(self._frontier, (f, -cost, next(self._counter), state))
+
+    def _expandNext(self):
+        """
+        Expand the best node on the frontier that can still beat the incumbent.
+        Returns False if there is no such node.
+        """
+
+        if (not self._hasWork()):
+            return False
+
+        f, negCost, tie, state = heapq.heappop(self._frontier)
+        cost = -negCost
+
+        if (self._problem.isGoal(state)):
+            incumbent = self._coordinator._incumbent
+            with incumbent.get_lock():
+                if (cost < incumbent.value):
+                    incumbent.value = cost
+                    self._coordinator._goalOwner.value = self._index
+                    self._goal = state
+
+            return True
+
+        successors = self._problem.successorStates(state)
+        for (successor, action, stepCost) in successors:
+            owner = _getOwner(successor, self._numWorkers)
+            if (owner == self._index):
+                self._add(successor, cost + stepCost, state, action)
+            else:
+                self._outboxes[owner].append((successor, cost + stepCost, state, action))
+
+        self._stats.recordExpansion(len(successors), 0)
+        self._peakFrontier = max(self._peakFrontier, len(self._frontier))
+
+        return True
+
+    def _flush(self):
+        for (owner, batch) in enumerate(self._outboxes):
+            if (len(batch) == 0):
+                continue
+
+            # Count the batch before it can possibly be received.
+            self._coordinator._sent[self._index] += 1
+            self._coordinator._inboxes[owner].put(('nodes', batch))
+            self._outboxes[owner] = []
+
+    def _hasWork(self):
+        """
+        Check if there is a node on the frontier that can still beat the incumbent
+        (throwing away stale nodes on the way).
+        """
+
+        incumbent = self._coordinator._incumbent.value
+
+        while (len(self._frontier) > 0):
+            f, negCost, tie, state = self._frontier[0]
+            if (f >= incumbent):
+                return False
+
+            if (self._costs[state] == -negCost):
+                return True
+
+            heapq.heappop(self._frontier)
+
+        return False
+
+def _getOwner(state, numWorkers):
+    return hash(state) % numWorkers
+
+# Abbreviations
+
+hdastar = hashDistributedAStarSearch
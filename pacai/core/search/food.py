@@ -1,5 +1,6 @@
 from pacai.core.actions import Actions
 from pacai.core.directions import Directions
+from pacai.core.grid import BitGrid
 from pacai.core.search.problem import SearchProblem
 
 class FoodSearchProblem(SearchProblem):
@@ -9,8 +10,9 @@ class FoodSearchProblem(SearchProblem):
 
     A search state in this problem is a tuple (pacmanPosition, foodGrid).
     Wwhere pacmanPosition is a tuple (x, y) of integers specifying Pacman's position,
-    and foodGrid is a `pacai.core.grid.Grid` of either `True` or `False`,
+    and foodGrid is a `pacai.core.grid.BitGrid` of either `True` or `False`,
     specifying remaining food.
+    Since food grids are bitboards, copying and hashing them is cheap.
     """
 
     def __init__(self, startingGameState):
@@ -62,3 +64,145 @@ class FoodSearchProblem(SearchProblem):
             cost += 1
 
         return cost
+
+class CompactFoodSearchProblem(FoodSearchProblem):
+    """
+    A `FoodSearchProblem` with a much smaller state.
+
+    A search state in this problem is a tuple (cellId, foodBitmask) of two integers.
+    Where cellId identifies Pacman's position (see `CompactFoodSearchProblem.getPosition`),
+    and bit i of foodBitmask is set if the i-th piece of food from the start is still there.
+    Cell ids are the same as the ones in `pacai.core.distanceCalculator.DistanceTable`.
+
+    Heuristics that need the regular (position, food grid) state can get it from
+    `CompactFoodSearchProblem.toFoodState`.
+    """
+
+    def __init__(self, startingGameState):
+        super().__init__(startingGameState)
+
+        self.cells = self.walls.asList(False)
+        self.cellIds = {cell: cellId for (cellId, cell) in enumerate(self.cells)}
+
+        # The food from the start, the index of each one is its bit in a food bitmask.
+        self.foodPositions = self.start[1].asList()
+
+        # The food bit for each cell (zero for cells that never had food).
+        self.cellFoodBits = [0] * len(self.cells)
+        for (index, position) in enumerate(self.foodPositions):
+            self.cellFoodBits[self.cellIds[position]] = 1 << index
+
+        # (next cellId, direction) for each legal move out of each cell.
+        self.cellMoves = []
+        for (x, y) in self.cells:
+            moves = []
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextPosition = (int(x + dx), int(y + dy))
+
+                if (nextPosition in self.cellIds):
+                    moves.append((self.cellIds[nextPosition], direction))
+
+            self.cellMoves.append(moves)
+
+        self.compactStart = (self.cellIds[self.start[0]], (1 << len(self.foodPositions)) - 1)
+
+    def startingState(self):
+        return self.compactStart
+
+    def isGoal(self, state):
+        return state[1] == 0
+
+    def successorStates(self, state):
+        """
+        Returns successor states, the actions they require, and a cost of 1.
+        """
+
+        if (self.isCounting()):
+            self._numExpanded += 1
+
+        cellFoodBits = self.cellFoodBits
+        food = state[1]
+
+        return [((nextCell, food & ~cellFoodBits[nextCell]), direction, 1)
+                for (nextCell, direction) in self.cellMoves[state[0]]]
+
+    def actionsCost(self, actions):
+        """
+        Returns the cost of a particular sequence of actions.
+        If those actions include an illegal move, return 999999.
+        """
+
+        x, y = self.start[0]
+        cost = 0
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            x, y = int(x + dx), int(y + dy)
+            if self.walls[x][y]:
+                return 999999
+            cost += 1
+
+        return cost
+
+    def getFoodGrid(self, foodBitmask):
+        """
+        Get the food left in a food bitmask as a `pacai.core.grid.BitGrid`.
+        """
+
+        height = self.walls.getHeight()
+
+        bits = 0
+        index = 0
+        while (foodBitmask):
+            if (foodBitmask & 1):
+                x, y = self.foodPositions[index]
+                bits |= 1 << (x * height + y)
+
+            foodBitmask >>= 1
+            index += 1
+
+        return BitGrid.fromBits(self.walls.getWidth(), height, bits)
+
+    def getFoodPositions(self, foodBitmask):
+        """
+        Get the positions of the food left in a food bitmask.
+        """
+
+        return [position for (index, position) in enumerate(self.foodPositions)
+                if (foodBitmask >> index) & 1]
+
+    def getPosition(self, state):
+        """
+        Get Pacman's (x, y) position in a state.
+        """
+
+        return self.cells[state[0]]
+
+    def toFoodState(self, state):
+        """
+        Convert a compact state into a regular `FoodSearchProblem` state: (position, food grid).
+        """
+
+        return (self.cells[state[0]], self.getFoodGrid(state[1]))
+
+    def fromFoodState(self, foodState):
+        """
+        Convert a regular `FoodSearchProblem` state into a compact state.
+        """
+
+        position, foodGrid = foodState
+
+        foodBitmask = 0
+        for (index, (x, y)) in enumerate(self.foodPositions):
+            if (foodGrid[x][y]):
+                foodBitmask |= 1 << index
+
+        return (self.cellIds[position], foodBitmask)
+
+def adaptFoodHeuristic(heuristic):
+    """
+    Wrap a heuristic written for `FoodSearchProblem` states
+    so it can be used with a `CompactFoodSearchProblem`.
+    """
+
+    return lambda state, problem: heuristic(problem.toFoodState(state), problem)
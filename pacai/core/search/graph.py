@@ -0,0 +1,234 @@
+"""
+Reference implementations of the classic graph searches.
+
+Every search here takes a `pacai.core.search.problem.SearchProblem`
+and returns the list of actions that reaches a goal (or None if no goal can be reached),
+so they can be used anywhere a search function is expected, e.g.:
+```
+python -m pacai.bin.pacman --layout bigMaze --pacman SearchAgent \\
+    --agent-args fn=pacai.core.search.graph.astar,heuristic=pacai.core.search.heuristic.manhattan
+```
+
+All the searches:
+ - Keep the states they have reached in a hashed dict, so checking a state is O(1).
+ - Store one parent pointer per state instead of a copy of the path in every frontier node.
+   The path is only built once, when a goal is found.
+ - For the cost-ordered searches, use a binary heap with lazy deletion:
+   a state that is reached again for less is just pushed again,
+   and stale heap entries are skipped when they are popped.
+
+They all fill in the problem's `pacai.core.search.stats.SearchStats`.
+"""
+
+import collections
+import heapq
+import itertools
+
+from pacai.core.search.heuristic import null as nullHeuristic
+from pacai.core.search.stats import recordStats
+
+# How to order frontier nodes with the same priority (see `uniformCostSearch`/`aStarSearch`).
+# Expand the node that was pushed first.
+TIE_BREAK_FIFO = 'fifo'
+# Expand the node that was pushed last (tends to dive towards a goal on uniform-cost grids).
+TIE_BREAK_LIFO = 'lifo'
+# Expand the node with the highest path cost (the one that is closest to a goal by f - g).
+TIE_BREAK_HIGH_COST = 'high-cost'
+
+TIE_BREAKING_POLICIES = [TIE_BREAK_FIFO, TIE_BREAK_LIFO, TIE_BREAK_HIGH_COST]
+
+class ExpansionLimitReached(Exception):
+    """
+    Raised by a search that was given a `maxExpansions` and used them up
+    before it found a goal (or ran out of nodes).
+    """
+
+    pass
+
+@recordStats
+def breadthFirstSearch(problem):
+    """
+    Search the shallowest nodes in the search tree first.
+    States are checked for the goal as they are reached
+    (which is still optimal when every action costs the same).
+    """
+
+    stats = problem.getStats()
+
+    start = problem.startingState()
+    if (problem.isGoal(start)):
+        return []
+
+    parents = {start: (None, None)}
+    frontier = collections.deque([start])
+
+    while (len(frontier) > 0):
+        state = frontier.popleft()
+
+        successors = problem.successorStates(state)
+        for (successor, action, cost) in successors:
+            if (successor in parents):
+                stats.duplicates += 1
+                continue
+
+            parents[successor] = (state, action)
+
+            if (problem.isGoal(successor)):
+                stats.recordExpansion(len(successors), len(frontier))
+                return _buildPath(parents, successor)
+
+            frontier.append(successor)
+
+        stats.recordExpansion(len(successors), len(frontier))
+
+    return None
+
+@recordStats
+def depthFirstSearch(problem):
+    """
+    Search the deepest nodes in the search tree first.
+    """
+
+    stats = problem.getStats()
+    start = problem.startingState()
+
+    # State -> (parent state, action from the parent).
+    # A state is only given a parent when it is expanded.
+    parents = {}
+    frontier = [(start, None, None)]
+
+    while (len(frontier) > 0):
+        state, parent, action = frontier.pop()
+        if (state in parents):
+            continue
+
+        parents[state] = (parent, action)
+
+        if (problem.isGoal(state)):
+            return _buildPath(parents, state)
+
+        successors = problem.successorStates(state)
+        for (successor, nextAction, cost) in successors:
+            if (successor not in parents):
+                frontier.append((successor, state, nextAction))
+            else:
+                stats.duplicates += 1
+
+        stats.recordExpansion(len(successors), len(frontier))
+
+    return None
+
+@recordStats
+def uniformCostSearch(problem, tieBreaking = TIE_BREAK_FIFO):
+    """
+    Search the node of least total cost first.
+    """
+
+    return _bestFirstSearch(problem, nullHeuristic, tieBreaking)
+
+@recordStats
+def aStarSearch(problem, heuristic = nullHeuristic, tieBreaking = TIE_BREAK_FIFO,
+        maxExpansions = None):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    Expanded states are never reopened,
+    so the path is only guaranteed to be optimal for consistent heuristics.
+
+    If `maxExpansions` is given, an `ExpansionLimitReached` is raised
+    if the search would need to expand more nodes than that.
+    """
+
+    return _bestFirstSearch(problem, heuristic, tieBreaking, maxExpansions)
+
+def _bestFirstSearch(problem, heuristic, tieBreaking, maxExpansions = None):
+    if (tieBreaking not in TIE_BREAKING_POLICIES):
+        raise ValueError("Unknown tie breaking policy '%s', expected one of: %s." %
+                (tieBreaking, ', '.join(TIE_BREAKING_POLICIES)))
+
+    stats = problem.getStats()
+    counter = itertools.count()
+
+    def entry(cost, state, parent, action):
+        order = next(counter)
+
+        if (tieBreaking == TIE_BREAK_FIFO):
+            tie = order
+        elif (tieBreaking == TIE_BREAK_LIFO):
+            tie = -order
+        else:
+            tie = (-cost, order)
+
+        # The tie value is unique, so states themselves never get compared.
+        return (cost + heuristic(state, problem), tie, cost, state, parent, action)
+
+    start = problem.startingState()
+
+    # The lowest cost each state has been pushed with.
+    bestCosts = {start: 0}
+
+    # Expanded state -> (parent state, action from the parent).
+    parents = {}
+
+    frontier = [entry(0, start, None, None)]
+    expansions = 0
+
+    while (len(frontier) > 0):
+        priority, tie, cost, state, parent, action = heapq.heappop(frontier)
+
+        # A stale entry for a state that was already expanded through a cheaper path.
+        if (state in parents):
+            continue
+
+        parents[state] = (parent, action)
+
+        if (problem.isGoal(state)):
+            return _buildPath(parents, state)
+
+        if (maxExpansions is not None and expansions >= maxExpansions):
+            raise ExpansionLimitReached()
+
+        expansions += 1
+
+        successors = problem.successorStates(state)
+        for (successor, nextAction, stepCost) in successors:
+            if (successor in parents):
+                stats.duplicates += 1
+                continue
+
+            nextCost = cost + stepCost
+            if (successor in bestCosts):
+                stats.duplicates += 1
+                if (bestCosts[successor] <= nextCost):
+                    continue
+
+            bestCosts[successor] = nextCost
+            heapq.heappush(frontier, entry(nextCost, successor, state, nextAction))
+
+        stats.recordExpansion(len(successors), len(frontier))
+
+    return None
+
+def _buildPath(parents, state):
+    """
+    Follow the parent pointers from a state back to the start.
+    """
+
+    actions = []
+
+    while (True):
+        parent, action = parents[state]
+        if (action is None):
+            break
+
+        actions.append(action)
+        state = parent
+
+    actions.reverse()
+    return actions
+
+# Abbreviations
+
+bfs = breadthFirstSearch
+dfs = depthFirstSearch
+astar = aStarSearch
+ucs = uniformCostSearch
@@ -0,0 +1,452 @@
+"""
+Point-to-point searches for `pacai.core.search.position.PositionSearchProblem`.
+
+These searches know that a position problem is a 4-connected grid (`problem.walls`)
+with a single goal (`problem.goal`), and use that to expand far fewer nodes than
+the general searches in `pacai.core.search.graph`.
+They return an optimal list of actions (or None if the goal cannot be reached),
+so they can be used anywhere a search function is expected, e.g.:
+```
+python -m pacai.bin.pacman --layout openMaze --pacman SearchAgent \\
+    --agent-args fn=pacai.core.search.gridSearch.jps
+```
+
+ - `bidirectionalBreadthFirstSearch` grows a BFS from both ends and stops when they meet.
+ - `bidirectionalAStarSearch` does the same with A* (and allows non-uniform costs).
+ - `jumpPointSearch` only expands the cells where the shape of the walls forces a decision,
+   and jumps straight over everything in between (uniform costs only).
+ - `junctionGraphSearch` searches the layout's `pacai.core.junctionGraph.JunctionGraph`,
+   so it only expands intersections and dead ends (uniform costs only).
+
+They all fill in the problem's `pacai.core.search.stats.SearchStats`
+(the junction graph search only counts expanded and generated nodes).
+"""
+
+import heapq
+import itertools
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.junctionGraph import getJunctionGraph
+from pacai.core.search.heuristic import manhattan as manhattanHeuristic
+from pacai.core.search.position import DEFAULT_COST_FUNCTION
+from pacai.core.search.stats import recordStats
+
+@recordStats
+def bidirectionalBreadthFirstSearch(problem):
+    """
+    Run a BFS forwards from the start and backwards from the goal,
+    always growing whichever side has the smaller frontier by one whole layer.
+    Like `pacai.core.search.graph.breadthFirstSearch`, action costs are ignored.
+    """
+
+    stats = problem.getStats()
+
+    start, goal = problem.startingState(), problem.goal
+    if (start == goal):
+        return []
+
+    if (not _isOpen(problem.walls, goal)):
+        return None
+
+    # Position -> (neighbor towards the start/goal, action between them).
+    forwardParents = {start: (None, None)}
+    backwardParents = {goal: (None, None)}
+
+    forwardFrontier = [start]
+    backwardFrontier = [goal]
+
+    # The depth of the nodes reached by each side.
+    forwardDepths = {start: 0}
+    backwardDepths = {goal: 0}
+
+    while (len(forwardFrontier) > 0 and len(backwardFrontier) > 0):
+        forward = (len(forwardFrontier) <= len(backwardFrontier))
+
+        if (forward):
+            frontier, parents, depths = forwardFrontier, forwardParents, forwardDepths
+            otherDepths = backwardDepths
+        else:
+            frontier, parents, depths = backwardFrontier, backwardParents, backwardDepths
+            otherDepths = forwardDepths
+
+        # Finish the whole layer, since a later node in it may meet the other side sooner.
+        bestMeeting = None
+        bestLength = None
+        nextFrontier = []
+
+        for position in frontier:
+            neighbors = _neighbors(problem, position, forward)
+            stats.recordExpansion(len(neighbors), 0)
+
+            for (neighbor, action, stepCost) in neighbors:
+                if (neighbor in parents):
+                    stats.duplicates += 1
+                    continue
+
+                parents[neighbor] = (position, action)
+                depths[neighbor] = depths[position] + 1
+                nextFrontier.append(neighbor)
+
+                if (neighbor in otherDepths):
+                    length = depths[neighbor] + otherDepths[neighbor]
+                    if (bestLength is None or length < bestLength):
+                        bestMeeting = neighbor
+                        bestLength = length
+
+        if (forward):
+            stats.recordFrontier(len(nextFrontier) + len(backwardFrontier))
+        else:
+            stats.recordFrontier(len(forwardFrontier) + len(nextFrontier))
+
+        if (bestMeeting is not None):
+            return _joinPaths(forwardParents, backwardParents, bestMeeting)
+
+        if (forward):
+            forwardFrontier = nextFrontier
+        else:
+            backwardFrontier = nextFrontier
+
+    return None
+
+@recordStats
+def bidirectionalAStarSearch(problem, heuristic = manhattanHeuristic):
+    """
+    Run A* forwards from the start and backwards from the goal,
+    always expanding from whichever side has the smaller frontier.
+
+    The heuristic is called as `heuristic(position, problem)` for the forwards search,
+    and with a view of the problem where the goal is the start for the backwards search.
+    It should be consistent, like the default (manhattan distance).
+
+    The search stops once either side can no longer find anything
+    cheaper than the best path through a node both sides have reached.
+    """
+
+    stats = problem.getStats()
+
+    start, goal = problem.startingState(), problem.goal
+    if (start == goal):
+        return []
+
+    if (not _isOpen(problem.walls, goal)):
+        return None
+
+    reverseProblem = _ReverseView(problem)
+    sides = [
+        _AStarSide(start, lambda position: heuristic(position, problem), True),
+        _AStarSide(goal, lambda position: heuristic(position, reverseProblem), False),
+    ]
+
+    bestMeeting = None
+    bestCost = None
+
+    while (True):
+        for side in sides:
+            side.discardStale()
+
+        if (any([len(side.frontier) == 0 for side in sides])):
+            break
+
+        # Nothing left on either side can beat the best path found so far.
+        if (bestCost is not None and max([side.frontier[0][0] for side in sides]) >= bestCost):
+            break
+
+        if (len(sides[0].frontier) <= len(sides[1].frontier)):
+            side, other = sides
+        else:
+            other, side = sides
+
+        priority, tie, cost, position = heapq.heappop(side.frontier)
+        side.closed.add(position)
+
+        neighbors = _neighbors(problem, position, side.forward)
+        for (neighbor, action, stepCost) in neighbors:
+            if (neighbor in side.closed):
+                stats.duplicates += 1
+                continue
+
+            nextCost = cost + stepCost
+            if (neighbor in side.costs):
+                stats.duplicates += 1
+                if (side.costs[neighbor] <= nextCost):
+                    continue
+
+            side.costs[neighbor] = nextCost
+            side.parents[neighbor] = (position, action)
+            side.push(nextCost, neighbor)
+
+            if (neighbor in other.costs):
+                meetingCost = nextCost + other.costs[neighbor]
+                if (bestCost is None or meetingCost < bestCost):
+                    bestMeeting = neighbor
+                    bestCost = meetingCost
+
+        stats.recordExpansion(len(neighbors), len(side.frontier) + len(other.frontier))
+
+    if (bestMeeting is None):
+        return None
+
+    return _joinPaths(sides[0].parents, sides[1].parents, bestMeeting)
+
+@recordStats
+def jumpPointSearch(problem, heuristic = manhattanHeuristic):
+    """
+    A* over jump points (Jump Point Search for a 4-connected grid).
+
+    Out of all the optimal paths, only the ones that turn as late as possible need to be searched.
+    So from each expanded cell, the search slides in a straight line until it reaches the goal
+    or a cell where a wall opens up beside it (a forced turn),
+    and only those cells (the jump points) are pushed.
+    When moving vertically, a cell also stops the slide if a horizontal slide from it
+    would find a jump point.
+
+    All actions must cost the same (the default cost function).
+    """
+
+    _checkUniformCost(problem, 'Jump point search')
+
+    stats = problem.getStats()
+    walls = problem.walls
+    start, goal = problem.startingState(), problem.goal
+    if (start == goal):
+        return []
+
+    if (not _isOpen(walls, goal)):
+        return None
+
+    counter = itertools.count()
+
+    # Jump point -> (the jump point before it, direction vector from there).
+    parents = {}
+    bestCosts = {start: 0}
+    frontier = [(heuristic(start, problem), next(counter), 0, start, None, None)]
+
+    while (len(frontier) > 0):
+        priority, tie, cost, position, parent, direction = heapq.heappop(frontier)
+        if (position in parents):
+            continue
+
+        parents[position] = (parent, direction)
+
+        if (position == goal):
+            return _jumpPath(parents, goal)
+
+        # Expand through the problem so that the expanded count and the GUI highlight are right.
+        successors = problem.successorStates(position)
+        for (neighbor, action, stepCost) in successors:
+            dx, dy = Actions.directionToVector(action, 1)
+            if (not _isNaturalDirection(direction, dx, dy)):
+                continue
+
+            jumpPoint = _jump(walls, goal, position, dx, dy)
+            if (jumpPoint is None):
+                continue
+
+            if (jumpPoint in parents):
+                stats.duplicates += 1
+                continue
+
+            nextCost = cost + abs(jumpPoint[0] - position[0]) + abs(jumpPoint[1] - position[1])
+            if (jumpPoint in bestCosts):
+                stats.duplicates += 1
+                if (bestCosts[jumpPoint] <= nextCost):
+                    continue
+
+            bestCosts[jumpPoint] = nextCost
+            heapq.heappush(frontier, (nextCost + heuristic(jumpPoint, problem), next(counter),
+                    nextCost, jumpPoint, position, (dx, dy)))
+
+        stats.recordExpansion(len(successors), len(frontier))
+
+    return None
+
+@recordStats
+def junctionGraphSearch(problem):
+    """
+    Find a shortest path on the junction graph of the problem's walls,
+    where every corridor is a single weighted edge.
+    Only junctions count as expanded.
+
+    All actions must cost the same (the default cost function).
+    """
+
+    _checkUniformCost(problem, 'Junction graph search')
+
+    stats = problem.getStats()
+    graph = getJunctionGraph(problem.walls)
+
+    # Expand through the problem so that the expanded count and the GUI highlight are right.
+    def visit(position):
+        stats.recordExpansion(len(problem.successorStates(position)), 0)
+
+    return graph.findPath(problem.startingState(), problem.goal, visit = visit)
+
+class _AStarSide(object):
+    """
+    One direction of a bidirectional A*.
+    """
+
+    def __init__(self, origin, heuristic, forward):
+        self.heuristic = heuristic
+        self.forward = forward
+
+        self.costs = {origin: 0}
+        self.parents = {origin: (None, None)}
+        self.closed = set()
+
+        self._counter = itertools.count()
+        self.frontier = []
+        self.push(0, origin)
+
+    def discardStale(self):
+        """
+        Drop entries at the top of the frontier for positions that are already closed.
+        """
+
+        while (len(self.frontier) > 0 and self.frontier[0][3] in self.closed):
+            heapq.heappop(self.frontier)
+
+    def push(self, cost, position):
+        heapq.heappush(self.frontier,
+                (cost + self.heuristic(position), next(self._counter), cost, position))
+
+class _ReverseView(object):
+    """
+    A stand-in for a position problem that has its start and goal swapped,
+    so goal-based heuristics (like manhattan) can be used by a backwards search.
+    """
+
+    def __init__(self, problem):
+        self.walls = problem.walls
+        self.goal = problem.startingState()
+        self.startState = problem.goal
+
+    def startingState(self):
+        return self.startState
+
+def _checkUniformCost(problem, name):
+    if (getattr(problem, 'costFn', DEFAULT_COST_FUNCTION) is not DEFAULT_COST_FUNCTION):
+        raise ValueError('%s needs every action to cost the same.' % (name))
+
+def _isNaturalDirection(direction, dx, dy):
+    """
+    Check if a jump point reached moving in `direction` should be left in the direction (dx, dy).
+    Anything but going straight back is allowed (the start can be left in any direction).
+    """
+
+    if (direction is None):
+        return True
+
+    return (dx, dy) != (-direction[0], -direction[1])
+
+def _isOpen(walls, position):
+    x, y = position
+    return (0 <= x < walls.getWidth() and 0 <= y < walls.getHeight() and not walls[x][y])
+
+def _jump(walls, goal, position, dx, dy):
+    """
+    Slide from a position in a direction and return the first jump point (or None at a wall).
+    """
+
+    x, y = position
+
+    while (True):
+        x += dx
+        y += dy
+
+        if (not _isOpen(walls, (x, y))):
+            return None
+
+        if ((x, y) == goal):
+            return (x, y)
+
+        if (dx != 0):
+            # A wall beside the previous cell opens up beside this one.
+            for side in [-1, 1]:
+                if (_isOpen(walls, (x, y + side)) and not _isOpen(walls, (x - dx, y + side))):
+                    return (x, y)
+        else:
+            for side in [-1, 1]:
+                if (_isOpen(walls, (x + side, y)) and not _isOpen(walls, (x + side, y - dy))):
+                    return (x, y)
+
+            # Vertical slides stop anywhere a horizontal slide would find something.
+            if (_jump(walls, goal, (x, y), 1, 0) is not None
+                    or _jump(walls, goal, (x, y), -1, 0) is not None):
+                return (x, y)
+
+def _jumpPath(parents, goal):
+    """
+    Turn the chain of jump points ending at the goal into single-step actions.
+    """
+
+    actions = []
+    position = goal
+
+    while (True):
+        parent, direction = parents[position]
+        if (parent is None):
+            break
+
+        length = abs(position[0] - parent[0]) + abs(position[1] - parent[1])
+        actions += [Actions.vectorToDirection(direction)] * length
+        position = parent
+
+    actions.reverse()
+    return actions
+
+def _joinPaths(forwardParents, backwardParents, meeting):
+    """
+    Build the actions from the start to the meeting point (following the forward parents),
+    then from the meeting point to the goal (following the backward parents).
+    """
+
+    actions = []
+
+    position = meeting
+    while (True):
+        parent, action = forwardParents[position]
+        if (parent is None):
+            break
+
+        actions.append(action)
+        position = parent
+
+    actions.reverse()
+
+    position = meeting
+    while (True):
+        parent, action = backwardParents[position]
+        if (parent is None):
+            break
+
+        actions.append(action)
+        position = parent
+
+    return actions
+
+def _neighbors(problem, position, forward):
+    """
+    Get (neighbor, action, cost) for a position.
+    Forwards, these are just the problem's successors.
+    Backwards, they are the positions that can move into this one:
+    the action goes from the neighbor to this position and costs what entering this position costs.
+    """
+
+    successors = problem.successorStates(position)
+    if (forward):
+        return successors
+
+    costFn = getattr(problem, 'costFn', DEFAULT_COST_FUNCTION)
+    cost = costFn(position)
+
+    return [(neighbor, Directions.REVERSE[action], cost)
+            for (neighbor, action, stepCost) in successors]
+
+# Abbreviations
+
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
+junction = junctionGraphSearch
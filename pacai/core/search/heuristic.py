@@ -1,9 +1,24 @@
 """
 A heuristic function estimates the cost from the current state to the nearest
 goal in the provided `pacai.core.search.problem.SearchProblem`.
+
+The maze heuristics (`farthestFood`, `foodSpanningTree`, `mazeFood`, and `cornerTour`)
+use true maze distances from the shared `pacai.core.distanceCalculator.DistanceTable`,
+and remember their results in a bounded LRU cache kept in `problem.heuristicInfo`.
 """
 
+import itertools
+
 from pacai.core import distance
+from pacai.core.distanceCalculator import getWallsDistanceTable
+from pacai.util.lruCache import LRUCache
+
+# The most results the maze heuristics remember for a single problem.
+DEFAULT_CACHE_SIZE = 100000
+
+# Where the maze heuristics keep things in `problem.heuristicInfo`.
+CACHE_KEY = 'mazeHeuristicCache'
+DISTANCES_KEY = 'mazeDistanceTable'
 
 def null(state, problem = None):
     """
@@ -38,3 +53,164 @@ def numFood(state, problem):
     """
 
     return state[1].count()
+
+def farthestFood(state, problem):
+    """
+    This heuristic is the maze distance to the food that is farthest away.
+    Works with the states of both `pacai.core.search.food.FoodSearchProblem`
+    and `pacai.core.search.food.CompactFoodSearchProblem`.
+    """
+
+    position, foodKey = _getFoodKey(state, problem)
+
+    cache = _getCache(problem)
+    key = ('farthestFood', position, foodKey)
+
+    value = cache.get(key)
+    if (value is None):
+        distances = _getDistances(problem).getDistancesFrom(position,
+                _getFoodPositions(state, problem))
+        value = max(distances, default = 0)
+        cache.put(key, value)
+
+    return value
+
+def foodSpanningTree(state, problem):
+    """
+    This heuristic is the maze distance to the closest food,
+    plus the weight of a minimum spanning tree (by maze distance) over all the food left.
+    Any path that eats all the food has to reach some food and then connect all of it,
+    so this never overestimates.
+    The spanning tree only depends on the food left, so it is cached per food bitmask.
+    Works with the same states as `farthestFood`.
+    """
+
+    position, foodKey = _getFoodKey(state, problem)
+    if (foodKey == 0):
+        return 0
+
+    cache = _getCache(problem)
+    foods = _getFoodPositions(state, problem)
+    distances = _getDistances(problem)
+
+    key = ('foodSpanningTree', foodKey)
+    treeWeight = cache.get(key)
+    if (treeWeight is None):
+        treeWeight = _spanningTreeWeight(distances.getDistanceMatrix(foods, foods))
+        cache.put(key, treeWeight)
+
+    return min(distances.getDistancesFrom(position, foods)) + treeWeight
+
+def mazeFood(state, problem):
+    """
+    This heuristic is the best (largest) of `farthestFood` and `foodSpanningTree`.
+    """
+
+    return max(farthestFood(state, problem), foodSpanningTree(state, problem))
+
+def cornerTour(state, problem):
+    """
+    This heuristic is the length of the shortest tour (by maze distance)
+    from the current position through every corner that has not been visited yet.
+
+    The state should be (position, visited),
+    where visited has a truth value for each of `problem.corners` (in the same order).
+    """
+
+    position, visited = state
+    corners = tuple([corner for (corner, seen) in zip(problem.corners, visited)
+            if (not seen and corner != position)])
+
+    if (len(corners) == 0):
+        return 0
+
+    cache = _getCache(problem)
+    key = ('cornerTour', position, corners)
+
+    value = cache.get(key)
+    if (value is None):
+        distances = _getDistances(problem)
+        points = (position,) + corners
+        matrix = distances.getDistanceMatrix(points, points)
+
+        value = min([_tourLength(matrix, order)
+                for order in itertools.permutations(range(1, len(points)))])
+        cache.put(key, value)
+
+    return value
+
+def _getCache(problem):
+    info = _getHeuristicInfo(problem)
+    if (CACHE_KEY not in info):
+        info[CACHE_KEY] = LRUCache(DEFAULT_CACHE_SIZE)
+
+    return info[CACHE_KEY]
+
+def _getDistances(problem):
+    info = _getHeuristicInfo(problem)
+    if (DISTANCES_KEY not in info):
+        info[DISTANCES_KEY] = getWallsDistanceTable(problem.walls)
+
+    return info[DISTANCES_KEY]
+
+def _getFoodKey(state, problem):
+    """
+    Get (position, food key) for a food search state.
+    The food key is an int that is zero exactly when there is no food left.
+    """
+
+    position, food = state
+
+    # Compact states are two ints.
+    if (isinstance(food, int)):
+        return (problem.getPosition(state), food)
+
+    return (position, food.getBits())
+
+def _getFoodPositions(state, problem):
+    if (isinstance(state[1], int)):
+        return problem.getFoodPositions(state[1])
+
+    return state[1].asList()
+
+def _getHeuristicInfo(problem):
+    # Not every problem sets up a place for heuristics to store things.
+    if (not hasattr(problem, 'heuristicInfo')):
+        problem.heuristicInfo = {}
+
+    return problem.heuristicInfo
+
+def _spanningTreeWeight(matrix):
+    """
+    Prim's algorithm over a dense distance matrix.
+    """
+
+    numPoints = len(matrix)
+
+    inTree = [False] * numPoints
+    bestEdges = list(matrix[0])
+    inTree[0] = True
+
+    weight = 0
+    for i in range(numPoints - 1):
+        nextPoint = min([point for point in range(numPoints) if (not inTree[point])],
+                key = bestEdges.__getitem__)
+
+        weight += bestEdges[nextPoint]
+        inTree[nextPoint] = True
+
+        row = matrix[nextPoint]
+        for point in range(numPoints):
+            if (not inTree[point] and row[point] < bestEdges[point]):
+                bestEdges[point] = row[point]
+
+    return weight
+
+def _tourLength(matrix, order):
+    length = 0
+    previous = 0
+    for point in order:
+        length += matrix[previous][point]
+        previous = point
+
+    return length
@@ -41,6 +41,9 @@ class PositionSearchProblem(SearchProblem):
         if (state != self.goal):
             return False
 
+        if (not self.isTracingVisits()):
+            return True
+
         # Register the locations we have visited.
         # This allows the GUI to highlight them.
         self._visitedLocations.add(state)
@@ -69,9 +72,11 @@ class PositionSearchProblem(SearchProblem):
 
                 successors.append((nextState, action, cost))
 
+        if (self.isCounting()):
+            self._numExpanded += 1
+
         # Bookkeeping for display purposes (the highlight in the GUI).
-        self._numExpanded += 1
-        if (state not in self._visitedLocations):
+        if (self.isTracingVisits() and state not in self._visitedLocations):
             self._visitedLocations.add(state)
             # Note: visit history requires coordinates not states. In this situation
             # they are equivalent.
@@ -1,5 +1,16 @@
 import abc
 
+from pacai.core.search.stats import SearchStats
+
+# How much bookkeeping a search problem does while it is searched.
+# Off: nothing. Counters: the number of expanded nodes.
+# Full: the counters and every location visited (in order), so the GUI can highlight them.
+TRACE_OFF = 'off'
+TRACE_COUNTERS = 'counters'
+TRACE_FULL = 'full'
+
+TRACE_LEVELS = [TRACE_OFF, TRACE_COUNTERS, TRACE_FULL]
+
 class SearchProblem(abc.ABC):
     """
     This class outlines the structure of a search problem.
@@ -20,9 +31,13 @@ class SearchProblem(abc.ABC):
     states,
     while `SearchProblem.isGoal` and `SearchProblem.actionsCost` evaluate
     those same states and actions.
+
+    Problems start out with full tracing (see `SearchProblem.setTraceLevel`).
     """
 
     def __init__(self):
+        self._traceLevel = TRACE_FULL
+
         # The number of search nodes we expended.
         self._numExpanded = 0
 
@@ -32,6 +47,9 @@ class SearchProblem(abc.ABC):
         self._visitedLocations = set()
         self._visitHistory = []
 
+        # Filled in by the searches that are run on this problem.
+        self._stats = SearchStats()
+
     @abc.abstractmethod
     def actionsCost(self, actions):
         """
@@ -46,6 +64,16 @@ class SearchProblem(abc.ABC):
     def getExpandedCount(self):
         return self._numExpanded
 
+    def getStats(self):
+        """
+        Get the `pacai.core.search.stats.SearchStats` for the searches run on this problem.
+        """
+
+        return self._stats
+
+    def getTraceLevel(self):
+        return self._traceLevel
+
     def getVisitHistory(self):
         return self._visitHistory
 
@@ -71,6 +99,35 @@ class SearchProblem(abc.ABC):
 
         pass
 
+    def isCounting(self):
+        """
+        Check if expanded nodes should be counted.
+        """
+
+        return (self._traceLevel != TRACE_OFF)
+
+    def isTracingVisits(self):
+        """
+        Check if visited locations should be recorded.
+        """
+
+        return (self._traceLevel == TRACE_FULL)
+
+    def setTraceLevel(self, level):
+        """
+        Set how much bookkeeping this problem does (one of `TRACE_LEVELS`).
+        Nothing a search returns depends on the trace level,
+        so searches that only need a path can turn it down to save time and memory.
+        Problems that keep their own bookkeeping should check
+        `SearchProblem.isCounting` and `SearchProblem.isTracingVisits`.
+        """
+
+        if (level not in TRACE_LEVELS):
+            raise ValueError("Unknown trace level: '%s'. Expected one of: %s."
+                    % (level, ', '.join(TRACE_LEVELS)))
+
+        self._traceLevel = level
+
     @abc.abstractmethod
     def successorStates(self, state):
         """
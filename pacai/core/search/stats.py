@@ -0,0 +1,162 @@
+"""
+Statistics about the searches run on a search problem.
+
+Every `pacai.core.search.problem.SearchProblem` has a `SearchStats` (see `getStats()`),
+which the core searches fill in as they run.
+Search functions opt in with the `recordStats` decorator (which times the search and
+its heuristic calls) and by counting their own nodes, e.g.:
+```
+@recordStats
+def mySearch(problem, heuristic = nullHeuristic):
+    stats = problem.getStats()
+    ...
+    successors = problem.successorStates(state)
+    stats.recordExpansion(len(successors), len(frontier))
+```
+"""
+
+import functools
+import inspect
+import time
+
+class SearchStats(object):
+    """
+    Counters for all the searches run on one problem (they add up if a problem is searched again).
+
+    The counts are plain attributes, so searches can update them directly:
+    ```
+        expanded        the number of nodes whose successors were generated
+        generated       the number of successors generated
+        duplicates      the number of generated successors that had already been reached
+        peakFrontier    the most nodes waiting on the frontier at once
+        heuristicCalls  the number of times the heuristic was called
+        heuristicTime   the seconds spent in the heuristic
+        wallTime        the seconds spent searching (heuristic included)
+    ```
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.peakFrontier = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.wallTime = 0.0
+
+        # Searches can call other searches, only the outermost one is timed.
+        self._depth = 0
+        self._startTime = None
+
+    def add(self, counts):
+        """
+        Add counts (a dict like the one from `SearchStats.toDict`) from a search that ran
+        somewhere else, e.g. in another process.
+        Only the counts and heuristic time are added (not the peak frontier or wall time).
+        """
+
+        self.expanded += counts.get('expanded', 0)
+        self.generated += counts.get('generated', 0)
+        self.duplicates += counts.get('duplicates', 0)
+        self.heuristicCalls += counts.get('heuristicCalls', 0)
+        self.heuristicTime += counts.get('heuristicTime', 0.0)
+
+    def getNodesPerSecond(self):
+        if (self.wallTime <= 0.0):
+            return 0.0
+
+        return self.expanded / self.wallTime
+
+    def recordExpansion(self, numSuccessors, frontierSize):
+        """
+        Count one expanded node and its successors,
+        and note the size of the frontier after it was expanded.
+        """
+
+        self.expanded += 1
+        self.generated += numSuccessors
+
+        if (frontierSize > self.peakFrontier):
+            self.peakFrontier = frontierSize
+
+    def recordFrontier(self, frontierSize):
+        if (frontierSize > self.peakFrontier):
+            self.peakFrontier = frontierSize
+
+    def start(self):
+        self._depth += 1
+        if (self._depth == 1):
+            self._startTime = time.perf_counter()
+
+    def stop(self):
+        self._depth -= 1
+        if (self._depth == 0):
+            self.wallTime += time.perf_counter() - self._startTime
+            self._startTime = None
+
+    def timeHeuristic(self, heuristic):
+        """
+        Get a version of a heuristic that counts and times its calls.
+        Heuristics that are already timed by this object are returned as is.
+        """
+
+        if (getattr(heuristic, '_searchStats', None) is self):
+            return heuristic
+
+        def timedHeuristic(state, problem):
+            startTime = time.perf_counter()
+            value = heuristic(state, problem)
+
+            self.heuristicTime += time.perf_counter() - startTime
+            self.heuristicCalls += 1
+
+            return value
+
+        timedHeuristic._searchStats = self
+        return timedHeuristic
+
+    def toDict(self):
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'peakFrontier': self.peakFrontier,
+            'heuristicCalls': self.heuristicCalls,
+            'heuristicTime': self.heuristicTime,
+            'wallTime': self.wallTime,
+            'nodesPerSecond': self.getNodesPerSecond(),
+        }
+
+    def __str__(self):
+        values = (self.expanded, self.generated, self.duplicates, self.peakFrontier,
+                self.heuristicCalls, self.heuristicTime, self.wallTime, self.getNodesPerSecond())
+
+        return ('expanded: %d, generated: %d, duplicates: %d, peak frontier: %d, '
+                + 'heuristic calls: %d (%.3f s), wall time: %.3f s (%.0f nodes/s)') % values
+
+def recordStats(search):
+    """
+    A decorator for search functions that times the search (in the problem's `SearchStats`),
+    and swaps the `heuristic` argument (if the search has one) for a timed version.
+    """
+
+    signature = inspect.signature(search)
+    hasHeuristic = ('heuristic' in signature.parameters)
+
+    @functools.wraps(search)
+    def recordedSearch(problem, *args, **kwargs):
+        stats = problem.getStats()
+
+        if (hasHeuristic):
+            arguments = signature.bind(problem, *args, **kwargs)
+            arguments.apply_defaults()
+            arguments.arguments['heuristic'] = stats.timeHeuristic(arguments.arguments['heuristic'])
+            args, kwargs = arguments.args[1:], arguments.kwargs
+
+        stats.start()
+        try:
+            return search(problem, *args, **kwargs)
+        finally:
+            stats.stop()
+
+    return recordedSearch
@@ -0,0 +1,48 @@
+"""
+Zobrist keys for hashing game boards incrementally.
+
+Every (item, cell) pair on a board gets a random 64-bit key.
+The hash of a board is the XOR of the keys of everything on it,
+so adding or removing a single item is just one more XOR.
+"""
+
+import random
+
+KEY_BITS = 64
+
+class ZobristTable(object):
+    """
+    The Zobrist keys for a single `pacai.core.layout.Layout`.
+    Keys are seeded from the layout text,
+    so the same layout will always produce the same keys (and they never touch the global RNG).
+    """
+
+    def __init__(self, layout):
+        self._height = layout.height
+
+        rand = random.Random('\n'.join(layout.layoutText))
+        numCells = layout.width * layout.height
+
+        self._foodKeys = [rand.getrandbits(KEY_BITS) for i in range(numCells)]
+        self._capsuleKeys = [rand.getrandbits(KEY_BITS) for i in range(numCells)]
+
+        self._initialKey = 0
+
+        for (x, y) in layout.food.asList():
+            self._initialKey ^= self.getFoodKey(x, y)
+
+        for (x, y) in layout.capsules:
+            self._initialKey ^= self.getCapsuleKey(x, y)
+
+    def getCapsuleKey(self, x, y):
+        return self._capsuleKeys[x * self._height + y]
+
+    def getFoodKey(self, x, y):
+        return self._foodKeys[x * self._height + y]
+
+    def getInitialKey(self):
+        """
+        Get the key for the board as described by the layout (all food and capsules present).
+        """
+
+        return self._initialKey
@@ -5,6 +5,7 @@ import random
 from pacai.core.directions import Directions
 from pacai.agents.base import BaseAgent
 from pacai.agents.search.multiagent import MultiAgentSearchAgent
+from pacai.util import transpositionTable
 
 class ReflexAgent(BaseAgent):
     """
@@ -123,6 +124,9 @@ class MinimaxAgent(MultiAgentSearchAgent):
     # Minimax function, recursively called by min, max, and getAction, returns value
     def minimax(self, state, depth, agent):
 
+        # Stop if an iterative search is out of time
+        self.visitNode()
+
         # Check if state is win/lose state, or if you have reached terminal depth
         if state.isLose() or state.isWin() or depth == self.getTreeDepth():
 
@@ -130,13 +134,27 @@ class MinimaxAgent(MultiAgentSearchAgent):
             func = self.getEvaluationFunction()
             return func(state)
 
+        # The same state can be reached by moving in a different order,
+        # so check if it has already been searched (to the same depth, on the same turn)
+        table = self.getTranspositionTable()
+        key = self.getTableKey(state, depth, agent)
+        if table is not None:
+            entry = table.get(key)
+            if entry is not None:
+                return entry[0]
+
         # If agent is 0, do max because agent is pacman
         if agent == 0:
-            return self.max(state, depth, agent)
+            value = self.max(state, depth, agent)
 
         # otherwise agent is 1 to (numAgents-1), do min because agent is ghost
         else:
-            return self.min(state, depth, agent)
+            value = self.min(state, depth, agent)
+
+        if table is not None:
+            table.put(key, key[1], value)
+
+        return value
 
     # Min function for minimax, called recursively by minimax, and calls minimax rescursively
     def min(self, state, depth, agent):
@@ -156,11 +174,14 @@ class MinimaxAgent(MultiAgentSearchAgent):
         # Go through possible legal actions
         for actions in legal:
 
-            # Get successor state using agent and action
-            succ = state.generateSuccessor(agent, actions)
+            # Make the move on this state (instead of copying it into a successor)
+            state.apply(agent, actions)
 
             # Get minimax value for successor state, increment agent and modulo with numAgents
-            new = self.minimax(succ, depth, ((agent + 1) % numAgents))
+            new = self.minimax(state, depth, ((agent + 1) % numAgents))
+
+            # Take the move back, so the state is ready for the next action
+            state.undo()
 
             # If minimax value for successor state less than min, replace min with it
             if new is not None and new < mini:
@@ -189,11 +210,14 @@ class MinimaxAgent(MultiAgentSearchAgent):
         # Go through possible legal actions
         for actions in legal:
 
-            # Get successor state using agent and action
-            succ = state.generateSuccessor(agent, actions)
+            # Make the move on this state (instead of copying it into a successor)
+            state.apply(agent, actions)
 
             # Get minimax value for successor state, increment agent and modulo with numAgents
-            new = self.minimax(succ, depth, ((agent + 1) % numAgents))
+            new = self.minimax(state, depth, ((agent + 1) % numAgents))
+
+            # Take the move back, so the state is ready for the next action
+            state.undo()
 
             # If minimax value for successor state more than max, replace max with it
             if new is not None and new > maxi:
@@ -205,6 +229,16 @@ class MinimaxAgent(MultiAgentSearchAgent):
     # Returns best action determined by minimax
     def getAction(self, state):
 
+        # Entries from earlier moves can still be used, but should be replaced first
+        if self.getTranspositionTable() is not None:
+            self.getTranspositionTable().newSearch()
+
+        # Search to a fixed depth, or deeper and deeper if there is a move time
+        return self.iterativeDeepening(state, self.search)
+
+    # Returns best action determined by minimax to the current tree depth
+    def search(self, state):
+
         # Get legal actions for pacman when it first calls getAction
         legal = state.getLegalActions(0)
 
@@ -218,14 +252,12 @@ class MinimaxAgent(MultiAgentSearchAgent):
         # Default return direction is STOP
         ret = Directions.STOP
 
-        # Go through possible legal actions
-        for actions in legal:
-
-            # Get successor state using agent and action
-            succ = state.generateSuccessor(0, actions)
+        # Get the minimax value for each possible legal action
+        # (split across worker processes if the agent has any)
+        values = self.searchRootActions(state, legal, self.searchRootAction)
 
-            # Kickoff minimax recursion for a possible action
-            new = self.minimax(succ, 0, 0)
+        # Go through possible legal actions
+        for actions, new in zip(legal, values):
 
             # If max variable is less than the minimax value, replace max and set the return string
             if new is not None and new > max:
@@ -235,6 +267,16 @@ class MinimaxAgent(MultiAgentSearchAgent):
         # Return best action determined by minimax
         return ret
 
+    # Returns the minimax value of pacman taking an action
+    def searchRootAction(self, state, action, alpha):
+
+        # Get successor state using agent and action
+        # (the search below makes and takes back moves on it, so the game's state is left alone)
+        succ = state.generateSuccessor(0, action)
+
+        # Kickoff minimax recursion for a possible action
+        return self.minimax(succ, 0, 0)
+
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
     A minimax agent with alpha-beta pruning.
@@ -251,76 +293,144 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         super().__init__(index, **kwargs)
 
     # Exactly the same as minimax above, only 2 extra args passed in
+    # Values inside the (alpha, beta) window are exact,
+    # a value <= alpha is an upper bound and a value >= beta is a lower bound
     def minimax(self, state, depth, agent, alpha, beta):
+        self.visitNode()
+
         if state.isLose() or state.isWin() or depth == self.getTreeDepth():
             func = self.getEvaluationFunction()
             return func(state)
+
+        # Use what is known about this state from an earlier search,
+        # a bound is only good enough if it is outside of the window
+        table = self.getTranspositionTable()
+        key = self.getTableKey(state, depth, agent)
+        if table is not None:
+            entry = table.get(key)
+            if entry is not None:
+                value, flag, action = entry
+                if (flag == transpositionTable.EXACT
+                        or (flag == transpositionTable.LOWER_BOUND and value >= beta)
+                        or (flag == transpositionTable.UPPER_BOUND and value <= alpha)):
+                    return value
+
         if agent == 0:
-            return self.max(state, depth, agent, alpha, beta)
+            value, action = self.max(state, depth, agent, alpha, beta)
         else:
-            return self.min(state, depth, agent, alpha, beta)
+            value, action = self.min(state, depth, agent, alpha, beta)
+
+        # Keep the best action too, the next iteration of a timed search tries it first
+        if table is not None:
+            flag = transpositionTable.EXACT
+            if value <= alpha:
+                # Every action was bad, so none of them is really the best
+                flag = transpositionTable.UPPER_BOUND
+                action = None
+            elif value >= beta:
+                flag = transpositionTable.LOWER_BOUND
+
+            table.put(key, key[1], value, flag, action)
+
+        return value
 
     # Almost exactly the same as min in class above, only changes are commented
+    # Returns the value and the action that got it
     def min(self, state, depth, agent, alpha, beta):
         mini = 999999
+        best = None
         numAgents = state.getNumAgents()
         legal = state.getLegalActions(agent)
         for action in legal:
             if action == Directions.STOP:
                 legal.pop(legal.index(action))
+
+        # Try the actions most likely to cause a cutoff first
+        legal = self.orderActions(state, depth, agent, legal)
+
         for actions in legal:
-            succ = state.generateSuccessor(agent, actions)
-            new = self.minimax(succ, depth, ((agent + 1) % numAgents), alpha, beta)
+            state.apply(agent, actions)
+            new = self.minimax(state, depth, ((agent + 1) % numAgents), alpha, beta)
+            state.undo()
 
-            # If new value greater than beta, just return beta
-            if new > beta:
-                return beta
-            if new is not None and new < mini:
+            if new < mini:
                 mini = new
+                best = actions
 
-                # Set beta when smallest value is found
-                beta = new
-        return mini
+            # Pacman already has something at least as good as this, stop looking
+            if mini <= alpha:
+                self.recordCutoff(state, depth, agent, actions)
+                return mini, best
+
+            # Set beta when smallest value is found
+            beta = min(beta, mini)
+        return mini, best
 
     # Almost exactly the same as max in class above, only changes are commented
+    # Returns the value and the action that got it
     def max(self, state, depth, agent, alpha, beta):
         depth += 1
         maxi = -999999
+        best = None
         legal = state.getLegalActions(agent)
         numAgents = state.getNumAgents()
         for action in legal:
             if action == Directions.STOP:
                 legal.pop(legal.index(action))
+
+        # Try the actions most likely to cause a cutoff first
+        # (the search is already one level down here)
+        legal = self.orderActions(state, depth - 1, agent, legal)
+
         for actions in legal:
-            succ = state.generateSuccessor(agent, actions)
-            new = self.minimax(succ, depth, ((agent + 1) % numAgents), alpha, beta)
+            state.apply(agent, actions)
+            new = self.minimax(state, depth, ((agent + 1) % numAgents), alpha, beta)
+            state.undo()
 
-            # If new value less than alpha, return alpha
-            if new < alpha:
-                return alpha
-            if new is not None and new > maxi:
+            if new > maxi:
                 maxi = new
+                best = actions
 
-                # Set alpha when largest value is found
-                alpha = new
-        return maxi
+            # A ghost already has something at least as good as this, stop looking
+            if maxi >= beta:
+                self.recordCutoff(state, depth - 1, agent, actions)
+                return maxi, best
+
+            # Set alpha when largest value is found
+            alpha = max(alpha, maxi)
+        return maxi, best
 
     # Basically exact same as getAction for minimax, just a different call to minimax
     def getAction(self, state):
+        if self.getTranspositionTable() is not None:
+            self.getTranspositionTable().newSearch()
+
+        return self.iterativeDeepening(state, self.search)
+
+    def search(self, state):
         legal = state.getLegalActions(0)
         for action in legal:
             if action == Directions.STOP:
                 legal.pop(legal.index(action))
-        max = 0
+
+        # Try the move from the last iteration first, so the window is tight early
+        legal = self.orderRootActions(legal)
+
+        best = 0
         ret = Directions.STOP
-        for actions in legal:
-            succ = state.generateSuccessor(0, actions)
-            new = self.minimax(succ, 0, 0, -999999, 999999)
-            if new is not None and new > max:
-                max = new
+
+        # Only moves that beat the best so far matter, so alpha starts at the best
+        values = self.searchRootActions(state, legal, self.searchRootAction, alpha = best)
+        for actions, new in zip(legal, values):
+            if new > best:
+                best = new
                 ret = actions
         return ret
 
+    def searchRootAction(self, state, action, alpha):
+        succ = state.generateSuccessor(0, action)
+        return self.minimax(succ, 0, 0, alpha, 999999)
+
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
     An expectimax agent.
@@ -340,13 +450,28 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
 
     # Exactly the same as minimax function from Minimax class
     def minimax(self, state, depth, agent):
+        self.visitNode()
+
         if state.isLose() or state.isWin() or depth == self.getTreeDepth():
             func = self.getEvaluationFunction()
             return func(state)
+
+        table = self.getTranspositionTable()
+        key = self.getTableKey(state, depth, agent)
+        if table is not None:
+            entry = table.get(key)
+            if entry is not None:
+                return entry[0]
+
         if agent == 0:
-            return self.max(state, depth, agent)
+            value = self.max(state, depth, agent)
         else:
-            return self.min(state, depth, agent)
+            value = self.min(state, depth, agent)
+
+        if table is not None:
+            table.put(key, key[1], value)
+
+        return value
 
     # Basically exactly the same as mn function from Minimax class, changes commented
     def min(self, state, depth, agent):
@@ -362,8 +487,9 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         # Set variable to calculate average
         i = len(legal)
         for actions in legal:
-            succ = state.generateSuccessor(agent, actions)
-            new = self.minimax(succ, depth, ((agent + 1) % numAgents))
+            state.apply(agent, actions)
+            new = self.minimax(state, depth, ((agent + 1) % numAgents))
+            state.undo()
 
             # Compound to variable to be averaged using calculated minimax function
             mini += new
@@ -381,28 +507,38 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
             if action == Directions.STOP:
                 legal.pop(legal.index(action))
         for actions in legal:
-            succ = state.generateSuccessor(agent, actions)
-            new = self.minimax(succ, depth, ((agent + 1) % numAgents))
+            state.apply(agent, actions)
+            new = self.minimax(state, depth, ((agent + 1) % numAgents))
+            state.undo()
             if new is not None and new > maxi:
                 maxi = new
         return maxi
 
     # Exactly the same as getAction function from Minimax class
     def getAction(self, state):
+        if self.getTranspositionTable() is not None:
+            self.getTranspositionTable().newSearch()
+
+        return self.iterativeDeepening(state, self.search)
+
+    def search(self, state):
         legal = state.getLegalActions(0)
         for action in legal:
             if action == Directions.STOP:
                 legal.pop(legal.index(action))
         max = 0
         ret = Directions.STOP
-        for actions in legal:
-            succ = state.generateSuccessor(0, actions)
-            new = self.minimax(succ, 0, 0)
+        values = self.searchRootActions(state, legal, self.searchRootAction)
+        for actions, new in zip(legal, values):
             if new is not None and new > max:
                 max = new
                 ret = actions
         return ret
 
+    def searchRootAction(self, state, action, alpha):
+        succ = state.generateSuccessor(0, action)
+        return self.minimax(succ, 0, 0)
+
 
 def betterEvaluationFunction(currentGameState):
     """
@@ -47,20 +47,18 @@ class firstAgent(OffensiveReflexAgent):
         # This should always be True, but better safe than sorry.
         if (len(foodList) > 0):
             myPos = successor.getAgentState(self.index).getPosition()
-            minDistance = min([self.getMazeDistance(myPos, food) for food in foodList])
-            features['distanceToFood'] = minDistance
+            features['distanceToFood'] = self.getNearestMazeDistance(myPos, foodList)[1]
 
         cList = self.getCapsules(successor)
         if len(cList) > 0:
             myPos = successor.getAgentState(self.index).getPosition()
-            minDistance = min([self.getMazeDistance(myPos, capsule) for capsule in cList])
-            features['capsule'] = minDistance
+            features['capsule'] = self.getNearestMazeDistance(myPos, cList)[1]
 
         enemies = [successor.getAgentState(i) for i in self.getOpponents(successor)]
         invaders = [a for a in enemies if not a.isPacman() and a.getPosition() is not None]
         if (len(invaders) > 0):
-            dists = [self.getMazeDistance(myPos, a.getPosition()) for a in invaders]
-            features['invaderDistance'] = min(dists)
+            invaderPositions = [a.getPosition() for a in invaders]
+            features['invaderDistance'] = self.getNearestMazeDistance(myPos, invaderPositions)[1]
         else:
             features['invaderDistance'] = -1
 
@@ -137,18 +135,16 @@ class secondAgent(DefensiveReflexAgent):
         # This should always be True, but better safe than sorry.
         if (len(foodList) > 0):
             myPos = successor.getAgentState(self.index).getPosition()
-            minDistance = min([self.getMazeDistance(myPos, food) for food in foodList])
-            features['distanceToProtectFood'] = minDistance
+            features['distanceToProtectFood'] = self.getNearestMazeDistance(myPos, foodList)[1]
 
         cList = self.getCapsulesYouAreDefending(successor)
         if len(cList) > 0:
             myPos = successor.getAgentState(self.index).getPosition()
-            minDistance = min([self.getMazeDistance(myPos, capsule) for capsule in cList])
-            features['capsule'] = minDistance
+            features['capsule'] = self.getNearestMazeDistance(myPos, cList)[1]
 
         if (len(invaders) > 0):
-            dists = [self.getMazeDistance(myPos, a.getPosition()) for a in invaders]
-            features['invaderDistance'] = min(dists)
+            invaderPositions = [a.getPosition() for a in invaders]
+            features['invaderDistance'] = self.getNearestMazeDistance(myPos, invaderPositions)[1]
         else:
             features['invaderDistance'] = -1
 
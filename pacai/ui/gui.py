@@ -157,7 +157,7 @@ class AbstractGUIView(AbstractView):
         if (not forceDraw and self._adjustFPS()):
             return
 
-        image = frame.toImage(self._sprites, self._font)
+        image = frame.toImage(self._getSprites(), self._getFont())
 
         # Check for a resize.
         if (self._height != frame.getImageHeight() or self._width != frame.getImageWidth()):
@@ -3,6 +3,8 @@ The graphics for pacman are held in a spritesheet.
 This file knows how to read a spritesheet and map sprites to tokens.
 """
 
+import os
+
 from PIL import Image
 
 from pacai.core.directions import Directions
@@ -66,7 +68,23 @@ SPRITE_SHEET_AGENTS = [
     (token.GHOST_6, 12),
 ]
 
+# Sprite sheets that have already been loaded, keyed by their real path.
+# Sprites are only ever read (pasted onto frames), so every view in this process can share them.
+_spriteCache = {}
+
 def loadSpriteSheet(path):
+    """
+    Get the sprites (keyed by token) for a sprite sheet.
+    Each sheet is only read and cropped once per process.
+    """
+
+    key = os.path.realpath(path)
+    if (key not in _spriteCache):
+        _spriteCache[key] = _loadSpriteSheet(path)
+
+    return _spriteCache[key]
+
+def _loadSpriteSheet(path):
     spritesheet = Image.open(path)
 
     sprites = {}
@@ -40,8 +40,10 @@ class AbstractView(abc.ABC):
         # (Tracked by the number of times agent 0 has been animated.)
         self._turnCount = 0
 
-        self._sprites = spritesheet.loadSpriteSheet(spritesPath)
-        self._font = ImageFont.truetype(FONT_PATH, spritesheet.SQUARE_SIZE - 14)
+        # Sprites and fonts are only needed to rasterize frames,
+        # so they are not loaded until the first time that happens (see _getSprites()/_getFont()).
+        self._sprites = None
+        self._font = None
 
     def finish(self):
         """
@@ -52,7 +54,10 @@ class AbstractView(abc.ABC):
         if (self._saveFrames and len(self._keyFrames) > 0):
             gifTimePerFrameMS = int(1.0 / self._gifFPS * 1000.0)
 
-            images = [frame.toImage(self._sprites, self._font) for frame in self._keyFrames]
+            sprites = self._getSprites()
+            font = self._getFont()
+
+            images = [frame.toImage(sprites, font) for frame in self._keyFrames]
             images[0].save(self._gifPath, save_all = True, append_images = images,
                     duration = gifTimePerFrameMS, loop = 0, optimize = False)
 
@@ -70,6 +75,13 @@ class AbstractView(abc.ABC):
 
         pass
 
+    def isSavingFrames(self):
+        """
+        Check if this view saves the frames it produces (into a gif).
+        """
+
+        return self._saveFrames
+
     def update(self, state, forceDraw = False):
         """
         Materialize the view, given a state.
@@ -89,6 +101,18 @@ class AbstractView(abc.ABC):
         if (state.getLastAgentMoved() == 0):
             self._turnCount += 1
 
+    def _getFont(self):
+        if (self._font is None):
+            self._font = ImageFont.truetype(FONT_PATH, spritesheet.SQUARE_SIZE - 14)
+
+        return self._font
+
+    def _getSprites(self):
+        if (self._sprites is None):
+            self._sprites = spritesheet.loadSpriteSheet(self._spritesPath)
+
+        return self._sprites
+
     @abc.abstractmethod
     def _createFrame(self, state):
         """
@@ -0,0 +1,50 @@
+"""
+A bounded cache that forgets the least recently used entries.
+"""
+
+import collections
+
+class LRUCache(object):
+    """
+    A dict-like cache that holds at most `maxSize` entries.
+    When it is full, adding an entry drops the entry that was used (read or written) longest ago.
+    """
+
+    def __init__(self, maxSize):
+        if (maxSize < 1):
+            raise ValueError('An LRU cache needs room for at least one entry.')
+
+        self._maxSize = maxSize
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default = None):
+        """
+        Get the value for a key (marking it as recently used),
+        or the default if the key is not in the cache.
+        """
+
+        if (key not in self._entries):
+            return default
+
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def getMaxSize(self):
+        return self._maxSize
+
+    def put(self, key, value):
+        """
+        Add or replace an entry.
+        """
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        if (len(self._entries) > self._maxSize):
+            self._entries.popitem(last = False)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
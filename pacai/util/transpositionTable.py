@@ -0,0 +1,122 @@
+"""
+A fixed-size transposition table for game tree searches.
+"""
+
+# What a stored value means (for searches with a window, like alpha-beta).
+# The value is the exact value of the node.
+EXACT = 0
+# The search failed high: the node is worth at least the value.
+LOWER_BOUND = 1
+# The search failed low: the node is worth at most the value.
+UPPER_BOUND = 2
+
+DEFAULT_SIZE = 2 ** 16
+
+class TranspositionTable(object):
+    """
+    Remembers the values of game tree nodes so that positions that are reached again
+    (through a different order of moves) do not have to be searched again.
+
+    Keys are hashable and should identify a node completely,
+    e.g. (hash(state), remaining depth, agent index).
+    The table has `size` slots and each key can only go in one of them (picked by its hash),
+    so memory never grows.
+    When two keys want the same slot, the new entry replaces the old one if the old one is
+    from an older search (see `TranspositionTable.newSearch`) or was searched no deeper,
+    otherwise the old entry is kept (deeper entries saved more work).
+
+    The table counts its probes, hits, and stores, see `TranspositionTable.getStats`.
+    """
+
+    def __init__(self, size = DEFAULT_SIZE):
+        if (size < 1):
+            raise ValueError('A transposition table needs at least one slot.')
+
+        self._size = size
+
+        # Each slot is None or (key, depth, generation, value, flag, action).
+        self._slots = [None] * size
+        self._generation = 0
+
+        self._probes = 0
+        self._hits = 0
+        self._stores = 0
+        self._replacements = 0
+        self._rejections = 0
+
+    def clear(self):
+        self._slots = [None] * self._size
+
+    def get(self, key):
+        """
+        Get the (value, flag, action) stored for a key, or None if it is not in the table.
+        """
+
+        self._probes += 1
+
+        entry = self._slots[hash(key) % self._size]
+        if (entry is None or entry[0] != key):
+            return None
+
+        self._hits += 1
+        return entry[3:]
+
+    def getHitRate(self):
+        if (self._probes == 0):
+            return 0.0
+
+        return self._hits / self._probes
+
+    def getSize(self):
+        return self._size
+
+    def getStats(self):
+        """
+        Get the counts for this table (since it was made) as a dict:
+        ```
+            probes          the number of lookups
+            hits            the number of lookups that found their key
+            hitRate         hits / probes
+            stores          the number of entries that were stored
+            replacements    stored entries that replaced a different key
+            rejections      entries that were not stored because their slot held a deeper one
+        ```
+        """
+
+        return {
+            'probes': self._probes,
+            'hits': self._hits,
+            'hitRate': self.getHitRate(),
+            'stores': self._stores,
+            'replacements': self._replacements,
+            'rejections': self._rejections,
+        }
+
+    def newSearch(self):
+        """
+        Mark the start of a new search (e.g. a new move).
+        Entries from earlier searches are still used, but are always replaced first.
+        """
+
+        self._generation += 1
+
+    def put(self, key, depth, value, flag = EXACT, action = None):
+        """
+        Store a value for a key that was searched `depth` more levels down.
+        """
+
+        index = hash(key) % self._size
+        entry = self._slots[index]
+
+        if (entry is not None and entry[0] != key):
+            if (entry[2] == self._generation and entry[1] > depth):
+                self._rejections += 1
+                return
+
+            self._replacements += 1
+
+        self._slots[index] = (key, depth, self._generation, value, flag, action)
+        self._stores += 1
+
+    def __len__(self):
+        return len([entry for entry in self._slots if (entry is not None)])
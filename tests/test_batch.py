@@ -0,0 +1,85 @@
+import random
+import unittest
+
+from pacai.bin import pacman
+from pacai.core.batch import PacmanBatch
+from pacai.core.directions import Directions
+from pacai.core.layout import getLayout
+
+LAYOUTS = ['capsuleClassic', 'mediumClassic', 'smallClassic', 'trickyClassic']
+NUM_GAMES = 8
+NUM_TURNS = 150
+
+"""
+Test that batched games follow exactly the same rules as regular game states.
+"""
+class PacmanBatchTest(unittest.TestCase):
+    def test_equivalence(self):
+        rng = random.Random(4)
+
+        for layoutName in LAYOUTS:
+            layout = getLayout(layoutName)
+            batch = PacmanBatch(layout, NUM_GAMES)
+            states = [pacman.PacmanGameState(layout) for i in range(NUM_GAMES)]
+
+            for turn in range(NUM_TURNS):
+                for agentIndex in range(batch.getNumAgents()):
+                    legalActions = batch.getLegalActions(agentIndex)
+                    actions = []
+                    expectedRewards = []
+
+                    for game in range(NUM_GAMES):
+                        state = states[game]
+
+                        if (state.isOver()):
+                            self.assertEqual([], legalActions[game])
+                            actions.append(None)
+                            expectedRewards.append(0)
+                            continue
+
+                        self.assertEqual(state.getLegalActions(agentIndex), legalActions[game])
+
+                        action = rng.choice(legalActions[game])
+                        actions.append(action)
+
+                        states[game] = state.generateSuccessor(agentIndex, action)
+                        expectedRewards.append(states[game].getScore() - state.getScore())
+
+                    self.assertEqual(expectedRewards, batch.step(agentIndex, actions))
+
+                    for game in range(NUM_GAMES):
+                        self.assertEqual(states[game].getSnapshot(), batch.getSnapshot(game))
+
+            # Some games should have ended along the way.
+            self.assertTrue(any([state.isOver() for state in states]))
+
+    def test_state_round_trip(self):
+        layout = getLayout('mediumClassic')
+        batch = PacmanBatch(layout, 2)
+
+        state = pacman.PacmanGameState(layout)
+        for action in [Directions.WEST, Directions.WEST, Directions.EAST]:
+            state = state.generateSuccessor(pacman.PACMAN_AGENT_INDEX, action)
+
+        batch.setState(1, state)
+
+        self.assertEqual(state, batch.getState(1))
+        self.assertEqual(hash(state), hash(batch.getState(1)))
+        self.assertEqual(pacman.PacmanGameState(layout), batch.getState(0))
+
+        batch.reset([1])
+        self.assertEqual(batch.getState(0), batch.getState(1))
+
+    def test_illegal_action(self):
+        layout = getLayout('mediumClassic')
+        batch = PacmanBatch(layout, 2)
+
+        actions = [Directions.WEST, Directions.NORTH]
+        self.assertRaises(ValueError, batch.step, pacman.PACMAN_AGENT_INDEX, actions)
+
+        # Nothing moved.
+        self.assertEqual(batch.getState(0), batch.getState(1))
+        self.assertRaises(ValueError, batch.step, pacman.PACMAN_AGENT_INDEX, [Directions.STOP])
+
+if __name__ == '__main__':
+    unittest.main()
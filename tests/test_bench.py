@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from pacai.bench import ordering as orderingBench
+from pacai.bench import search as searchBench
+
+"""
+Test the search benchmark.
+"""
+class SearchBenchmarkTest(unittest.TestCase):
+    def test_cases(self):
+        layouts = searchBench.getLayoutNames()
+        self.assertIn('bigMaze', layouts)
+        self.assertIn('trickySearch', layouts)
+        self.assertIn('tinyCorners', layouts)
+        self.assertNotIn('mediumClassic', layouts)
+
+        cases = searchBench.getCases(['tinyMaze', 'tinyCorners'])
+        self.assertIn(('tinyMaze', 'astar', 'manhattan'), cases)
+        self.assertIn(('tinyCorners', 'astar', 'cornerTour'), cases)
+        self.assertIn(('tinyCorners', 'bfs', None), cases)
+
+        self.assertRaises(ValueError, searchBench.getCases, ['mediumClassic'])
+        self.assertRaises(ValueError, searchBench.getCases, ['tinyMaze'], ['greedy'])
+
+    def test_limit(self):
+        result = searchBench.runCase('mediumSearch', 'bfs', None, maxExpansions = 100)
+        self.assertEqual(searchBench.STATUS_LIMIT, result['status'])
+        self.assertEqual(100, result['expanded'])
+        self.assertIsNone(result['cost'])
+
+        result = searchBench.runCase('bigSearch', 'astar', 'foodSpanningTree', maxTime = 0.01)
+        self.assertEqual(searchBench.STATUS_TIMEOUT, result['status'])
+        self.assertIsNone(result['cost'])
+
+    def test_baseline(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            baselinePath = os.path.join(tempDir, 'baseline.json')
+            args = ['-q', '--layouts', 'tinyMaze,tinySearch,tinyCorners',
+                    '--baseline', baselinePath]
+
+            self.assertEqual([], searchBench.main(args + ['--write-baseline']))
+            baseline = searchBench.loadBaseline(baselinePath)
+            self.assertEqual(27, baseline['tinySearch:astar:mazeFood']['cost'])
+            self.assertEqual(28, baseline['tinyCorners:astar:cornerTour']['cost'])
+
+            # Nothing changed (and the runs are too short to time reliably).
+            self.assertEqual([], searchBench.main(args + ['--min-time', '10']))
+
+        # Make the baseline look better than the search is.
+        entry = baseline['tinyMaze:bfs']
+        entry['expanded'] -= 1
+        entry['cost'] -= 1
+        baseline['tinyCorners:bfs']['status'] = searchBench.STATUS_LIMIT
+        baseline['tinySearch:ucs']['time'] = 0.0
+
+        results = searchBench.runBenchmark(searchBench.getCases(['tinyMaze', 'tinyCorners']))
+        regressions = searchBench.compareResults(results, baseline)
+        self.assertEqual(3, len(regressions))
+
+        regressions = searchBench.compareResults([{'key': 'tinySearch:ucs', 'status': 'found',
+                'expanded': 0, 'cost': 27, 'time': 1.0}], baseline)
+        self.assertEqual(1, len(regressions))
+
+        # Runs that did not finish can hit either limit first.
+        baseline['tinyMaze:dfs']['status'] = searchBench.STATUS_TIMEOUT
+        baseline['tinyMaze:ucs']['status'] = searchBench.STATUS_LIMIT
+        regressions = searchBench.compareResults([
+            {'key': 'tinyMaze:dfs', 'status': 'limit', 'expanded': 10, 'cost': None, 'time': 1.0},
+            {'key': 'tinyMaze:ucs', 'status': 'timeout', 'expanded': 5, 'cost': None, 'time': 1.0},
+        ], baseline)
+        self.assertEqual([], regressions)
+
+"""
+Test the move ordering benchmark.
+"""
+class OrderingBenchmarkTest(unittest.TestCase):
+    def test_orderings(self):
+        results = orderingBench.runBenchmark(['smallClassic'], depth = 3, numStates = 3)
+        self.assertEqual(len(orderingBench.ORDERINGS), len(results))
+
+        base = results[0]
+        self.assertEqual(orderingBench.BASE_ORDERING, base['ordering'])
+        self.assertEqual(1.0, base['nodeRatio'])
+
+        for result in results:
+            self.assertEqual(0, result['mismatches'])
+            self.assertGreater(result['nodes'], 0)
+
+        all = [result for result in results if (result['ordering'] == 'all')][0]
+        self.assertLess(all['nodes'], base['nodes'])
+
+        self.assertRaises(ValueError, orderingBench.runBenchmark, ['smallClassic'], ['random'])
@@ -1,8 +1,11 @@
+import os
+import tempfile
 import unittest
 
 from pacai.bin import capture
 from pacai.bin import gridworld
 from pacai.bin import pacman
+from pacai.core import replay
 
 """
 This is a test class to assess the executables of this project.
@@ -60,6 +63,47 @@ class BinTest(unittest.TestCase):
         # Run game of pacman with seed value entry.
         pacman.main(['-p', 'GreedyAgent', '--null-graphics', '--seed', '1234'])
 
+    def test_parallel_runs(self):
+        # Parallel games should not depend on the number of workers.
+        args = ['-p', 'GreedyAgent', '--null-graphics', '--seed', '1234', '-n', '3']
+
+        scores = []
+        for workers in ['1', '2', '3']:
+            games = pacman.main(args + ['--workers', workers])
+            self.assertEqual(3, len(games))
+
+            scores.append([game.state.getScore() for game in games])
+
+        self.assertEqual(scores[0], scores[1])
+        self.assertEqual(scores[0], scores[2])
+
+        # Replays record the seed of their own game.
+        replaySeeds = []
+        for workers in ['1', '2']:
+            replayPath = os.path.join(tempfile.mkdtemp(), 'pacman.replay')
+            pacman.main(args + ['--workers', workers, '--record', replayPath])
+
+            replaySeeds.append(replay.readReplay(replayPath).getMetadata()['seed'])
+
+        self.assertEqual(replaySeeds[0], replaySeeds[1])
+        self.assertNotEqual(1234, replaySeeds[0])
+
+        # Parallel games need the null view.
+        try:
+            pacman.main(['-p', 'GreedyAgent', '--text-graphics', '--workers', '2'])
+            self.fail("Test did not raise expected exception.")
+        except ValueError:
+            # Expected exception.
+            pass
+
+        args = ['--null-graphics', '--seed', '1234', '-n', '2']
+        games = capture.main(args + ['--workers', '2'])
+        otherGames = capture.main(args + ['--workers', '1'])
+
+        self.assertEqual(2, len(games))
+        self.assertEqual([game.state.getScore() for game in games],
+                [game.state.getScore() for game in otherGames])
+
     def test_capture_seeded_maze_generations(self):
         # Run game of capture with random generated map without seed value.
         capture.main(['--null-graphics', '--layout', 'RANDOM']) 
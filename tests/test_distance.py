@@ -0,0 +1,180 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pacai.core import distanceCalculator
+from pacai.core.actions import Actions
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+"""
+Test the maze distance tables.
+"""
+class DistanceTest(unittest.TestCase):
+    def setUp(self):
+        self._oldCacheDir = os.environ.get(distanceCalculator.CACHE_DIR_ENV)
+        self._cacheDir = tempfile.mkdtemp()
+        os.environ[distanceCalculator.CACHE_DIR_ENV] = self._cacheDir
+
+        distanceCalculator.distanceMap.clear()
+
+    def tearDown(self):
+        if (self._oldCacheDir is None):
+            del os.environ[distanceCalculator.CACHE_DIR_ENV]
+        else:
+            os.environ[distanceCalculator.CACHE_DIR_ENV] = self._oldCacheDir
+
+        shutil.rmtree(self._cacheDir)
+        distanceCalculator.distanceMap.clear()
+
+    def test_distances(self):
+        layout = getLayout('testCapture')
+        table = distanceCalculator.getDistanceTable(layout)
+
+        self.assertEqual(table.getNumCells(), len(layout.walls.asList(False)))
+
+        for pos1 in table.getCells():
+            for pos2 in table.getCells():
+                distance = table.getDistance(pos1, pos2)
+                self.assertEqual(distance, table.getDistance(pos2, pos1))
+
+                if (pos1 == pos2):
+                    self.assertEqual(0, distance)
+                else:
+                    self.assertTrue(distance >= abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1]))
+
+    def test_shared_and_cached(self):
+        layout = getLayout('mediumCapture')
+
+        table = distanceCalculator.getDistanceTable(layout)
+        self.assertIs(table, distanceCalculator.getDistanceTable(getLayout('mediumCapture')))
+        self.assertEqual(1, len(os.listdir(self._cacheDir)))
+
+        # Force a load from the disk cache.
+        distanceCalculator.distanceMap.clear()
+        cachedTable = distanceCalculator.getDistanceTable(layout)
+
+        self.assertIsNot(table, cachedTable)
+        self.assertEqual(list(table.getDistances()), list(cachedTable.getDistances()))
+
+    def test_truncated_cache(self):
+        layout = getLayout('testCapture')
+        table = distanceCalculator.getDistanceTable(layout)
+
+        # Cut the cache file short (like an interrupted write), even inside the header.
+        path = os.path.join(self._cacheDir, os.listdir(self._cacheDir)[0])
+        with open(path, 'wb') as file:
+            file.write(b'PACD1')
+
+        distanceCalculator.distanceMap.clear()
+        recomputedTable = distanceCalculator.getDistanceTable(layout)
+        self.assertEqual(list(table.getDistances()), list(recomputedTable.getDistances()))
+
+    def test_distancer(self):
+        layout = getLayout('testCapture')
+        distancer = distanceCalculator.Distancer(layout)
+        distancer.getMazeDistances()
+
+        self.assertEqual(0, distancer.getDistance((1, 1), (1, 1)))
+        self.assertEqual(0.5, distancer.getDistance((1, 1), (1.5, 1)))
+
+    def test_batch(self):
+        layout = getLayout('mediumCapture')
+        distancer = distanceCalculator.Distancer(layout)
+        distancer.getMazeDistances()
+
+        cells = layout.walls.asList(False)
+        source = cells[0]
+        targets = cells[::7]
+
+        expected = [distancer.getDistance(source, target) for target in targets]
+        self.assertEqual(expected, distancer.getDistancesFrom(source, targets))
+        self.assertEqual([expected[0]], distancer.getDistancesFrom(source, targets[0:1]))
+        self.assertEqual([], distancer.getDistancesFrom(source, []))
+
+        nearest = distancer.getNearest(source, targets[1:])
+        self.assertEqual(min(expected[1:]), nearest[1])
+        self.assertEqual(nearest[1], distancer.getDistance(source, nearest[0]))
+
+        matrix = distancer.getDistanceMatrix(targets[0:3], targets)
+        for (i, row) in enumerate(matrix):
+            self.assertEqual([distancer.getDistance(targets[i], target) for target in targets], row)
+
+        # Off-grid positions fall back to the pairwise lookup.
+        offGrid = (source[0] + 0.5, source[1])
+        expected = [distancer.getDistance(offGrid, target) for target in targets]
+        self.assertEqual(expected, distancer.getDistancesFrom(offGrid, targets))
+
+class JunctionGraphTest(unittest.TestCase):
+    def test_distances(self):
+        for layoutName in ['bigMaze', 'mediumClassic', 'tinySafeSearch', 'testCapture']:
+            layout = getLayout(layoutName)
+            graph = layout.getJunctionGraph()
+            table = distanceCalculator.DistanceTable(layout.walls)
+
+            for start in table.getCells()[::7]:
+                distances = graph.getDistancesFrom(start)
+
+                for (index, goal) in enumerate(table.getCells()):
+                    expected = table.getDistance(start, goal)
+                    if (expected == distanceCalculator.DEFAULT_DISTANCE):
+                        self.assertNotIn(goal, distances)
+                        self.assertIsNone(graph.findPath(start, goal))
+                        continue
+
+                    self.assertEqual(expected, distances[goal])
+
+                    if (index % 11 == 0):
+                        self._checkPath(layout, start, goal, expected,
+                                graph.findPath(start, goal))
+
+    def test_contraction(self):
+        layout = getLayout('bigMaze')
+        graph = layout.getJunctionGraph()
+
+        self.assertIs(graph, getLayout('bigMaze').getJunctionGraph())
+        self.assertLess(graph.getNumJunctions() * 3, len(layout.walls.asList(False)))
+
+        for junction in graph.getJunctions():
+            self.assertTrue(graph.isJunction(junction))
+            self.assertIsNone(graph.getCorridor(junction))
+
+            for (neighbor, length, actions) in graph.getNeighbors(junction):
+                self.assertEqual(length, len(actions))
+                self._checkPath(layout, junction, neighbor, length, actions)
+
+    def test_loop(self):
+        # A single loop has no intersections or dead ends.
+        layout = Layout([
+            '%%%%%',
+            '%...%',
+            '%.%.%',
+            '%...%',
+            '%%%%%',
+        ])
+        graph = layout.getJunctionGraph()
+
+        self.assertEqual(1, graph.getNumJunctions())
+        self.assertEqual(1, graph.getNumCorridors())
+
+        self.assertEqual(4, graph.getDistance((1, 1), (3, 3)))
+        self.assertEqual(2, graph.getDistance((1, 2), (2, 3)))
+        self._checkPath(layout, (2, 1), (1, 2), 2, graph.findPath((2, 1), (1, 2)))
+
+        # Walls are not part of the graph.
+        self.assertIsNone(graph.getDistance((1, 1), (2, 2)))
+
+    def _checkPath(self, layout, start, goal, length, actions):
+        self.assertEqual(length, len(actions))
+
+        position = start
+        for action in actions:
+            x, y = Actions.getSuccessor(position, action)
+            position = (int(x), int(y))
+            self.assertFalse(layout.walls[position[0]][position[1]])
+
+        self.assertEqual(goal, position)
+
+if __name__ == '__main__':
+    unittest.main()
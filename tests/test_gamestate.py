@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from pacai.bin.capture import CaptureGameState
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.layout import getLayout
+
+"""
+Test game state hashing and equality.
+"""
+class GameStateTest(unittest.TestCase):
+    def test_hash_eat_order(self):
+        layout = getLayout('tinySearch')
+        (x1, y1), (x2, y2) = layout.food.asList()[0:2]
+
+        state = PacmanGameState(layout)
+
+        state1 = state._initSuccessor()
+        state1.eatFood(x1, y1)
+        state1.eatFood(x2, y2)
+
+        state2 = state._initSuccessor()
+        state2.eatFood(x2, y2)
+        state2.eatFood(x1, y1)
+
+        self.assertTrue(state.hasFood(x1, y1))
+        self.assertEqual(state1, state2)
+        self.assertEqual(hash(state1), hash(state2))
+        self.assertNotEqual(hash(state), hash(state1))
+
+    def test_hash_agent_update(self):
+        state = PacmanGameState(getLayout('tinySearch'))
+        action = state.getLegalActions()[0]
+
+        successor1 = state.generateSuccessor(0, action)
+        successor2 = state.generateSuccessor(0, action)
+
+        self.assertEqual(successor1, successor2)
+        self.assertEqual(hash(successor1), hash(successor2))
+        self.assertNotEqual(hash(state), hash(successor1))
+
+    def test_apply_undo(self):
+        # Pacman eats food and dies.
+        self._checkApplyUndo(PacmanGameState(getLayout('smallClassic')), 200, 4)
+
+        # Pacman eats a capsule and scares the ghosts.
+        self._checkApplyUndo(PacmanGameState(getLayout('capsuleClassic')), 500, 9)
+
+        self._checkApplyUndo(CaptureGameState(getLayout('tinyCapture'), 1200), 1000, 0)
+
+    def test_apply_errors(self):
+        state = PacmanGameState(getLayout('tinySearch'))
+        snapshot = state.getSnapshot()
+
+        self.assertRaises(RuntimeError, state.undo)
+
+        # A bad move leaves the state as it was.
+        self.assertRaises(ValueError, state.apply, 1, 'North')
+        self.assertRaises(ValueError, state.apply, 0, 'Up')
+        self.assertEqual(snapshot, state.getSnapshot())
+        self.assertRaises(RuntimeError, state.undo)
+
+    def _checkApplyUndo(self, state, numMoves, seed):
+        # Random games played with apply() match ones played with generateSuccessor(),
+        # and undoing every move gets back to the start.
+        rng = random.Random(seed)
+
+        start = state.copy()
+        startHash = hash(state)
+        startSnapshot = state.getSnapshot()
+
+        successor = state
+        successors = []
+        for moveIndex in range(numMoves):
+            if (state.isOver()):
+                break
+
+            agentIndex = moveIndex % state.getNumAgents()
+            action = rng.choice(state.getLegalActions(agentIndex))
+
+            successor = successor.generateSuccessor(agentIndex, action)
+            successors.append((successor, successor.getSnapshot()))
+
+            state.apply(agentIndex, action)
+
+            self.assertEqual(successor, state)
+            self.assertEqual(hash(successor), hash(state))
+            self.assertEqual(successor.getSnapshot(), state.getSnapshot())
+
+        # Things were eaten along the way.
+        self.assertLess(state.getNumFood(), start.getNumFood())
+
+        while (len(successors) > 0):
+            successor, snapshot = successors.pop()
+
+            # States made along the way did not change.
+            self.assertEqual(snapshot, successor.getSnapshot())
+            self.assertEqual(successor, state)
+
+            state.undo()
+
+        self.assertEqual(start, state)
+        self.assertEqual(startHash, hash(state))
+        self.assertEqual(startSnapshot, state.getSnapshot())
+
+if __name__ == '__main__':
+    unittest.main()
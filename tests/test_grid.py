@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from pacai.core.grid import BitGrid
+from pacai.core.grid import Grid
+
+WIDTH = 7
+HEIGHT = 5
+
+"""
+Test that the bitboard grid behaves like the list-backed grid.
+"""
+class GridTest(unittest.TestCase):
+    def setUp(self):
+        rand = random.Random(4)
+
+        self.grid = Grid(WIDTH, HEIGHT)
+        self.bitGrid = BitGrid(WIDTH, HEIGHT)
+
+        for x in range(WIDTH):
+            for y in range(HEIGHT):
+                value = rand.random() < 0.5
+                self.grid[x][y] = value
+                self.bitGrid[x][y] = value
+
+    def test_access(self):
+        for x in range(WIDTH):
+            for y in range(HEIGHT):
+                self.assertIs(self.grid[x][y], self.bitGrid[x][y])
+
+        self.assertEqual(self.grid.asList(), self.bitGrid.asList())
+        self.assertEqual(self.grid.asList(False), self.bitGrid.asList(False))
+        self.assertEqual(self.grid.count(), self.bitGrid.count())
+        self.assertEqual(self.grid.count(False), self.bitGrid.count(False))
+        self.assertEqual(str(self.grid), str(self.bitGrid))
+
+    def test_copy(self):
+        bitGridCopy = self.bitGrid.copy()
+        self.assertEqual(self.bitGrid, bitGridCopy)
+        self.assertEqual(hash(self.bitGrid), hash(bitGridCopy))
+
+        x, y = self.bitGrid.asList()[0]
+        bitGridCopy[x][y] = False
+
+        self.assertTrue(self.bitGrid[x][y])
+        self.assertNotEqual(self.bitGrid, bitGridCopy)
+        self.assertEqual(self.bitGrid.count() - 1, bitGridCopy.count())
+
+    def test_mixed_equality(self):
+        self.assertEqual(self.grid, self.bitGrid)
+        self.assertEqual(self.bitGrid, self.grid)
+        self.assertEqual(hash(self.grid), hash(self.bitGrid))
+        self.assertEqual(self.grid, BitGrid.fromGrid(self.grid))
+
+    def test_bounds(self):
+        with self.assertRaises(IndexError):
+            self.bitGrid[WIDTH]
+
+        with self.assertRaises(IndexError):
+            self.bitGrid[0][HEIGHT]
+
+        self.assertIs(self.grid[-1][-1], self.bitGrid[-1][-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import random
+import unittest
+
+from pacai.agents.search.ordering import MoveOrdering
+from pacai.bin import pacman
+from pacai.core.directions import Directions
+from pacai.core.layout import getLayout
+from pacai.student import multiagents
+
+"""
+Test the adversarial searchers.
+"""
+class MultiAgentSearchTest(unittest.TestCase):
+    def test_transposition_table(self):
+        states = _getStates('mediumClassic', 4)
+
+        for agentClass in [multiagents.MinimaxAgent, multiagents.AlphaBetaAgent,
+                multiagents.ExpectimaxAgent]:
+            plainAgent = agentClass(0, depth = 3, tableSize = 0)
+            self.assertIsNone(plainAgent.getTranspositionTable())
+
+            agent = agentClass(0, depth = 3)
+            for state in states:
+                self.assertEqual(plainAgent.getAction(state), agent.getAction(state))
+
+            self.assertGreater(agent.getTranspositionTable().getStats()['hits'], 0)
+
+    def test_alpha_beta(self):
+        # Alpha-beta finds the same moves as minimax.
+        minimaxAgent = multiagents.MinimaxAgent(0, depth = 3, tableSize = 0)
+        alphaBetaAgent = multiagents.AlphaBetaAgent(0, depth = 3, tableSize = 0)
+
+        for state in _getStates('smallClassic', 6):
+            self.assertEqual(minimaxAgent.getAction(state), alphaBetaAgent.getAction(state))
+
+    def test_iterative_deepening(self):
+        states = _getStates('smallClassic', 3)
+
+        # With all the time it needs, an iterative search finds the same moves as a fixed one.
+        for agentClass in [multiagents.MinimaxAgent, multiagents.AlphaBetaAgent,
+                multiagents.ExpectimaxAgent]:
+            fixedAgent = agentClass(0, depth = 3, tableSize = 0)
+            agent = agentClass(0, moveTime = 1000, maxDepth = 3)
+
+            for state in states:
+                self.assertEqual(fixedAgent.getAction(state), agent.getAction(state))
+                self.assertEqual(3, agent.getCompletedDepth())
+                self.assertEqual(2, agent.getTreeDepth())
+
+    def test_iterative_deepening_timeout(self):
+        # The first iteration always finishes, even without time for it.
+        agent = multiagents.AlphaBetaAgent(0, moveTime = 0.000001)
+        state = _getStates('mediumClassic', 1)[0]
+
+        self.assertIn(agent.getAction(state), state.getLegalActions(0))
+        self.assertEqual(1, agent.getCompletedDepth())
+
+        with self.assertRaises(ValueError):
+            multiagents.AlphaBetaAgent(0, moveTime = 1, timeFraction = 0)
+
+    def test_move_ordering(self):
+        state = _getStates('mediumClassic', 1)[0]
+        actions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+
+        ordering = MoveOrdering(killerMoves = 1)
+        self.assertEqual(actions, ordering.order(state, 0, 1, actions))
+
+        # History scores order the rest.
+        ordering.recordCutoff(state, 0, 3, Directions.WEST, 1)
+        ordering.recordCutoff(state, 0, 3, Directions.EAST, 2)
+        self.assertEqual([Directions.EAST, Directions.WEST, Directions.NORTH, Directions.SOUTH],
+                ordering.order(state, 0, 1, actions))
+
+        # The first action, then the killer for the ply.
+        self.assertEqual([Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.NORTH],
+                ordering.order(state, 0, 3, actions, first = Directions.SOUTH))
+
+        # Scores replace the history.
+        scores = {Directions.NORTH: 1, Directions.SOUTH: 3, Directions.EAST: 0, Directions.WEST: 2}
+        self.assertEqual([Directions.EAST, Directions.SOUTH, Directions.WEST, Directions.NORTH],
+                ordering.order(state, 0, 3, actions, scores = scores))
+
+        # Killers are per search, history is kept (but halved).
+        ordering.newSearch()
+        self.assertEqual([Directions.EAST, Directions.NORTH, Directions.SOUTH, Directions.WEST],
+                ordering.order(state, 0, 3, actions))
+
+    def test_move_ordering_nodes(self):
+        states = _getStates('smallClassic', 4)
+
+        plainAgent = multiagents.AlphaBetaAgent(0, depth = 4, tableSize = 0, killerMoves = 0,
+                history = 0)
+        agent = multiagents.AlphaBetaAgent(0, depth = 4, tableSize = 0, evalOrdering = 2)
+
+        for state in states:
+            self.assertEqual(plainAgent.getAction(state), agent.getAction(state))
+
+        self.assertLess(agent.getNodeCount(), plainAgent.getNodeCount())
+
+    def test_parallel_root(self):
+        # Splitting the root across workers finds the same moves as a serial search.
+        states = _getStates('mediumClassic', 4)
+
+        for agentClass in [multiagents.MinimaxAgent, multiagents.AlphaBetaAgent,
+                multiagents.ExpectimaxAgent]:
+            serialAgent = agentClass(0, depth = 3)
+            agent = agentClass(0, depth = 3, workers = 2)
+
+            try:
+                for state in states:
+                    self.assertEqual(serialAgent.getAction(state), agent.getAction(state))
+
+                self.assertGreater(agent.getNodeCount(), 0)
+            finally:
+                agent.final(states[-1])
+
+    def test_parallel_games(self):
+        # Agents in parallel games (run in daemonic pool workers through
+        # `pacai.core.parallel.runGames`) cannot start workers, and search serially instead.
+        games = pacman.main(['-p', 'AlphaBetaAgent', '--agent-args', 'depth=2,workers=2',
+                '--null-graphics', '-l', 'smallClassic', '-n', '2', '--workers', '2',
+                '--seed', '4'])
+
+        self.assertEqual(2, len(games))
+        for game in games:
+            self.assertFalse(game.agentCrashed)
+            self.assertTrue(game.state.isOver())
+
+def _getStates(layoutName, numStates, seed = 4):
+    """
+    Get states from a game where everyone moves at random.
+    """
+
+    rng = random.Random(seed)
+    state = pacman.PacmanGameState(getLayout(layoutName))
+
+    states = []
+    while (len(states) < numStates and not state.isOver()):
+        states.append(state)
+
+        for agentIndex in range(state.getNumAgents()):
+            if (state.isOver()):
+                break
+
+            state = state.generateSuccessor(agentIndex,
+                    rng.choice(state.getLegalActions(agentIndex)))
+
+    return states
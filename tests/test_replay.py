@@ -4,9 +4,12 @@ import unittest
 
 from pacai.bin import capture
 from pacai.bin import pacman
+from pacai.core import replay
+from pacai.core.directions import Directions
 
 PACMAN_FILENAME = 'pacai_unittest_pacman.replay'
 CAPTURE_FILENAME = 'pacai_unittest_capture.replay'
+FORMAT_FILENAME = 'pacai_unittest_format.replay'
 
 """
 Test saving and playing replays.
@@ -35,5 +38,114 @@ class ReplayTest(unittest.TestCase):
 
         os.remove(replayPath)
 
+    def test_format(self):
+        replayPath = os.path.join(tempfile.gettempdir(), FORMAT_FILENAME)
+
+        actions = [(index % 4, direction)
+                for (index, direction) in enumerate(replay.ACTIONS * 10)]
+        metadata = {'layout': '%%%\n%.%\n%%%', 'seed': 7, 'numAgents': 4}
+
+        with replay.ReplayWriter(replayPath, metadata) as writer:
+            for (agentIndex, action) in actions:
+                writer.writeAction(agentIndex, action)
+
+        recorded = replay.readReplay(replayPath)
+        os.remove(replayPath)
+
+        # One byte per action.
+        self.assertEqual(actions, recorded.getActions())
+        self.assertEqual(7, recorded.getMetadata()['seed'])
+        self.assertEqual(['%%%', '%.%', '%%%'], recorded.getLayoutText())
+
+        self.assertRaises(ValueError, replay.encodeAction, 0, 'Sideways')
+        self.assertRaises(ValueError, replay.encodeAction, replay.MAX_AGENTS, Directions.STOP)
+
+    def test_checkpoints(self):
+        replayPath = os.path.join(tempfile.gettempdir(), CAPTURE_FILENAME)
+
+        capture.main(['--null-graphics', '--seed', '1', '--max-moves', '300',
+                '--record', replayPath])
+
+        recorded = replay.readReplay(replayPath)
+        os.remove(replayPath)
+
+        metadata = recorded.getMetadata()
+        checkpoints = recorded.getCheckpoints()
+
+        # Periodic checkpoints plus one at the end.
+        self.assertEqual(300 // metadata['checkpointInterval'] + 1, len(checkpoints))
+        self.assertIsNone(recorded.getCheckpoint(metadata['checkpointInterval'] - 1))
+
+        layout = capture.Layout(recorded.getLayoutText())
+        state = capture.CaptureGameState(layout, metadata['length'])
+
+        for (move, snapshot) in checkpoints:
+            expected = state
+            for action in recorded.getActions()[:move]:
+                expected = expected.generateSuccessor(*action)
+
+            restored = capture.CaptureGameState(layout, metadata['length'])
+            restored.restoreSnapshot(snapshot)
+
+            self.assertEqual(expected.getScore(), restored.getScore())
+            self.assertEqual(expected.getTimeleft(), restored.getTimeleft())
+            self.assertEqual(expected.getRedFood(), restored.getRedFood())
+            self.assertEqual(expected.getAgentStates(), restored.getAgentStates())
+            self.assertEqual(hash(expected.getFood()), hash(restored.getFood()))
+
+    def test_seek(self):
+        replayPath = os.path.join(tempfile.gettempdir(), CAPTURE_FILENAME)
+
+        capture.main(['--null-graphics', '--seed', '2', '--max-moves', '400',
+                '--record', replayPath])
+
+        # Play the end of the game backwards, only showing some of the frames.
+        capture.main(['--null-graphics', '--replay', replayPath,
+                '--replay-start', '390', '--replay-end', '100', '--replay-step', '-7'])
+
+        recorded = replay.readReplay(replayPath)
+        os.remove(replayPath)
+
+        metadata = recorded.getMetadata()
+        layout = capture.Layout(recorded.getLayoutText())
+        agents = [None] * metadata['numAgents']
+
+        game = capture.CaptureRules().newGame(layout, agents, None, metadata['length'], False)
+        player = replay.ReplayPlayer(recorded, game, snapshotInterval = 10)
+
+        # Every state from simulating the whole game in order.
+        expected = [game.state]
+        for action in recorded.getActions():
+            expected.append(expected[-1].generateSuccessor(*action))
+
+        for move in [0, 250, 17, 399, 398, 3, 120, 121, 119, 400]:
+            state = player.seek(move)
+
+            self.assertEqual(move, player.getMove())
+            self.assertEqual(expected[move].getAgentStates(), state.getAgentStates())
+            self.assertEqual(expected[move].getFood(), state.getFood())
+            self.assertEqual(expected[move].getScore(), state.getScore())
+
+        state = player.step(-5)
+        self.assertEqual(395, player.getMove())
+        self.assertEqual(expected[395].getAgentStates(), state.getAgentStates())
+
+        frames = [move for (move, state) in player.getFrames(10, 40, 15)]
+        self.assertEqual([10, 25, 40], frames)
+
+        frames = [move for (move, state) in player.getFrames(10, 0, -4)]
+        self.assertEqual([10, 6, 2, 0], frames)
+
+        self.assertRaises(ValueError, list, player.getFrames(step = 0))
+
+    def test_not_a_replay(self):
+        replayPath = os.path.join(tempfile.gettempdir(), FORMAT_FILENAME)
+
+        with open(replayPath, 'wb') as file:
+            file.write(b'\x80\x04not a replay at all')
+
+        self.assertRaises(ValueError, replay.readReplay, replayPath)
+        os.remove(replayPath)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,478 @@
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import unittest
+
+from pacai.agents.search.base import SearchAgent
+from pacai.bin import pacman
+from pacai.core.layout import getLayout
+from pacai.core.search import bounded
+from pacai.core.search import distributed
+from pacai.core.search import graph
+from pacai.core.search import gridSearch
+from pacai.core.search import heuristic
+from pacai.core.search.food import CompactFoodSearchProblem
+from pacai.core.search.food import FoodSearchProblem
+from pacai.core.search.food import adaptFoodHeuristic
+from pacai.core.search import problem as searchProblem
+from pacai.core.search.position import PositionSearchProblem
+from pacai.student.searchAgents import CornersProblem
+from pacai.util.lruCache import LRUCache
+
+"""
+Test the reference graph searches.
+"""
+class GraphSearchTest(unittest.TestCase):
+    def test_big_maze(self):
+        state = pacman.PacmanGameState(getLayout('bigMaze'))
+
+        searches = [graph.bfs, graph.ucs, graph.astar]
+        searches += [lambda problem, policy = policy: graph.astar(problem,
+                heuristic = heuristic.manhattan, tieBreaking = policy)
+                for policy in graph.TIE_BREAKING_POLICIES]
+
+        for search in searches:
+            problem = PositionSearchProblem(state)
+            self.assertEqual(210, problem.actionsCost(search(problem)))
+
+        # DFS is not optimal, but still needs to get there.
+        problem = PositionSearchProblem(state)
+        self.assertLess(problem.actionsCost(graph.dfs(problem)), 999999)
+
+    def test_food_search(self):
+        state = pacman.PacmanGameState(getLayout('tinySearch'))
+
+        for search in [graph.bfs, graph.ucs, graph.astar]:
+            problem = FoodSearchProblem(state)
+            self.assertEqual(27, problem.actionsCost(search(problem)))
+
+    def test_no_path(self):
+        state = pacman.PacmanGameState(getLayout('tinyMaze'))
+
+        for search in [graph.bfs, graph.dfs, graph.ucs, graph.astar]:
+            # The goal is inside a wall.
+            problem = PositionSearchProblem(state, goal = (0, 0))
+            self.assertIsNone(search(problem))
+
+        problem = PositionSearchProblem(state)
+        self.assertRaises(ValueError, graph.ucs, problem, tieBreaking = 'random')
+
+    def test_expansion_limit(self):
+        state = pacman.PacmanGameState(getLayout('bigMaze'))
+
+        problem = PositionSearchProblem(state)
+        self.assertRaises(graph.ExpansionLimitReached, graph.astar, problem, maxExpansions = 10)
+        self.assertEqual(10, problem.getStats().expanded)
+
+        problem = PositionSearchProblem(state)
+        actions = graph.astar(problem, heuristic = heuristic.manhattan, maxExpansions = 100000)
+        self.assertEqual(210, problem.actionsCost(actions))
+
+class GridSearchTest(unittest.TestCase):
+    def test_optimal(self):
+        random.seed(14)
+        searches = [gridSearch.bibfs, gridSearch.biastar, gridSearch.jps, gridSearch.junction]
+
+        for layoutName in ['bigMaze', 'contoursMaze', 'mediumClassic', 'openMaze', 'openSearch']:
+            state = pacman.PacmanGameState(getLayout(layoutName))
+            cells = state.getWalls().asList(False)
+
+            for i in range(20):
+                start, goal = random.choice(cells), random.choice(cells)
+                expected = PositionSearchProblem(state, start = start, goal = goal)
+                expected = expected.actionsCost(graph.bfs(expected))
+
+                for search in searches:
+                    problem = PositionSearchProblem(state, start = start, goal = goal)
+                    self.assertEqual(expected, problem.actionsCost(search(problem)))
+
+    def test_fewer_expansions(self):
+        state = pacman.PacmanGameState(getLayout('openMaze'))
+
+        problem = PositionSearchProblem(state)
+        graph.astar(problem, heuristic = heuristic.manhattan)
+        expanded = problem.getExpandedCount()
+
+        problem = PositionSearchProblem(state)
+        self.assertEqual(54, problem.actionsCost(gridSearch.jps(problem)))
+        self.assertLess(problem.getExpandedCount() * 10, expanded)
+
+        # Mazes are mostly corridors.
+        state = pacman.PacmanGameState(getLayout('mediumMaze'))
+
+        problem = PositionSearchProblem(state)
+        graph.astar(problem, heuristic = heuristic.manhattan)
+        expanded = problem.getExpandedCount()
+
+        problem = PositionSearchProblem(state)
+        self.assertEqual(68, problem.actionsCost(gridSearch.junction(problem)))
+        self.assertLess(problem.getExpandedCount() * 10, expanded)
+
+    def test_costs(self):
+        state = pacman.PacmanGameState(getLayout('mediumDottedMaze'))
+        costFn = lambda position: 2 ** position[0]
+
+        problem = PositionSearchProblem(state, costFn)
+        expected = problem.actionsCost(graph.ucs(problem))
+
+        problem = PositionSearchProblem(state, costFn)
+        self.assertEqual(expected, problem.actionsCost(gridSearch.biastar(problem,
+                heuristic = heuristic.null)))
+
+        self.assertRaises(ValueError, gridSearch.jps, PositionSearchProblem(state, costFn))
+        self.assertRaises(ValueError, gridSearch.junction, PositionSearchProblem(state, costFn))
+
+    def test_no_path(self):
+        state = pacman.PacmanGameState(getLayout('tinySafeSearch'))
+
+        for search in [gridSearch.bibfs, gridSearch.biastar, gridSearch.jps, gridSearch.junction]:
+            # The goal is walled off from pacman.
+            problem = PositionSearchProblem(state, start = (3, 3), goal = (3, 5))
+            self.assertIsNone(search(problem))
+
+            problem = PositionSearchProblem(state, goal = (0, 0))
+            self.assertIsNone(search(problem))
+
+class BoundedSearchTest(unittest.TestCase):
+    def test_ida_star(self):
+        for (layoutName, cost) in [('tinySearch', 27), ('trickySearch', 60)]:
+            state = pacman.PacmanGameState(getLayout(layoutName))
+            problem = FoodSearchProblem(state)
+
+            stats = {}
+            actions = bounded.idastar(problem, heuristic = heuristic.mazeFood, stats = stats)
+
+            self.assertEqual(cost, problem.actionsCost(actions))
+            self.assertEqual(problem.getExpandedCount(), stats['expanded'])
+            self.assertGreater(stats['iterations'], 1)
+
+            # Only the current path is kept.
+            self.assertLess(stats['peakNodes'], cost * 4)
+
+    def test_sma_star(self):
+        state = pacman.PacmanGameState(getLayout('trickySearch'))
+
+        for budget in [10000, 300, 100]:
+            problem = FoodSearchProblem(state)
+
+            stats = {}
+            actions = bounded.smastar(problem, heuristic = heuristic.mazeFood,
+                    nodeBudget = budget, stats = stats)
+
+            self.assertEqual(60, problem.actionsCost(actions))
+            self.assertEqual(problem.getExpandedCount(), stats['expanded'])
+            self.assertLessEqual(stats['peakNodes'], budget)
+
+        self.assertGreater(stats['forgotten'], 0)
+
+        problem = PositionSearchProblem(pacman.PacmanGameState(getLayout('mediumMaze')))
+        actions = bounded.smastar(problem, heuristic = heuristic.manhattan, nodeBudget = 100)
+        self.assertEqual(68, problem.actionsCost(actions))
+
+    def test_no_fit(self):
+        state = pacman.PacmanGameState(getLayout('tinyMaze'))
+
+        # The only path is longer than the budget.
+        problem = PositionSearchProblem(state)
+        self.assertIsNone(bounded.smastar(problem, heuristic = heuristic.manhattan,
+                nodeBudget = 6))
+
+        problem = PositionSearchProblem(state, goal = (0, 0))
+        self.assertIsNone(bounded.idastar(problem))
+        self.assertIsNone(bounded.smastar(problem))
+
+        self.assertRaises(ValueError, bounded.smastar, problem, nodeBudget = 1)
+
+class DistributedSearchTest(unittest.TestCase):
+    def test_parallel(self):
+        state = pacman.PacmanGameState(getLayout('trickySearch'))
+
+        for numWorkers in [2, 3]:
+            problem = CompactFoodSearchProblem(state)
+            actions = distributed.hdastar(problem, heuristic = heuristic.mazeFood,
+                    numWorkers = numWorkers, serialExpansions = 0)
+
+            self.assertEqual(60, problem.actionsCost(actions))
+            self.assertGreater(problem.getExpandedCount(), 0)
+
+        state = pacman.PacmanGameState(getLayout('bigMaze'))
+        problem = PositionSearchProblem(state)
+        actions = distributed.hdastar(problem, heuristic = heuristic.manhattan,
+                numWorkers = 2, serialExpansions = 0)
+        self.assertEqual(210, problem.actionsCost(actions))
+
+        problem = PositionSearchProblem(state, goal = (0, 0))
+        self.assertIsNone(distributed.hdastar(problem, numWorkers = 2, serialExpansions = 0))
+
+    def test_serial_fallback(self):
+        state = pacman.PacmanGameState(getLayout('tinySearch'))
+
+        problem = FoodSearchProblem(state)
+        graph.astar(problem, heuristic = heuristic.mazeFood)
+        expanded = problem.getExpandedCount()
+
+        # Small enough to be solved before going parallel.
+        problem = FoodSearchProblem(state)
+        actions = distributed.hdastar(problem, heuristic = heuristic.mazeFood, numWorkers = 4)
+        self.assertEqual(27, problem.actionsCost(actions))
+        self.assertEqual(expanded, problem.getExpandedCount())
+
+        problem = FoodSearchProblem(state)
+        actions = distributed.hdastar(problem, heuristic = heuristic.mazeFood, numWorkers = 1)
+        self.assertEqual(27, problem.actionsCost(actions))
+
+    def test_daemonic_worker(self):
+        # Daemonic processes (like parallel game workers) cannot start workers of their own,
+        # so the search is serial there.
+        context = multiprocessing.get_context('fork')
+        with context.Pool(1) as pool:
+            cost = pool.apply(_distributedSearchCost, ('trickySearch',))
+
+        self.assertEqual(60, cost)
+
+class TraceLevelTest(unittest.TestCase):
+    def test_levels(self):
+        state = pacman.PacmanGameState(getLayout('mediumMaze'))
+
+        results = {}
+        for level in searchProblem.TRACE_LEVELS:
+            problem = PositionSearchProblem(state)
+            problem.setTraceLevel(level)
+            self.assertEqual(level, problem.getTraceLevel())
+
+            actions = graph.bfs(problem)
+            results[level] = (problem.getExpandedCount(), len(problem.getVisitHistory()))
+
+            # Tracing never changes the search.
+            self.assertEqual(68, problem.actionsCost(actions))
+
+        expanded, visited = results[searchProblem.TRACE_FULL]
+        self.assertGreater(visited, 0)
+
+        self.assertEqual((expanded, 0), results[searchProblem.TRACE_COUNTERS])
+        self.assertEqual((0, 0), results[searchProblem.TRACE_OFF])
+
+    def test_compact_food_levels(self):
+        state = pacman.PacmanGameState(getLayout('tinySearch'))
+
+        results = {}
+        for level in searchProblem.TRACE_LEVELS:
+            problem = CompactFoodSearchProblem(state)
+            problem.setTraceLevel(level)
+
+            actions = graph.aStarSearch(problem)
+            results[level] = problem.getExpandedCount()
+
+            self.assertEqual(27, problem.actionsCost(actions))
+            self.assertGreater(problem.getStats().expanded, 0)
+
+        self.assertGreater(results[searchProblem.TRACE_FULL], 0)
+        self.assertEqual(results[searchProblem.TRACE_FULL], results[searchProblem.TRACE_COUNTERS])
+        self.assertEqual(0, results[searchProblem.TRACE_OFF])
+
+    def test_bounded_stats(self):
+        # What a search returns does not depend on the trace level.
+        state = pacman.PacmanGameState(getLayout('mediumMaze'))
+
+        for search in [bounded.idastar, bounded.smastar]:
+            results = []
+            for level in [searchProblem.TRACE_FULL, searchProblem.TRACE_OFF]:
+                problem = PositionSearchProblem(state)
+                problem.setTraceLevel(level)
+
+                stats = {}
+                search(problem, heuristic = heuristic.manhattan, stats = stats)
+
+                self.assertEqual(problem.getStats().expanded, stats['expanded'])
+                results.append(stats)
+
+            self.assertGreater(results[0]['expanded'], 0)
+            self.assertEqual(results[0], results[1])
+
+    def test_unknown_level(self):
+        problem = PositionSearchProblem(pacman.PacmanGameState(getLayout('tinyMaze')))
+        self.assertRaises(ValueError, problem.setTraceLevel, 'verbose')
+
+    def test_null_graphics(self):
+        args = pacman.readCommand(['--null-graphics', '--pacman', 'SearchAgent'])
+        self.assertEqual(searchProblem.TRACE_COUNTERS, args['pacman'].traceLevel)
+
+        args = pacman.readCommand(['--null-graphics', '--pacman', 'SearchAgent',
+                '--agent-args', 'traceLevel=off'])
+        self.assertEqual(searchProblem.TRACE_OFF, args['pacman'].traceLevel)
+
+        # Other views (and null views saving a gif) can show the visited locations.
+        args = pacman.readCommand(['--text-graphics', '--pacman', 'SearchAgent'])
+        self.assertEqual(searchProblem.TRACE_FULL, args['pacman'].traceLevel)
+
+        args = pacman.readCommand(['--null-graphics', '--pacman', 'SearchAgent',
+                '--gif', 'search.gif'])
+        self.assertEqual(searchProblem.TRACE_FULL, args['pacman'].traceLevel)
+
+        # Other agents do not get a trace level.
+        args = pacman.readCommand(['--null-graphics', '--pacman', 'GreedyAgent'])
+        self.assertFalse(hasattr(args['pacman'], 'traceLevel'))
+
+class SearchStatsTest(unittest.TestCase):
+    def test_core_searches(self):
+        state = pacman.PacmanGameState(getLayout('mediumMaze'))
+
+        searches = [graph.bfs, graph.dfs, graph.ucs, graph.astar, gridSearch.bibfs,
+                gridSearch.biastar, gridSearch.jps, gridSearch.junction, bounded.smastar]
+
+        for search in searches:
+            problem = PositionSearchProblem(state)
+            search(problem)
+
+            stats = problem.getStats()
+            self.assertEqual(problem.getExpandedCount(), stats.expanded)
+            self.assertGreaterEqual(stats.generated, stats.expanded)
+            self.assertGreater(stats.wallTime, 0.0)
+            self.assertGreater(stats.getNodesPerSecond(), 0.0)
+
+            if (search is not gridSearch.junction):
+                self.assertGreater(stats.duplicates, 0)
+                self.assertGreater(stats.peakFrontier, 0)
+
+    def test_heuristic(self):
+        state = pacman.PacmanGameState(getLayout('mediumMaze'))
+        calls = []
+
+        def countingHeuristic(position, problem):
+            calls.append(position)
+            return heuristic.manhattan(position, problem)
+
+        # Passed by position and by keyword.
+        searches = [
+            lambda problem: graph.astar(problem, countingHeuristic),
+            lambda problem: graph.astar(problem, heuristic = countingHeuristic),
+        ]
+
+        for search in searches:
+            calls.clear()
+            problem = PositionSearchProblem(state)
+            search(problem)
+
+            stats = problem.getStats()
+            self.assertEqual(len(calls), stats.heuristicCalls)
+            self.assertGreater(stats.heuristicTime, 0.0)
+            self.assertLessEqual(stats.heuristicTime, stats.wallTime)
+
+        calls.clear()
+
+        # Searches that call other searches only count (and time) everything once.
+        problem = PositionSearchProblem(state)
+        distributed.hdastar(problem, heuristic = countingHeuristic, numWorkers = 1)
+        self.assertEqual(len(calls), problem.getStats().heuristicCalls)
+
+    def test_json_sink(self):
+        state = pacman.PacmanGameState(getLayout('tinyMaze'))
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'stats.jsonl')
+            agent = SearchAgent(0, fn = 'pacai.core.search.graph.astar',
+                    heuristic = 'pacai.core.search.heuristic.manhattan', statsPath = path)
+
+            agent.registerInitialState(state)
+            agent.registerInitialState(state)
+
+            with open(path, 'r') as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual(2, len(records))
+        self.assertEqual('pacai.core.search.graph.astar', records[0]['function'])
+        self.assertEqual(8, records[0]['cost'])
+        self.assertGreater(records[0]['heuristicCalls'], 0)
+
+class CompactFoodSearchTest(unittest.TestCase):
+    def test_same_search(self):
+        state = pacman.PacmanGameState(getLayout('trickySearch'))
+
+        problem = FoodSearchProblem(state)
+        compactProblem = CompactFoodSearchProblem(state)
+
+        actions = graph.ucs(problem)
+        compactActions = graph.ucs(compactProblem)
+
+        self.assertEqual(problem.actionsCost(actions), compactProblem.actionsCost(compactActions))
+        self.assertEqual(problem.getExpandedCount(), compactProblem.getExpandedCount())
+
+    def test_conversion(self):
+        state = pacman.PacmanGameState(getLayout('tinySearch'))
+        problem = CompactFoodSearchProblem(state)
+
+        start = problem.startingState()
+        self.assertEqual(FoodSearchProblem(state).startingState(), problem.toFoodState(start))
+        self.assertEqual(start, problem.fromFoodState(problem.toFoodState(start)))
+
+        for (successor, action, cost) in problem.successorStates(start):
+            position, food = problem.toFoodState(successor)
+            self.assertEqual(problem.getPosition(successor), position)
+            self.assertEqual(sorted(food.asList()), sorted(problem.getFoodPositions(successor[1])))
+
+        # Heuristics written for the regular states still work.
+        numFood = adaptFoodHeuristic(heuristic.numFood)
+        self.assertEqual(state.getNumFood(), numFood(start, problem))
+
+        actions = graph.astar(problem, heuristic = numFood)
+        self.assertEqual(27, problem.actionsCost(actions))
+
+class MazeHeuristicTest(unittest.TestCase):
+    def test_food_heuristics(self):
+        state = pacman.PacmanGameState(getLayout('trickySearch'))
+
+        problem = FoodSearchProblem(state)
+        graph.ucs(problem)
+        ucsExpanded = problem.getExpandedCount()
+
+        for foodHeuristic in [heuristic.farthestFood, heuristic.foodSpanningTree,
+                heuristic.mazeFood]:
+            for problemClass in [FoodSearchProblem, CompactFoodSearchProblem]:
+                problem = problemClass(state)
+                actions = graph.astar(problem, heuristic = foodHeuristic)
+
+                self.assertEqual(60, problem.actionsCost(actions))
+                self.assertLess(problem.getExpandedCount(), ucsExpanded)
+
+        # The regular and compact states give the same estimates.
+        problem = FoodSearchProblem(state)
+        compactProblem = CompactFoodSearchProblem(state)
+        start = compactProblem.startingState()
+
+        for (successor, action, cost) in compactProblem.successorStates(start):
+            self.assertEqual(heuristic.mazeFood(compactProblem.toFoodState(successor), problem),
+                    heuristic.mazeFood(successor, compactProblem))
+
+    def test_cache_bounded(self):
+        state = pacman.PacmanGameState(getLayout('trickySearch'))
+        problem = CompactFoodSearchProblem(state)
+
+        cache = LRUCache(50)
+        problem.heuristicInfo[heuristic.CACHE_KEY] = cache
+
+        actions = graph.astar(problem, heuristic = heuristic.mazeFood)
+        self.assertEqual(60, problem.actionsCost(actions))
+        self.assertEqual(50, len(cache))
+
+    def test_corner_tour(self):
+        # With nothing else to do, the best tour of the corners is the whole answer.
+        for (layoutName, cost) in [('tinyCorners', 28), ('mediumCorners', 106)]:
+            state = pacman.PacmanGameState(getLayout(layoutName))
+            problem = CornersProblem(state)
+
+            start = (problem.startingPosition, [False] * 4)
+            self.assertEqual(cost, heuristic.cornerTour(start, problem))
+
+            self.assertEqual(0, heuristic.cornerTour((problem.corners[0], [True] * 4), problem))
+
+def _distributedSearchCost(layoutName):
+    problem = CompactFoodSearchProblem(pacman.PacmanGameState(getLayout(layoutName)))
+    actions = distributed.hdastar(problem, heuristic = heuristic.mazeFood, numWorkers = 2,
+            serialExpansions = 0)
+
+    return problem.actionsCost(actions)
+
+if __name__ == '__main__':
+    unittest.main()
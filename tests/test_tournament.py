@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+from pacai.bin import tournament
+
+TEAMS = ['pacai.core.baselineTeam', 'pacai.agents.capture.dummy']
+
+"""
+Test running and resuming tournaments.
+"""
+class TournamentTest(unittest.TestCase):
+    def test_round_robin(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            resultsPath = os.path.join(tempDir, 'results.jsonl')
+            args = TEAMS + ['-q', '--seed', '4', '--layouts', 'defaultCapture,RANDOM7',
+                    '--max-moves', '200', '--workers', '2', '--results', resultsPath]
+
+            standings = tournament.main(args)
+            results = tournament.loadResults(resultsPath)
+
+            # Two layouts, each team plays each color.
+            self.assertEqual(4, len(results))
+            self.assertEqual(set(TEAMS), {row['team'] for row in standings})
+            self.assertEqual(8, sum([row['played'] for row in standings]))
+
+            # Every game was played out (no crashes or forfeits), and not every game was a tie.
+            for result in results:
+                self.assertIsNone(result['error'])
+
+            self.assertTrue(any([result['score'] != 0 for result in results]))
+
+            # Running again should not play any more games.
+            self.assertEqual(standings, tournament.main(args))
+            self.assertEqual(4, len(tournament.loadResults(resultsPath)))
+
+    def test_swiss_pairing(self):
+        teams = ['a', 'b', 'c', 'd', 'e']
+        results = [
+            {'round': 0, 'red': 'a', 'blue': 'b', 'layout': 'x', 'game': 0, 'score': 1},
+            {'round': 0, 'red': 'c', 'blue': 'd', 'layout': 'x', 'game': 0, 'score': -1},
+            {'round': 0, 'bye': True, 'team': 'e', 'points': tournament.byePoints(['x'], 1)},
+        ]
+
+        matches, bye = tournament.scheduleSwissRound(1, teams, ['x'], 1, results)
+
+        # 'e' already had a bye, 'a' and 'b' already played.
+        self.assertNotEqual('e', bye)
+        pairings = {(match['red'], match['blue']) for match in matches}
+        self.assertNotIn(('a', 'b'), pairings)
+        self.assertEqual(4, len(matches))
+
+    def test_bye_points(self):
+        # A bye is worth as much as winning every game of a match.
+        layouts = ['x', 'y']
+        points = tournament.byePoints(layouts, 2)
+        results = [{'round': 0, 'bye': True, 'team': 'c', 'points': points}]
+        for layout in layouts:
+            for game in range(2):
+                for (red, blue, score) in [('a', 'b', 1), ('b', 'a', -1)]:
+                    results.append({'round': 0, 'red': red, 'blue': blue, 'layout': layout,
+                            'game': game, 'score': score})
+
+        standings = tournament.computeStandings(['a', 'b', 'c'], results)
+        standings = {row['team']: row for row in standings}
+        self.assertEqual(standings['a']['points'], standings['c']['points'])
+        self.assertEqual(1, standings['c']['byes'])
+
+    def test_resume_without_seed(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            resultsPath = os.path.join(tempDir, 'results.jsonl')
+            args = TEAMS + ['-q', '--layouts', 'defaultCapture', '--max-moves', '200',
+                    '--workers', '1', '--results', resultsPath]
+
+            tournament.main(args)
+            results = tournament.loadResults(resultsPath)
+            self.assertIsNotNone(tournament.loadSeed(resultsPath))
+            self.assertEqual(2, len(results))
+
+            for result in results:
+                self.assertIsNone(result['error'])
+
+            # Drop the last game (like an interrupted run), it should be played the same way again.
+            with open(resultsPath, 'r') as file:
+                lines = file.readlines()
+
+            with open(resultsPath, 'w') as file:
+                file.writelines(lines[:-1])
+
+            tournament.main(args)
+            resumedResults = tournament.loadResults(resultsPath)
+
+            self.assertEqual(2, len(resumedResults))
+            self.assertEqual(results[-1], resumedResults[-1])
+
+if __name__ == '__main__':
+    unittest.main()
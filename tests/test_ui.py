@@ -1,7 +1,14 @@
+import os
 import shutil
 import subprocess
+import tempfile
 import unittest
 
+from pacai.bin import pacman
+from pacai.ui import spritesheet
+from pacai.ui import view
+from pacai.ui.pacman.null import PacmanNullView
+
 """
 Test standard graphics under xvfb.
 """
@@ -51,5 +58,23 @@ class UITest(unittest.TestCase):
 
         subprocess.run(args, shell = False, check = True)
 
+    def test_lazy_assets(self):
+        # Headless views without a gif never need sprites or fonts.
+        nullView = PacmanNullView()
+        self.assertIsNone(nullView._sprites)
+        self.assertIsNone(nullView._font)
+
+        # Sprite sheets are only loaded once per process.
+        self.assertIs(spritesheet.loadSpriteSheet(view.DEFAULT_SPRITES),
+                spritesheet.loadSpriteSheet(view.DEFAULT_SPRITES))
+
+        # But they are still there when a frame gets rasterized.
+        gifPath = os.path.join(tempfile.gettempdir(), 'pacai_unittest_lazy.gif')
+        pacman.main(['--null-graphics', '-p', 'GreedyAgent', '--layout', 'testClassic',
+                '--gif', gifPath])
+
+        self.assertTrue(os.path.isfile(gifPath))
+        os.remove(gifPath)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 
+from pacai.util import lruCache
 from pacai.util import priorityQueue
 from pacai.util import queue
 from pacai.util import stack
+from pacai.util import transpositionTable
 
 """
 This is a test class to assess the functionality of the data structures defined in util.py.
@@ -36,6 +38,57 @@ class UtilContainersTest(unittest.TestCase):
         for val in reversed(val_list):
             self.assertEqual(val, testStack.pop())
 
+    def test_lru_cache(self):
+        cache = lruCache.LRUCache(3)
+
+        for key in ['a', 'b', 'c']:
+            cache.put(key, key.upper())
+        self.assertEqual(3, len(cache))
+
+        # Using 'a' makes 'b' the oldest.
+        self.assertEqual('A', cache.get('a'))
+        cache.put('d', 'D')
+
+        self.assertEqual(3, len(cache))
+        self.assertNotIn('b', cache)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(['A', 'C', 'D'], [cache.get(key) for key in ['a', 'c', 'd']])
+
+        self.assertRaises(ValueError, lruCache.LRUCache, 0)
+
+    def test_transposition_table(self):
+        # One slot, so every key collides.
+        table = transpositionTable.TranspositionTable(1)
+
+        table.put('a', 3, 10, transpositionTable.LOWER_BOUND, 'North')
+        self.assertEqual((10, transpositionTable.LOWER_BOUND, 'North'), table.get('a'))
+        self.assertIsNone(table.get('b'))
+
+        # Shallower entries from the same search do not replace deeper ones.
+        table.put('b', 2, 20)
+        self.assertIsNone(table.get('b'))
+        self.assertIsNotNone(table.get('a'))
+
+        # Deeper ones do.
+        table.put('b', 4, 20)
+        self.assertEqual((20, transpositionTable.EXACT, None), table.get('b'))
+
+        # Anything from an older search can be replaced.
+        table.newSearch()
+        table.put('c', 0, 30)
+        self.assertEqual(30, table.get('c')[0])
+        self.assertEqual(1, len(table))
+
+        stats = table.getStats()
+        self.assertEqual(6, stats['probes'])
+        self.assertEqual(4, stats['hits'])
+        self.assertEqual(4 / 6, table.getHitRate())
+        self.assertEqual(3, stats['stores'])
+        self.assertEqual(2, stats['replacements'])
+        self.assertEqual(1, stats['rejections'])
+
+        self.assertRaises(ValueError, transpositionTable.TranspositionTable, 0)
+
     def test_priority_queue(self):
         testPriorityQueue = priorityQueue.PriorityQueue()
         self.assertTrue(testPriorityQueue.isEmpty())